@@ -65,7 +65,7 @@ def clone_superproject(args):
 def init_env(args):
     from scaffold.env.cntrl import EnvController
 
-    cntrl = EnvController(args.config_path, args.config_loader)
+    cntrl = EnvController(args.config_path, args.config_loader, use_cache=not args.no_cache)
 
     commands = ''
 
@@ -140,6 +140,14 @@ def main():
         help='Loader to use for config loading (Build, Single)'
     )
 
+    p_init.add_argument(
+        '--no-cache',
+        dest='no_cache',
+        action='store_true',
+        default=False,
+        help='Rebuild the software set environment, ignoring the env cache'
+    )
+
     p_init.add_argument(
         'config_path',
         help='path to sc_config.json',
@@ -7,6 +7,7 @@
 
 import os
 import sys
+import json
 import base64
 import argparse
 
@@ -15,38 +16,78 @@ import argparse
 from scaffold.buildsys.buildlib.PyBind11 import generator as pb11_generator
 
 
+LIB_ARGS = ['mode', 'sset_rname', 'lib_name', 'pb_info', 'outputs', 'src_headers', 'src_jsons']
+
+
 def main():
 
 
     parser = argparse.ArgumentParser('')
-    parser.add_argument('--mode', dest='mode', required=True) # static (embedded) or dynamic (not embedded)
-    parser.add_argument('--sset_rname', dest='sset_rname', required=True)
-    parser.add_argument('--lib_name', dest='lib_name', required=True)
+    parser.add_argument('--mode', dest='mode') # static (embedded) or dynamic (not embedded)
+    parser.add_argument('--sset_rname', dest='sset_rname')
+    parser.add_argument('--lib_name', dest='lib_name')
     # parser.add_argument('--o_header', help='header output path', required=True)
     # parser.add_argument('--o_cpp', help='cpp output path', required=True)
-    parser.add_argument('--outputs', nargs=4, help='header, sigslot, and cpp outputs')
-    parser.add_argument('--src_headers', nargs='*', required=True)
-    parser.add_argument('--src_jsons', nargs='*', required=True)
+    parser.add_argument('--outputs', nargs='+',
+        help='header, sigslot header, [sigslot moc cpp], and cpp outputs. '
+             'Without the sigslot moc cpp, moc is not run (the build runs it as a separate edge)')
+    parser.add_argument('--src_headers', nargs='*')
+    parser.add_argument('--src_jsons', nargs='*')
+
+    parser.add_argument('--pb_info')
 
-    parser.add_argument('--pb_info', required=True)
+    parser.add_argument('--batch', default=None,
+        help='JSON file with a list of libraries to generate, each an object with the keys: {}. '
+             'moc runs for all libraries together at the end'.format(', '.join(LIB_ARGS)))
+    parser.add_argument('--moc', default=None, help='moc executable')
+    parser.add_argument('--jobs', '-j', default=None, type=int, help='max moc processes')
 
     args = parser.parse_args()
 
-    o_header, o_ssc_header, o_ssc_moc_cpp, o_cpp = args.outputs
+    if args.batch:
+        with open(args.batch) as fh:
+            lib_list = json.load(fh)
+
+    else:
+        lib_list = [dict([(k, getattr(args, k)) for k in LIB_ARGS])]
+
+    for lib_entry in lib_list:
+        for arg_name in LIB_ARGS:
+            if lib_entry.get(arg_name) is None:
+                parser.error('missing {}'.format(arg_name))
+
+        if len(lib_entry['outputs']) not in [3, 4]:
+            parser.error('--outputs expects 3 or 4 paths')
+
+    moc_pool = pb11_generator.MocPool(args.jobs)
+
+    for lib_entry in lib_list:
+
+        o_ssc_moc_cpp = None
+        if len(lib_entry['outputs']) == 4:
+            o_header, o_ssc_header, o_ssc_moc_cpp, o_cpp = lib_entry['outputs']
+
+        else:
+            o_header, o_ssc_header, o_cpp = lib_entry['outputs']
+
+        pb11_generator.generate_pybind11_module(
+            lib_entry['mode'],
+            lib_entry['sset_rname'],
+            lib_entry['lib_name'],
+            lib_entry['pb_info'],
+            o_header,
+            o_ssc_header,
+            o_ssc_moc_cpp,
+            o_cpp,
+            lib_entry['src_headers'],
+            lib_entry['src_jsons'],
+            moc_exec=args.moc,
+            moc_pool=moc_pool
+        )
 
-    pb11_generator.generate_pybind11_module(
-        args.mode,
-        args.sset_rname,
-        args.lib_name,
-        args.pb_info,
-        o_header,
-        o_ssc_header,
-        o_ssc_moc_cpp,
-        o_cpp,
-        args.src_headers,
-        args.src_jsons
-    )
+    if moc_pool.run():
+        sys.exit(1)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
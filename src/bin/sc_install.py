@@ -9,12 +9,29 @@ import os
 import sys
 import argparse
 
-def write_contents(dest_contents):
+from scaffold.buildsys.install import Installer, INSTALL_MODES
+
+def write_contents(dest_contents, src_files):
+    '''
+    The contents file is the stamp output of the install edge. It is only
+    rewritten when the list of files changes, so with restat ninja does not
+    rebuild anything depending on it when no file was installed
+    '''
+
+    contents = '# Automatically generated by scaffold\n'
+    for src_file in src_files:
+        contents += '{}\n'.format(src_file)
 
     print('')
     print(dest_contents)
+    if os.path.isfile(dest_contents):
+        with open(dest_contents) as fh:
+            if fh.read() == contents:
+                print('Unchanged')
+                return
+
     with open(dest_contents, 'w') as wfh:
-        wfh.write('# Automatically generated by scaffold\n')
+        wfh.write(contents)
 
     print('Done')
 
@@ -23,6 +40,8 @@ def main():
 
     parser = argparse.ArgumentParser()
     parser.add_argument('--itype', dest='itype', help='install type', required=True)
+    parser.add_argument('--mode', dest='install_mode', choices=INSTALL_MODES, default='copy',
+        help='install files by copy or link')
     parser.add_argument('--sset_rname', '-s', dest='sset_rname', help='software set name')
     parser.add_argument('--libname', dest='lib_name', help='product name', default='')
     parser.add_argument('--dest', dest='dest_contents', help='destination contents dir/file')
@@ -30,22 +49,19 @@ def main():
 
     args = parser.parse_args()
 
+    installer = Installer(install_mode=args.install_mode, verbose=True)
+
     if args.itype.startswith('direct'):
 
         src_path = args.src_files[0]
         dest_path = args.dest_contents
 
-        print('{} -> {}'.format(src_path, dest_path))
-        cmd = 'cp {} {}'.format(src_path, dest_path)
-
-        if os.name == 'nt':
-            src_path = src_path.replace('/', '\\')
-            dest_path = dest_path.replace('/', '\\')
-
-            cmd = 'copy {} {}'.format(src_path, dest_path)
-
+        # executables are renamed and chmod'd, a link would change the source
+        if args.itype == 'direct_exe':
+            installer = Installer(verbose=True)
 
-        os.system(cmd)
+        installer.add(src_path, dest_path)
+        installer.run()
 
         if args.itype == 'direct_exe':
             print('chmod +x: {}'.format(dest_path))
@@ -63,25 +79,15 @@ def main():
 
 
     elif args.itype == 'header':
-        
-        src_dir = os.path.dirname(args.src_files[0])
-        dest_dir = os.path.dirname(args.dest_contents)
-        # dest_contents = os.path.join(dest_dir, '.contents')
-
-        if not os.path.isdir(dest_dir):
-            print('Creating {}'.format(dest_dir))
-            os.makedirs(dest_dir)
 
+        dest_dir = os.path.dirname(args.dest_contents)
 
         for src in args.src_files:
+            installer.add_to_dir(src, dest_dir)
 
-            cmd = 'cp {} {}'.format(src, dest_dir)
-            if os.name == 'nt':
-                cmd = 'copy {} {}'.format(src.replace('/', '\\'), dest_dir.replace('/', '\\'))
-            print(cmd)
-            os.system(cmd)
+        installer.run()
 
-        write_contents(args.dest_contents)
+        write_contents(args.dest_contents, args.src_files)
 
 
 
@@ -92,22 +98,11 @@ def main():
         for src_entry in args.src_files:
             src_rel = src_entry.replace(src_reldir, '')
 
-            dest_path = os.path.join(dest_dir, src_rel)
-            dest_parent_dir = os.path.dirname(dest_path)
-
-            if not os.path.isdir(dest_parent_dir):
-                print('Creating {}'.format(dest_parent_dir))
-                os.makedirs(dest_parent_dir)
-
-            cp_cmd = 'cp {} {}'.format(src_entry, dest_path)
-            if os.name == 'nt':
-                cp_cmd = 'copy {} {}'.format(src_entry.replace('/', '\\'), dest_path.replace('/', '\\'))
-
-            print(cp_cmd)
-            os.system(cp_cmd)
+            installer.add(src_entry, os.path.join(dest_dir, src_rel))
 
+        installer.run()
 
-        write_contents(args.dest_contents)
+        write_contents(args.dest_contents, args.src_files)
 
 
 
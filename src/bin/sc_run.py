@@ -27,7 +27,7 @@ from scaffold.env.cntrl import EnvController
 def run(args):
 
 
-    cntrl = EnvController(args.config_path, args.config_loader)
+    cntrl = EnvController(args.config_path, args.config_loader, use_cache=not args.no_cache)
 
     commands = args.command
 
@@ -55,6 +55,13 @@ def main():
         default=None
     )
 
+    parser.add_argument(
+        '--no-cache',
+        dest='no_cache',
+        action='store_true',
+        default=False
+    )
+
     parser.add_argument('command')
 
     args = parser.parse_args()
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+#
+# Copyright 2014-2024 Justin Ottley
+#
+# Licensed under the terms set forth in the LICENSE.txt file
+#
+# Run the local worker server for install / codegen rules:
+#
+#   sc_worker --serve
+#
+# and generate with SC_WORKER=1 so rules go through it
+#
+
+import sys
+
+from scaffold.buildsys import worker
+
+
+if __name__ == '__main__':
+    sys.exit(worker.main())
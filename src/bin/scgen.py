@@ -20,6 +20,14 @@ def main():
     # parser.add_argument('--config', default=True, action='store_true')
     parser.add_argument('--platform_target', default=None)
     parser.add_argument('--pybind_mode', default='static')
+    parser.add_argument('--full', default=False, action='store_true',
+        help='regenerate everything, ignoring the generation manifest')
+    parser.add_argument('--unity', default=False, action='store_true',
+        help='unity build targets that set unity_batch_size')
+    parser.add_argument('-j', '--jobs', default=1, type=int,
+        help='generate top level subtrees in this many worker processes')
+    parser.add_argument('--build_stamp', default=False, action='store_true',
+        help='set a new build time in build_info.h, otherwise the previous one is kept')
 
     args = parser.parse_args()
 
@@ -41,9 +49,11 @@ def main():
 
 
     sc_globals.args['pybind_mode'] = args.pybind_mode
+    sc_globals.args['unity'] = args.unity
 
 
-    scr = ScNinjaRuntime(True) # gen_config=args.config)
+    scr = ScNinjaRuntime(True, incremental=not args.full, jobs=args.jobs,
+        build_stamp=args.build_stamp) # gen_config=args.config)
     scr.run('ScaffoldScript')
 
 
@@ -98,6 +98,13 @@ def main():
         default=None
     )
 
+    p_sset.add_argument(
+        '--jobs',
+        help='max number of zips created at the same time',
+        type=int,
+        default=sset_release.DEFAULT_JOBS
+    )
+
     p_sset.set_defaults(func=sset_release.release_sset)
 
 
@@ -206,6 +213,20 @@ def main():
         default=None
     )
 
+    p_zip.add_argument(
+        '--jobs',
+        help='max number of zips created at the same time',
+        type=int,
+        default=sset_release.DEFAULT_JOBS
+    )
+
+    p_zip.add_argument(
+        '--work_dir',
+        help='directory for zips in progress and the resume journal, '
+             'derived from the config path and project if not specified',
+        default=None
+    )
+
     p_zip.set_defaults(func=sset_release.zip_build)
 
     args = parser.parse_args()
@@ -215,7 +236,11 @@ def main():
     sset_release.edbc = StandaloneWsClient.init(args.server) # , encrypted=True)
     sset_release.edbc.connect()
 
-    args.func(args)
+    result = args.func(args)
+
+    # zip_build returns the number of failed zips
+    if args.func == sset_release.zip_build and result:
+        sys.exit(sset_release.ERR_ZIP_FAILED)
 
 
 
@@ -8,6 +8,8 @@ import sys
 
 import scaffold.variant
 
+from . import util as buildsys_util
+
 class BuildEnvironment(object):
 
     def __init__(self):
@@ -94,19 +96,24 @@ class BuildEnvironment(object):
 
         return builder_obj
 
+    def write_rules(self, writer):
+        for builder in self.__builders:
+            writer.write(builder.gen_rules())
+            writer.write('\n')
+
     def gen_rules(self):
+        writer = buildsys_util.NinjaWriter()
+        self.write_rules(writer)
 
-        n = ''
-        for builder in self.__builders:
-            n += builder.gen_rules()
-            n += '\n'
+        return writer.getvalue()
 
-        return n
+    def write_build(self, writer):
+        for builder in self.__builders:
+            builder.write_build(writer)
+            writer.write('\n')
 
     def gen_build(self):
-        n = ''
-        for builder in self.__builders:
-            n += builder.gen_build()
-            n += '\n'
+        writer = buildsys_util.NinjaWriter()
+        self.write_build(writer)
 
-        return n
+        return writer.getvalue()
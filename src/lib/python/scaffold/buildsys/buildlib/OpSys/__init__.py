@@ -1,20 +1,16 @@
 
 import os
-import time
+import re
 import platform
 
 import scaffold.variant
 
 from .. import BuildlibBase, Builder, ThirdbaseLib
 from ... import globals as buildsys_globals
+from ... import util as buildsys_util
+from ... import compile_cache
 
 
-SCAFFOLD_BUILD_TIME = int(time.time())
-if os.getenv('SCAFFOLD_BUILD_TIME'):
-    SCAFFOLD_BUILD_TIME = int(os.getenv('SCAFFOLD_BUILD_TIME'))
-
-buildsys_globals.build_time = SCAFFOLD_BUILD_TIME
-
 class CompileBuilder(Builder):
 
     def _gen_fn(self):
@@ -47,6 +43,158 @@ class CompileBuilder(Builder):
         return fn
 
 
+    def _gen_launcher(self):
+        '''
+        Prefix for compile commands from senv_config['compile_cache']
+        '''
+
+        senv_config = buildsys_globals.senv_config
+
+        launcher = senv_config.get('compile_cache')
+        if not launcher:
+            return ''
+
+        if launcher == 'builtin':
+            launcher = compile_cache.get_launcher_cmd(
+                cache_dir=senv_config.get('compile_cache.dir'),
+                max_size_mb=senv_config.get('compile_cache.max_size_mb')
+            )
+
+        return '{} '.format(launcher)
+
+
+    def _gen_deps_vars(self):
+        '''
+        Header dependencies come from the compiler, written to $out.d and
+        stored in the ninja deps log
+        '''
+
+        n  = '    depfile = $out.d\n'
+        n += '    deps = gcc\n'
+
+        return n
+
+
+    def _gen_fn_scope(self, writer):
+        '''
+        Write the variables of _gen_fn() once, as file level ninja variables
+        named after this target. Returns the edge bindings referencing them, so
+        the full flag lists are not repeated under every edge
+        '''
+
+        scope_name = 'fn_{}'.format(re.sub(r'[^A-Za-z0-9_]', '_', self.benv.node.reldir))
+
+        bindings = ''
+        for fn_line in self._gen_fn().split('\n'):
+            var_name, sep, var_value = fn_line.partition('=')
+            if not sep:
+                continue
+
+            var_name = var_name.strip()
+            scoped_var_name = '{}_{}'.format(scope_name, var_name)
+
+            writer.write('{} = {}\n'.format(scoped_var_name, var_value.strip()))
+            bindings += '    {} = ${}\n'.format(var_name, scoped_var_name)
+
+        return bindings
+
+
+    def _get_unity_batches(self):
+        '''
+        [(unity source path, [cpp entries])] for cpp_classes if this target
+        sets benv.unity_batch_size and scgen was run with --unity, else [].
+        Generated python binding sources are not batched
+        '''
+
+        if not buildsys_globals.args.get('unity') or 'unity_batch_size' not in self.benv.interface:
+            return []
+
+        batch_size = int(self.benv.unity_batch_size)
+        if batch_size < 2:
+            return []
+
+        unity_entries = [c for c in self.benv.cpps if 'pymodule' not in c and 'pysigslot' not in c]
+
+        result = []
+        for batch_num, batch_start in enumerate(range(0, len(unity_entries), batch_size)):
+            unity_path = os.path.join(self.benv.sset_gen_lib_dir, 'unity_{}.cpp'.format(batch_num))
+            result.append((unity_path, unity_entries[batch_start:batch_start + batch_size]))
+
+        return result
+
+
+    def _get_cpp_class_sources(self):
+        '''
+        Sources compiled for cpp_classes - unity sources, and anything not
+        batched into one
+        '''
+
+        unity_batches = self._get_unity_batches()
+
+        batched = set()
+        for _, batch_entries in unity_batches:
+            batched.update(batch_entries)
+
+        result = [unity_path for unity_path, _ in unity_batches]
+        result.extend([c for c in self.benv.cpps if c not in batched])
+
+        return result
+
+
+    def _write_unity_sources(self):
+
+        unity_batches = self._get_unity_batches()
+        if unity_batches and not os.path.isdir(self.benv.sset_gen_lib_dir):
+            print('Creating {}'.format(self.benv.sset_gen_lib_dir))
+            os.makedirs(self.benv.sset_gen_lib_dir)
+
+        for unity_path, batch_entries in unity_batches:
+
+            unity_dir = os.path.dirname(unity_path)
+
+            n = '// Automatically generated by scaffold\n\n'
+            for cpp_entry in batch_entries:
+                n += '#include "{}"\n'.format(os.path.relpath(cpp_entry, unity_dir))
+
+            buildsys_util.write_output(unity_path, n)
+
+
+    def _get_pch_deps(self):
+        return [d for d in self.deps if isinstance(d, PrecompiledHeaderBuilder)]
+
+
+    def _gen_pch_flags(self):
+        return ''.join([' {}'.format(d.get_object_flags()) for d in self._get_pch_deps()])
+
+
+    def _gen_implicit_deps(self):
+
+        pch_deps = self._get_pch_deps()
+
+        dn = ''
+        for dep_entry in self.deps:
+            if dep_entry in pch_deps:
+                continue
+
+            if dep_entry.outputs:
+                dn += ' '.join(dep_entry.outputs)
+
+            dn += ' '
+
+        result = ''
+
+        # compilers don't report a precompiled header as a dependency
+        for pch_dep in pch_deps:
+            result += ' | {}'.format(' '.join(pch_dep.outputs))
+
+        # order-only: these have to exist before compiling, rebuilds on
+        # change are driven by the header dependencies the compiler reports
+        if dn:
+            result += ' || {}'.format(dn)
+
+        return result
+
+
     def gen_rules(self):
 
         env = self.benv.env
@@ -58,10 +206,19 @@ class CompileBuilder(Builder):
 
 
         n  = 'rule cxx\n'
-        n += '    command = {} -o $out $cc_extra_flags {} $defines $cpppath $libpath $libs -c $in'.format(
+        n += '    command = {}{} -MMD -MF $out.d -o $out $cc_extra_flags {} $defines $cpppath $libpath $libs -c $in'.format(
+            self._gen_launcher(), env['CXX'], env['CXXFLAGS'])
+
+        n += '\n'
+        n += self._gen_deps_vars()
+        n += '\n'
+
+        n += 'rule cxx_pch\n'
+        n += '    command = {} -x c++-header -MMD -MF $out.d -o $out $cc_extra_flags {} $defines $cpppath -c $in\n'.format(
             env['CXX'], env['CXXFLAGS'])
 
-        n += '\n\n'
+        n += self._gen_deps_vars()
+        n += '\n'
 
         n += 'rule cxx_lib\n'
         n += '    command = {} -o $out $cc_extra_flags {} $defines $cpppath $libpath $libs $in'.format(
@@ -76,9 +233,11 @@ class CompileBuilder(Builder):
         )
 
         n += 'rule cc\n'
-        n += '    command = {} -o $out $cc_extra_flags {} $in\n\n'.format(
-            env['CC'], env['CCFLAGS']
+        n += '    command = {}{} -MMD -MF $out.d -o $out $cc_extra_flags {} $in\n'.format(
+            self._gen_launcher(), env['CC'], env['CCFLAGS']
         )
+        n += self._gen_deps_vars()
+        n += '\n'
 
         buildsys_globals._RULES_DONE = True
 
@@ -87,6 +246,13 @@ class CompileBuilder(Builder):
 
 class WindowsCompileBuilder(CompileBuilder):
 
+    def _gen_deps_vars(self):
+        '''
+        Header dependencies come from /showIncludes output
+        '''
+        return '    deps = msvc\n'
+
+
     def _gen_fn(self):
 
         fn = '    defines = '
@@ -112,10 +278,19 @@ class WindowsCompileBuilder(CompileBuilder):
         env = self.benv.env
 
         n  = 'rule cxx\n'
-        n += '    command = {} /Fo$out /c $in $cc_extra_flags {} $defines $cpppath $libpath $libs'.format(
+        n += '    command = {}{} /showIncludes /Fo$out /c $in $cc_extra_flags {} $defines $cpppath $libpath $libs'.format(
+            self._gen_launcher(), env['CXX'], env['CXXFLAGS'])
+
+        n += '\n'
+        n += self._gen_deps_vars()
+        n += '\n'
+
+        n += 'rule cxx_pch\n'
+        n += '    command = {} /showIncludes /Yc$pch_header /Fp$out /Fo$pch_obj /c $in $cc_extra_flags {} $defines $cpppath\n'.format(
             env['CXX'], env['CXXFLAGS'])
 
-        n += '\n\n'
+        n += self._gen_deps_vars()
+        n += '\n'
 
         n += 'rule cxx_lib\n'
         n += '    command = {} $cc_extra_flags /out:$out /implib:$implib {} $defines $cpppath $libpath $libs $in'.format(
@@ -128,9 +303,11 @@ class WindowsCompileBuilder(CompileBuilder):
         )
 
         n += 'rule cc\n'
-        n += '    command = {} /Fo$out /c $in $cc_extra_flags {} $cpppath\n\n'.format(
-            env['CC'], env['CCFLAGS']
+        n += '    command = {}{} /showIncludes /Fo$out /c $in $cc_extra_flags {} $cpppath\n'.format(
+            self._gen_launcher(), env['CC'], env['CCFLAGS']
         )
+        n += self._gen_deps_vars()
+        n += '\n'
 
         buildsys_globals._RULES_DONE = True
 
@@ -171,7 +348,7 @@ class ObjectBuilder(CompileBuilder):
 
         result = []
         if 'cpp_classes' in self.benv.interface:
-            result.extend(self.benv.cpps)
+            result.extend(self._get_cpp_class_sources())
 
         if 'c_files' in self.benv.interface:
             cresult = []
@@ -202,40 +379,43 @@ class ObjectBuilder(CompileBuilder):
 
             os_list.append(self._get_object_path(cpp_entry))
 
+        for pch_dep in self._get_pch_deps():
+            os_list.extend(pch_dep.link_outputs)
+
         return os_list
 
 
     def gen_build(self):
+        writer = buildsys_util.NinjaWriter()
+        self.write_build(writer)
+
+        return writer.getvalue()
+
+
+    def write_build(self, writer):
 
         if not os.path.isdir(self.benv.sset_gen_lib_dir):
             print('Creating {}'.format(self.benv.sset_gen_lib_dir))
 
-        fn = self._gen_fn()
+        writer.write('\n')
 
-        n = '\n'
+        # the same for every object, only computed once
+        fn = self._gen_fn_scope(writer)
+        dn = self._gen_implicit_deps()
 
         if 'cpp_classes' in self.benv.interface:
 
-            for cpp_entry in self.benv.cpps:
-                obj_relpath = self._get_object_path(cpp_entry)
-
-                n += '\n\n'
-                n += 'build {}: cxx {}'.format(obj_relpath, cpp_entry)
+            cc_extra_flags = '    cc_extra_flags = {}{}\n'.format(
+                self.benv.env.get('CC_EXTRA_FLAGS'), self._gen_pch_flags())
 
-                dn = ''
-                for dep_entry in self.deps:
-                    if dep_entry.outputs:
-                        dn += ' '.join(dep_entry.outputs)
+            self._write_unity_sources()
 
-                    dn += ' '
-
-                if dn:
-                    n = '{} | {}'.format(n, dn)
+            for cpp_entry in self._get_cpp_class_sources():
+                obj_relpath = self._get_object_path(cpp_entry)
 
-                n += '\n'
-                n += '    cc_extra_flags = {}'.format(self.benv.env.get('CC_EXTRA_FLAGS'))
-                n += '\n'
-                n += fn
+                writer.write('\n\nbuild {}: cxx {}{}\n'.format(obj_relpath, cpp_entry, dn))
+                writer.write(cc_extra_flags)
+                writer.write(fn)
 
         if 'c_files' in self.benv.interface:
 
@@ -243,38 +423,25 @@ class ObjectBuilder(CompileBuilder):
             for c_file in c_file_list:
                 c_file = os.path.join(self.benv.node.reldir, c_file.strip())
                 obj_relpath = self._get_object_path(c_file)
-                n += '\n\n'
-                n += 'build {}: cc {}\n'.format(obj_relpath, c_file)
-                n += '    cc_extra_flags = -c\n'
+                writer.write('\n\nbuild {}: cc {}\n'.format(obj_relpath, c_file))
+                writer.write('    cc_extra_flags = -c\n')
 
         if 'cpp_files' in self.benv.interface:
 
+            cc_extra_flags = '    cc_extra_flags = {}{}\n'.format(
+                self.benv.env.get('CC_EXTRA_FLAGS'), self._gen_pch_flags())
+
             cpp_file_list = self.benv.cpp_files.split()
             for cpp_file in cpp_file_list:
                 cpp_file = os.path.join(self.benv.node.reldir, cpp_file.strip())
 
                 exec_path = self._get_object_path(cpp_file)
 
-                n += '\n\n'
-                n += 'build {}: cxx {}'.format(exec_path, cpp_file)
-
-                dn = ''
-                for dep_entry in self.deps:
-                    if dep_entry.outputs:
-                        dn += ' '.join(dep_entry.outputs)
-
-                    dn += ' '
+                writer.write('\n\nbuild {}: cxx {}{}\n'.format(exec_path, cpp_file, dn))
+                writer.write(cc_extra_flags)
+                writer.write(fn)
 
-                if dn:
-                    n = '{} | {}'.format(n, dn)
-
-                n += '\n'
-                n += '    cc_extra_flags = {}\n'.format(self.benv.env.get('CC_EXTRA_FLAGS'))
-                n += fn
-
-        n += '\n'
-
-        return n
+        writer.write('\n')
 
 
 class WindowsObjectBuilder(WindowsCompileBuilder):
@@ -310,7 +477,7 @@ class WindowsObjectBuilder(WindowsCompileBuilder):
 
         result = []
         if 'cpp_classes' in self.benv.interface:
-            result.extend(self.benv.cpps)
+            result.extend(self._get_cpp_class_sources())
 
         if 'c_files' in self.benv.interface:
             cresult = []
@@ -336,40 +503,41 @@ class WindowsObjectBuilder(WindowsCompileBuilder):
         for cpp_entry in self.input_list:
             os_list.append(self._get_object_path(cpp_entry))
 
+        for pch_dep in self._get_pch_deps():
+            os_list.extend(pch_dep.link_outputs)
+
         return os_list
 
 
     def gen_build(self):
+        writer = buildsys_util.NinjaWriter()
+        self.write_build(writer)
 
-        if not os.path.isdir(self.benv.sset_gen_lib_dir):
-            print('Creating {}'.format(self.benv.sset_gen_lib_dir))
+        return writer.getvalue()
 
-        fn = self._gen_fn()
 
-        n = '\n'
+    def write_build(self, writer):
 
-        if 'cpp_classes' in self.benv.interface:
+        if not os.path.isdir(self.benv.sset_gen_lib_dir):
+            print('Creating {}'.format(self.benv.sset_gen_lib_dir))
 
-            for cpp_entry in self.benv.cpps:
-                obj_relpath = self._get_object_path(cpp_entry)
+        writer.write('\n')
 
-                n += '\n\n'
-                n += 'build {}: cxx {}'.format(obj_relpath, cpp_entry)
+        # the same for every object, only computed once
+        fn = self._gen_fn_scope(writer)
+        dn = self._gen_implicit_deps()
+        pch_flags = self._gen_pch_flags().strip()
 
-                dn = ''
-                for dep_entry in self.deps:
-                    if dep_entry.outputs:
-                        dn += ' '.join(dep_entry.outputs)
+        if 'cpp_classes' in self.benv.interface:
 
-                    dn += ' '
+            self._write_unity_sources()
 
-                if dn:
-                    n = '{} | {}'.format(n, dn)
+            for cpp_entry in self._get_cpp_class_sources():
+                obj_relpath = self._get_object_path(cpp_entry)
 
-                n += '\n'
-                n += '    cc_extra_flags = \n'
-                # n += '\n'
-                n += fn
+                writer.write('\n\nbuild {}: cxx {}{}\n'.format(obj_relpath, cpp_entry, dn))
+                writer.write('    cc_extra_flags = {}\n'.format(pch_flags))
+                writer.write(fn)
 
         if 'c_files' in self.benv.interface:
             
@@ -381,11 +549,10 @@ class WindowsObjectBuilder(WindowsCompileBuilder):
             for c_file in c_file_list:
                 c_file = os.path.join(self.benv.node.reldir, c_file.strip())
                 obj_relpath = self._get_object_path(c_file)
-                n += '\n\n'
-                n += 'build {}: cc {}\n'.format(obj_relpath, c_file)
-                n += '    cc_extra_flags = \n'
-                n += '    cpppath = {}\n'.format(win_cpppath)
-                n += '    '
+                writer.write('\n\nbuild {}: cc {}\n'.format(obj_relpath, c_file))
+                writer.write('    cc_extra_flags = \n')
+                writer.write('    cpppath = {}\n'.format(win_cpppath))
+                writer.write('    ')
 
 
         if 'cpp_files' in self.benv.interface:
@@ -396,26 +563,11 @@ class WindowsObjectBuilder(WindowsCompileBuilder):
 
                 exec_path = self._get_object_path(cpp_file)
 
-                n += '\n\n'
-                n += 'build {}: cxx {}'.format(exec_path, cpp_file)
-
-                dn = ''
-                for dep_entry in self.deps:
-                    if dep_entry.outputs:
-                        dn += ' '.join(dep_entry.outputs)
-
-                    dn += ' '
-
-                if dn:
-                    n = '{} | {}'.format(n, dn)
-
-                n += '\n'
-                n += '    cc_extra_flags = \n'
-                n += fn
-
-        n += '\n'
+                writer.write('\n\nbuild {}: cxx {}{}\n'.format(exec_path, cpp_file, dn))
+                writer.write('    cc_extra_flags = {}\n'.format(pch_flags))
+                writer.write(fn)
 
-        return n
+        writer.write('\n')
 
 class DarwinObjectBuilder(ObjectBuilder):
 
@@ -471,10 +623,19 @@ class IOSObjectBuilder(DarwinObjectBuilder):
         env = self.benv.env
 
         n  = 'rule cxx\n'
-        n += '    command = {} {} $defines $cpppath $libpath $libs -c $in -o $out'.format(
+        n += '    command = {}{} {} -MMD -MF $out.d $defines $cpppath $libpath $libs -c $in -o $out'.format(
+            self._gen_launcher(), env['CXX'], env['CXXFLAGS'])
+
+        n += '\n'
+        n += self._gen_deps_vars()
+        n += '\n'
+
+        n += 'rule cxx_pch\n'
+        n += '    command = {} {} -x c++-header -MMD -MF $out.d $defines $cpppath -c $in -o $out\n'.format(
             env['CXX'], env['CXXFLAGS'])
 
-        n += '\n\n'
+        n += self._gen_deps_vars()
+        n += '\n'
 
         n += 'rule cxx_lib\n'
         n += '    command = {} {} -o $out $in'.format(
@@ -494,9 +655,141 @@ class IOSObjectBuilder(DarwinObjectBuilder):
 
 
 
+class PrecompiledHeaderBuilder(CompileBuilder):
+    '''
+    Precompiles benv.precompiled_header, which the objects of the same target
+    then include first
+    '''
+
+    @property
+    def header_path(self):
+        return os.path.join(self.benv.node.reldir, self.benv.precompiled_header.strip())
+
+    @property
+    def header_fullpath(self):
+        # /Yc, /Yu and /FI have to name the header the same way
+        return os.path.join(self.benv.root_dir, self.header_path)
+
+    @property
+    def pch_path(self):
+        return os.path.join(
+            self.benv.sset_gen_lib_dir,
+            '{}.gch'.format(os.path.basename(self.header_path))
+        )
+
+    @property
+    def stub_header_path(self):
+        '''
+        Header next to the .gch that objects -include. gcc and clang use the
+        .gch when it is valid and otherwise fall back to the stub, which
+        includes the real header, so preprocessing always works
+        '''
+        return self.pch_path[:-len('.gch')]
+
+    @property
+    def outputs(self):
+        return [self.pch_path]
+
+    @property
+    def link_outputs(self):
+        '''
+        Objects built along with the precompiled header that need to be linked
+        '''
+        return []
+
+
+    def get_object_flags(self):
+
+        # gcc and clang use <header>.gch found next to the -include path
+        return '-include {}'.format(self.stub_header_path)
+
+
+    def gen_build(self):
+
+        if not os.path.isdir(self.benv.sset_gen_lib_dir):
+            print('Creating {}'.format(self.benv.sset_gen_lib_dir))
+            os.makedirs(self.benv.sset_gen_lib_dir)
+
+        buildsys_util.write_output(
+            self.stub_header_path,
+            '#include "{}"\n'.format(self.header_fullpath)
+        )
+
+        n  = '\n'
+        n += 'build {}: cxx_pch {}{}\n'.format(
+            self.pch_path, self.header_path, self._gen_implicit_deps())
+        n += '    cc_extra_flags = {}\n'.format(self.benv.env.get('CC_EXTRA_FLAGS'))
+        n += self._gen_fn()
+        n += '\n'
+
+        return n
+
+
+class WindowsPrecompiledHeaderBuilder(PrecompiledHeaderBuilder, WindowsCompileBuilder):
+    '''
+    MSVC precompiled header, created with /Yc from a generated source file
+    that includes the header, used with /Yu by the objects of the target
+    '''
+
+    @property
+    def pch_path(self):
+        return os.path.join(
+            self.benv.sset_gen_lib_dir,
+            '{}.pch'.format(os.path.basename(self.header_path))
+        )
+
+    @property
+    def pch_src_path(self):
+        return os.path.join(
+            self.benv.sset_gen_lib_dir,
+            '{}_pch.cpp'.format(self.benv.lib_name)
+        )
+
+    @property
+    def link_outputs(self):
+        return [os.path.join(
+            self.benv.sset_gen_lib_dir,
+            '{}_pch.obj'.format(self.benv.lib_name)
+        )]
+
+
+    def get_object_flags(self):
+        return '/Yu{0} /FI{0} /Fp{1}'.format(self.header_fullpath, self.pch_path)
+
+
+    def gen_build(self):
+
+        if not os.path.isdir(self.benv.sset_gen_lib_dir):
+            print('Creating {}'.format(self.benv.sset_gen_lib_dir))
+            os.makedirs(self.benv.sset_gen_lib_dir)
+
+        buildsys_util.write_output(
+            self.pch_src_path,
+            '#include "{}"\n'.format(self.header_fullpath)
+        )
+
+        n  = '\n'
+        n += 'build {} | {}: cxx_pch {}{}\n'.format(
+            self.pch_path, ' '.join(self.link_outputs), self.pch_src_path, self._gen_implicit_deps())
+        n += '    pch_header = {}\n'.format(self.header_fullpath)
+        n += '    pch_obj = {}\n'.format(self.link_outputs[0])
+        n += '    cc_extra_flags = \n'
+        n += self._gen_fn()
+        n += '\n'
+
+        return n
+
+
 class SharedLibBuilder(CompileBuilder):
 
     def gen_build(self):
+        writer = buildsys_util.NinjaWriter()
+        self.write_build(writer)
+
+        return writer.getvalue()
+
+
+    def write_build(self, writer):
 
         os_inputs = ' '.join(self.deps[0].outputs)
         shlib_prefix = self.benv.env.get('SHLIBPREFIX', 'lib')
@@ -511,15 +804,15 @@ class SharedLibBuilder(CompileBuilder):
         shlib_output_path = os.path.join(self.benv.shlib_inst_dir, shlib_output_filename)
 
 
-        n  = 'build {}: cxx_lib {}\n'.format(shlib_output_path, os_inputs)
+        writer.write('build {}: cxx_lib {}\n'.format(shlib_output_path, os_inputs))
         if scaffold.variant.get_variant('platform_target') == 'wasm_32':
             
             emdir = self.benv.env['EMSCRIPTEN_ROOT']
-            n += '    cc_extra_flags = --emdir {}\n'.format(emdir)
-            n += '    defines = \n'
-            n += '    cpppath = \n'
-            n += '    libpath = \n'
-            n += '    libs = \n'
+            writer.write('    cc_extra_flags = --emdir {}\n'.format(emdir))
+            writer.write('    defines = \n')
+            writer.write('    cpppath = \n')
+            writer.write('    libpath = \n')
+            writer.write('    libs = \n')
 
         elif os.name == 'nt':
             
@@ -533,11 +826,11 @@ class SharedLibBuilder(CompileBuilder):
 
             implib_win = shlib_output_path.replace('.dll', '.lib').replace('/', '\\')
 
-            n += '    cc_extra_flags = \n'
-            n += '    defines = \n'
-            n += '    libpath = {}\n'.format(libpath_win)
-            n += '    libs = {}\n'.format(libs_win)
-            n += '    implib = {}\n'.format(implib_win)
+            writer.write('    cc_extra_flags = \n')
+            writer.write('    defines = \n')
+            writer.write('    libpath = {}\n'.format(libpath_win))
+            writer.write('    libs = {}\n'.format(libs_win))
+            writer.write('    implib = {}\n'.format(implib_win))
 
         elif platform.system() == 'Darwin':
 
@@ -560,21 +853,19 @@ class SharedLibBuilder(CompileBuilder):
             if scaffold.variant.get_variant('platform_target') == 'ios':
                 libtype = ''
 
-            n += '    cc_extra_flags = {} {}\n'.format(libtype, self.benv.env['CC_EXTRA_FLAGS'])
-            n += '    defines = \n'
-            n += '    libpath = {}\n'.format(libpath_mac)
-            n += '    libs = {}\n'.format(libs_mac)
+            writer.write('    cc_extra_flags = {} {}\n'.format(libtype, self.benv.env['CC_EXTRA_FLAGS']))
+            writer.write('    defines = \n')
+            writer.write('    libpath = {}\n'.format(libpath_mac))
+            writer.write('    libs = {}\n'.format(libs_mac))
 
         else: # Linux
 
-            n += '    cc_extra_flags = -shared {}\n'.format(self.benv.env['CC_EXTRA_FLAGS'])
-            n += self._gen_fn()
-            n += '\n'
+            writer.write('    cc_extra_flags = -shared {}\n'.format(self.benv.env['CC_EXTRA_FLAGS']))
+            writer.write(self._gen_fn())
+            writer.write('\n')
 
 
-        n += '\n'
-
-        return n
+        writer.write('\n')
 
 
 class CompiledExecutableBuilder(ObjectBuilder):
@@ -729,14 +1020,19 @@ class CopyHeadersBuilder(Builder):
         if os.name == 'nt':
             sc_install_cmd = r'C:\Users\justi\dev\scaffold_root\scninja\src\bin\sc_install.bat'
     
-        cmd = '{} --itype $itype -s $sset --libname $lib_name --dest $out $in'.format(sc_install_cmd)
+        cmd = '{} --itype $itype --mode {} -s $sset --libname $lib_name --dest $out $in'.format(
+            buildsys_util.get_tool_cmd(sc_install_cmd),
+            buildsys_globals.senv_config.get('install_mode', 'copy'))
         return cmd
 
 
     def gen_rules(self):
 
+        # sc_install skips unchanged files and leaves their mtime alone,
+        # restat lets ninja prune everything downstream of them
         n  = 'rule install_files\n'
-        n += '    command = {}\n\n'.format(self._generate_cmd())
+        n += '    command = {}\n'.format(self._generate_cmd())
+        n += '    restat = 1\n\n'
         
         return n
 
@@ -752,9 +1048,20 @@ class CopyHeadersBuilder(Builder):
             for header_file in self.benv.header_files.split():
                 all_headers.append(os.path.join(self.benv.node.reldir, header_file.strip()))
 
+        # the installed headers are implicit outputs, so ninja knows they
+        # can change when it checks the header dependencies of objects
+        dest_dir = os.path.dirname(self.outputs[0])
+        dest_headers = []
+        for header_path in all_headers:
+            dest_header = os.path.join(dest_dir, os.path.basename(header_path))
+            if dest_header not in dest_headers:
+                dest_headers.append(dest_header)
+
+        buildsys_util.claim_install_outputs(dest_headers, '{} ({})'.format(self.benv.node.reldir, self.outputs[0]))
+
         n  = '\n'
-        n += 'build {}: install_files {}\n'.format(
-            self.outputs[0], ' '.join(all_headers))
+        n += 'build {} | {}: install_files {}\n'.format(
+            self.outputs[0], ' '.join(dest_headers), ' '.join(all_headers))
         n += '    itype = header\n'
         n += '    sset = {}\n'.format(self.benv.sset_rname)
         n += '    lib_name = {}\n'.format(self.benv.lib_name)
@@ -767,9 +1074,16 @@ class CopyFilesBuilder(Builder):
 
     def _gen_build(self, sources):
 
+        # installed files are implicit outputs, see sc_install --itype subdir
+        dest_dir = os.path.dirname(self.outputs[0])
+        src_reldir = self.benv.node.reldir + os.path.sep
+        dest_files = [os.path.join(dest_dir, s.replace(src_reldir, '')) for s in sources]
+
+        buildsys_util.claim_install_outputs(dest_files, '{} ({})'.format(self.benv.node.reldir, self.outputs[0]))
+
         n = '\n'
-        n += 'build {}: install_files {}\n'.format(
-            self.outputs[0], ' '.join(sources)
+        n += 'build {} | {}: install_files {}\n'.format(
+            self.outputs[0], ' '.join(dest_files), ' '.join(sources)
         )
         n += '    itype = subdir\n'
         n += '    sset = {}\n'.format(self.benv.sset_rname)
@@ -800,6 +1114,11 @@ class CopyPyFilesBuilder(CopyFilesBuilder):
             src_dir = os.path.join(self.benv.node.reldir, pypackage_dir)
 
             for root, dirs, files in os.walk(src_dir):
+
+                # the file list depends on the directory listing
+                if buildsys_globals.gen_manifest:
+                    buildsys_globals.gen_manifest.record_dir(root)
+
                 for file_entry in files:
                     file_fullpath = os.path.join(root, file_entry)
                     file_relpath = self._get_relpath(file_fullpath)
@@ -839,6 +1158,7 @@ class OpsysLibBase(BuildlibBase):
         'CompiledExecutable': CompiledExecutableBuilder,
         'ScriptExecutable': ScriptExecutableBuilder,
         'CopyHeaders': CopyHeadersBuilder,
+        'PrecompiledHeader': PrecompiledHeaderBuilder,
         'CopyPyFiles': CopyPyFilesBuilder,
         'CopyStaticFiles': CopyStaticFilesBuilder
     }
@@ -878,7 +1198,7 @@ class LinuxLib(OpsysLibBase):
 
         env['LIBS'] = ['stdc++']
 
-        env['CPPDEFINES'] = ['SCAFFOLD_BUILD_TIME={}'.format(SCAFFOLD_BUILD_TIME)]
+        env['CPPDEFINES'] = []
 
         if buildsys_globals.args.get('pybind_mode') == 'static':
             env['CPPDEFINES'].append('SCAFFOLD_PYBIND_STATIC')
@@ -898,6 +1218,7 @@ class DarwinLib(LinuxLib):
         'CompiledExecutable': DarwinCompiledExecutableBuilder,
         'ScriptExecutable': ScriptExecutableBuilder,
         'CopyHeaders': CopyHeadersBuilder,
+        'PrecompiledHeader': PrecompiledHeaderBuilder,
         'CopyPyFiles': CopyPyFilesBuilder,
         'CopyStaticFiles': CopyStaticFilesBuilder
     }
@@ -936,6 +1257,7 @@ class IOSLib(DarwinLib):
         'CompiledExecutable': DarwinCompiledExecutableBuilder,
         'ScriptExecutable': ScriptExecutableBuilder,
         'CopyHeaders': CopyHeadersBuilder,
+        'PrecompiledHeader': PrecompiledHeaderBuilder,
         'CopyPyFiles': CopyPyFilesBuilder,
         'CopyStaticFiles': CopyStaticFilesBuilder
     }
@@ -1074,7 +1396,6 @@ class WasmLinuxLib(OpsysLibBase):
         env['SHLIBSUFFIX'] = 'a'
 
         env['CPPDEFINES'] = [
-            'SCAFFOLD_BUILD_TIME={}'.format(SCAFFOLD_BUILD_TIME),
             'SCAFFOLD_PYBIND_STATIC'
         ]
 
@@ -1093,7 +1414,7 @@ class WasmLinuxLib(OpsysLibBase):
 
         EMSCRIPTEN_ROOT = None
 
-        if not os.path.isfile(em_config):
+        if not buildsys_util.isfile(em_config):
             raise Exception('emscripten config not found at {}, aborting'.format(em_config))
             
         os.environ['EM_CONFIG'] = em_config
@@ -1169,7 +1490,6 @@ class WasmLinuxLib(OpsysLibBase):
         env['LIBPATH_INTERNAL'] = []
 
         # env.Append(CPPDEFINES=['SCAFFOLD_WASM'])
-        # env.Append(CPPDEFINES=['SCAFFOLD_BUILD_TIME={}'.format(SCAFFOLD_BUILD_TIME)])
 
 
 
@@ -1181,6 +1501,7 @@ class WindowsLib(OpsysLibBase):
         'CompiledExecutable': CompiledExecutableBuilder,
         'ScriptExecutable': ScriptExecutableBuilder,
         'CopyHeaders': CopyHeadersBuilder,
+        'PrecompiledHeader': WindowsPrecompiledHeaderBuilder,
         'CopyPyFiles': CopyPyFilesBuilder,
         'CopyStaticFiles': CopyStaticFilesBuilder
     }
@@ -1244,13 +1565,13 @@ class WindowsLib(OpsysLibBase):
             'C:\Users\justi\dev\revlens_root\thirdbase\20_04\Windows-AMD64-10\Python\3.7.7'
         ])
         '''
-        env['CPPDEFINES'] = ['SCAFFOLD_BUILD_TIME={}'.format(SCAFFOLD_BUILD_TIME)]
+        env['CPPDEFINES'] = []
 
 class AndroidTermuxLinuxLib(LinuxLib):
     def init(self, benv):
       
         env = benv.env
-        prefix = os.getenv('PREFIX')
+        prefix = buildsys_util.getenv('PREFIX')
         
         
         env['CXX'] = os.path.join(prefix, 'bin', 'g++')
@@ -1276,7 +1597,7 @@ class AndroidTermuxLinuxLib(LinuxLib):
             prefix + '/include/c++/v1'
         ]
         
-        env['CPPDEFINES'] = ['SCAFFOLD_BUILD_TIME={}'.format(SCAFFOLD_BUILD_TIME)]
+        env['CPPDEFINES'] = []
   
         env['LIBPATH'] = []
         env['RPATH'] = []
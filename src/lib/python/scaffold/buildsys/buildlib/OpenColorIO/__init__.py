@@ -27,7 +27,7 @@ class OpenColorIOLib(ThirdbaseLib):
         for project in ['GLEWDIR', 'OPENCOLORIODIR']:
             for lib_entry in ['lib64', 'lib']:
                 project_lib_path = os.path.join(env[project], lib_entry)
-                if os.path.isdir(project_lib_path):
+                if buildsys_util.isdir(project_lib_path):
                     env['LIBPATH'].insert(0, project_lib_path)
 
 
@@ -25,7 +25,7 @@ class OpenEXRLib(ThirdbaseLib):
 
         for lib_entry in ['lib64', 'lib']:
             lib_path = os.path.join(env['OPENEXRDIR'], lib_entry)
-            if os.path.isdir(lib_path):
+            if buildsys_util.isdir(lib_path):
                 env['LIBPATH'].insert(0, lib_path)
                 break
 
@@ -25,7 +25,7 @@ class OpenImageIOLib(ThirdbaseLib):
         for project in ['OPENIMAGEIODIR']:
             for lib_entry in ['lib64', 'lib']:
                 project_lib_path = os.path.join(env[project], lib_entry)
-                if os.path.isdir(project_lib_path):
+                if buildsys_util.isdir(project_lib_path):
                     env['LIBPATH'].insert(0, project_lib_path)
                     break
 
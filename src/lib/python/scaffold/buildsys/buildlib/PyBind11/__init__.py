@@ -77,10 +77,18 @@ class PB11GeneratorBuilder(Builder):
 
         n  = 'rule gen_pb11\n'
         n += '    command = {} --mode {} --sset_rname $sset_rname --lib_name $lib_name --src_headers $src_headers --pb_info $pb_info --outputs $out --src_jsons $in'.format(
-            sc_gen_cmd,
+            buildsys_util.get_tool_cmd(sc_gen_cmd),
             module_mode
         )
-        n += '\n\n'
+        n += '\n'
+
+        # the generator leaves unchanged outputs alone
+        n += '    restat = 1\n\n'
+
+        # moc of the generated sigslot header, a separate edge so it only
+        # runs when the header changes
+        n += 'rule moc_pb11\n'
+        n += '    command = {}\n\n'.format(self.deps[0].gen_moc_cmd(output_json=False))
 
         return n
 
@@ -98,11 +106,13 @@ class PB11GeneratorBuilder(Builder):
         o_header, o_ssc, o_ssc_cpp, o_cpp = self.outputs
 
         n  = '\n'
-        n += 'build {} {} {} {}: gen_pb11 {}\n'.format(o_header, o_ssc, o_ssc_cpp, o_cpp, ' '.join(json_list))
+        n += 'build {} {} {}: gen_pb11 {}\n'.format(o_header, o_ssc, o_cpp, ' '.join(json_list))
         n += '    sset_rname = {}\n'.format(self.benv.sset_rname)
         n += '    lib_name = {}\n'.format(self.benv.lib_name)
         n += '    src_headers = {}\n'.format(' '.join(self.benv.headers))
         n += '    pb_info = {}\n'.format(src_in_str)
+        n += '\n'
+        n += 'build {}: moc_pb11 {}\n'.format(o_ssc_cpp, o_ssc)
 
 
         if buildsys_globals.args['pybind_mode'] == 'dynamic':
@@ -2,17 +2,120 @@
 import os
 import json
 import base64
-import string
-import random
 import platform
+import subprocess
 
 import scaffold.variant
 
-LOWERCASE_LETTERS = string.ascii_lowercase
-
 import scaffold.buildsys.globals as buildsys_globals
+import scaffold.buildsys.util as buildsys_util
 
 from . import genfunc
+from .model import MocModel
+
+
+def _write_output(output_path, contents):
+    '''
+    Outputs are only written when they change, the gen_pb11 rule uses restat
+    so the binding sources don't recompile otherwise
+    '''
+
+    if buildsys_util.write_if_changed(output_path, contents):
+        print('Wrote {}'.format(output_path))
+
+    else:
+        print('Unchanged: {}'.format(output_path))
+
+
+class MocPool(object):
+    '''
+    moc runs for the sigslot headers of one or more libraries. The build runs
+    moc on the sigslot header as its own ninja edge, this is for when the
+    generator is run standalone: jobs are collected while each library is
+    generated, then run together with up to max_jobs moc processes at a time
+    '''
+
+    def __init__(self, max_jobs=None):
+        self.max_jobs = max_jobs or os.cpu_count() or 1
+        self._jobs = []
+
+    def add(self, moc_exec, moc_output_path, header_path):
+        self._jobs.append((moc_exec, moc_output_path, header_path))
+
+    def run(self):
+        '''
+        Run all queued moc jobs. Outputs are only written when they change.
+        Returns the number of failed jobs
+        '''
+
+        jobs = self._jobs
+        self._jobs = []
+
+        failed = 0
+        running = []
+        while jobs or running:
+
+            while jobs and len(running) < self.max_jobs:
+                moc_exec, moc_output_path, header_path = jobs.pop(0)
+
+                # moc writes include paths relative to the output, so the
+                # temp output goes in the same directory
+                temp_output_path = '{}.tmp'.format(moc_output_path)
+
+                moc_cmd = [moc_exec, '-o', temp_output_path, header_path]
+                print(' '.join(moc_cmd))
+
+                try:
+                    proc = subprocess.Popen(moc_cmd)
+
+                except OSError as e:
+                    print('Error: could not run moc - {}: {}'.format(e.__class__.__name__, e))
+                    failed += 1
+                    continue
+
+                running.append((proc, moc_output_path, temp_output_path))
+
+            if not running:
+                continue
+
+            proc, moc_output_path, temp_output_path = running.pop(0)
+            if proc.wait() != 0 or not os.path.isfile(temp_output_path):
+                print('Error: moc failed for {}'.format(moc_output_path))
+                if os.path.isfile(temp_output_path):
+                    os.remove(temp_output_path)
+
+                failed += 1
+                continue
+
+            with open(temp_output_path, 'rb') as fh:
+                moc_contents = fh.read()
+
+            os.remove(temp_output_path)
+
+            _write_output(moc_output_path, moc_contents)
+
+        return failed
+
+
+def get_moc_exec():
+
+    qt_root_dir = os.path.join(
+        buildsys_globals.senv_config['dir.thirdbase'],
+        'Qt',
+        buildsys_globals.senv_config['qt_version'],
+    )
+
+    moc_exec = os.path.join(qt_root_dir, 'gcc_64', 'libexec', 'moc')
+    if os.name == 'nt':
+        moc_exec = os.path.join(qt_root_dir, 'bin', 'moc.exe')
+
+    if platform.system() == 'Darwin':
+        moc_exec = os.path.join(qt_root_dir, 'macos', 'libexec', 'moc')
+
+    if scaffold.variant.get_variant('arch') == 'aarch64':
+        moc_exec = '{}/lib/qt6/moc'.format(os.getenv('PREFIX'))
+
+    return moc_exec
 
 
 def generate_pybind11_module(module_mode,
@@ -24,7 +127,9 @@ def generate_pybind11_module(module_mode,
                              ssc_moc_output_path,
                              cpp_output_path,
                              source_headers,
-                             source_moc_jsons):
+                             source_moc_jsons,
+                             moc_exec=None,
+                             moc_pool=None):
 
     modlib_group = sset_rname.replace('Rlp', '').lower()
 
@@ -35,6 +140,12 @@ def generate_pybind11_module(module_mode,
 
     benv_pybind11_info = json.loads(base64.b64decode(pb_info_str).decode('utf-8'))
 
+    # moc output of all headers, parsed once for all outputs
+    moc_model = MocModel.load(
+        source_moc_jsons,
+        cache_path=os.path.join(os.path.dirname(cpp_output_path), '.moc_model.json')
+    )
+
     pb_class_info = benv_pybind11_info['classes']
     pybind11_classes = benv_pybind11_info['classes'].keys()
 
@@ -132,10 +243,7 @@ def generate_pybind11_module(module_mode,
         print('Creating {}'.format(header_output_dir))
         os.makedirs(header_output_dir)
 
-    with open(header_output_path, 'w') as wfh:
-        wfh.write(header_contents)
-
-    print('Wrote {}'.format(header_output_path))
+    _write_output(header_output_path, header_contents)
 
 
     # -------------------------------------------------------------------------
@@ -150,119 +258,67 @@ def generate_pybind11_module(module_mode,
     for include_entry in benv_pybind11_info.get('includes', []):
         ssc += '#include "{}"\n'.format(include_entry)
 
-    for src_json_path in source_moc_jsons:
-    
-        if os.path.isfile(src_json_path):
-            print(src_json_path)
-            with open(src_json_path) as fh:
-                json_data = fh.read()
-                if not json_data:
-                    continue
-                cls_info = json.loads(json_data)
-                for class_entry in cls_info['classes']:
-
-
-                    for signal_entry in class_entry.get('signals', []):
-                        sig_args = signal_entry.get('arguments', [])
-
-                        if len(sig_args) == 0:
-                            continue
-
-                        if len(sig_args) == 1 and sig_args[0]['type'] in ['int', 'bool', 'qlonglong', 'QString', 'QVariantMap']:
-                            continue
-
-                        signal_signature = '{}_{}_{}'.format(
-                            class_entry['className'], signal_entry['name'],
-                            '_'.join([n['type'] for n in sig_args])
-                        )
-                        signal_signature = signal_signature.replace('*', '_ptr')
-                        sig_ok = True
-                        for bad_char in ['&', '<', '>', ':']:
-                            if bad_char in signal_signature:
-                                sig_ok = False
-                                break
-
-                        if not sig_ok:
-                            print('NOT SUPPORTED: {}'.format(signal_signature))
-                            continue
-
-                        signal_key = '{}({})'.format(
-                            signal_entry['name'],
-                            ', '.join(['{} {}'.format(n['type'], n['name']) for n in sig_args])
-                        )
-
-                        print('SIGNAL SIGNATURE: {}'.format(signal_signature))
-
-                        ssc += '\n\n'
-                        ssc += 'class {}_PySigSlotConnector : public PySigSlotConnector\n'.format(signal_signature)
-                        ssc += '{\n'
-                        ssc += '  Q_OBJECT\n\n'
-                        ssc += 'public:\n'
-                        ssc += '  {}_PySigSlotConnector():\n'.format(signal_signature)
-                        ssc += '    PySigSlotConnector()\n'
-                        ssc += '  {\n'
-                        ssc += '  }\n\n'
-                        ssc += 'public slots:\n'
-                        ssc += '  void slot_{}\n'.format(signal_key)
-                        ssc += '  {\n'
-
-                        ssc += '    PY_Interp::acquireGIL();\n'
-                        arg_idx = 0
-                        for arg in sig_args:
-                            ssc += '    py::object pobj{} = py::cast({});\n'.format(arg_idx, arg['name'])
-                            arg_idx += 1
-        
-                        ssc += '    for (auto pslot : _pyslots)\n'
-                        ssc += '    {\n'
-                        ssc += '      if (pslot != nullptr)\n'
-                        ssc += '      {\n'
-                        ssc += '        pslot('
-
-                        carg_list = []
-                        arg_idx = 0
-                        for arg in sig_args:
-                            carg_list.append('pobj{}'.format(arg_idx))
-                            arg_idx += 1
-
-                        ssc += ', '.join(carg_list)
-                        ssc += ');\n'
-
-                        ssc += '      }\n'
-                        ssc += '    }\n'
-                        ssc += '  }\n'
-                        ssc += '};\n'
-
-                        # print('-------------')
-                        # print(ssc)
-                        # print('-------------')
-
-    
-    with open(ssc_header_output_path, 'w') as wfh:
-        wfh.write(ssc)
-
-    # ssc_moc_output_path = ssc_header_output_path.replace('.h', '.cpp')
-
-    print('Wrote {}'.format(ssc_header_output_path))
-    qt_root_dir = os.path.join(
-        buildsys_globals.senv_config['dir.thirdbase'],
-        'Qt',
-        buildsys_globals.senv_config['qt_version'],
-    )
-    
-    moc_exec = os.path.join(qt_root_dir, 'gcc_64', 'libexec', 'moc')
-    if os.name == 'nt':
-        moc_exec = os.path.join(qt_root_dir, 'bin', 'moc.exe')
-    
-    if platform.system() == 'Darwin':
-        moc_exec = os.path.join(qt_root_dir, 'macos', 'libexec', 'moc')
-
-    if scaffold.variant.get_variant('arch') == 'aarch64':
-        moc_exec = '{}/lib/qt6/moc'.format(os.getenv('PREFIX'))
-        
-    print('running moc: {}'.format(moc_exec))
-    moc_cmd = '{} -o {} {}'.format(moc_exec, ssc_moc_output_path, ssc_header_output_path)
-    print(moc_cmd)
-    os.system(moc_cmd)
+    for class_entry, signal_entry in moc_model.iter_connectors():
+
+        sig_args = signal_entry['arguments']
+        signal_signature = signal_entry['connector']['signature']
+        signal_key = signal_entry['connector']['slot_key']
+
+        print('SIGNAL SIGNATURE: {}'.format(signal_signature))
+
+        ssc += '\n\n'
+        ssc += 'class {}_PySigSlotConnector : public PySigSlotConnector\n'.format(signal_signature)
+        ssc += '{\n'
+        ssc += '  Q_OBJECT\n\n'
+        ssc += 'public:\n'
+        ssc += '  {}_PySigSlotConnector():\n'.format(signal_signature)
+        ssc += '    PySigSlotConnector()\n'
+        ssc += '  {\n'
+        ssc += '  }\n\n'
+        ssc += 'public slots:\n'
+        ssc += '  void slot_{}\n'.format(signal_key)
+        ssc += '  {\n'
+
+        ssc += '    PY_Interp::acquireGIL();\n'
+        arg_idx = 0
+        for arg in sig_args:
+            ssc += '    py::object pobj{} = py::cast({});\n'.format(arg_idx, arg['name'])
+            arg_idx += 1
+
+        ssc += '    for (auto pslot : _pyslots)\n'
+        ssc += '    {\n'
+        ssc += '      if (pslot != nullptr)\n'
+        ssc += '      {\n'
+        ssc += '        pslot('
+
+        carg_list = []
+        arg_idx = 0
+        for arg in sig_args:
+            carg_list.append('pobj{}'.format(arg_idx))
+            arg_idx += 1
+
+        ssc += ', '.join(carg_list)
+        ssc += ');\n'
+
+        ssc += '      }\n'
+        ssc += '    }\n'
+        ssc += '  }\n'
+        ssc += '};\n'
+
+
+    _write_output(ssc_header_output_path, ssc)
+
+    # in the build the sigslot moc is a separate ninja edge, see the
+    # moc_pb11 rule. Standalone, moc runs here, or is queued on moc_pool
+    if ssc_moc_output_path:
+        moc_exec = moc_exec or get_moc_exec()
+        if moc_pool:
+            moc_pool.add(moc_exec, ssc_moc_output_path, ssc_header_output_path)
+
+        else:
+            pool = MocPool()
+            pool.add(moc_exec, ssc_moc_output_path, ssc_header_output_path)
+            pool.run()
 
 
     pybind11_info = benv_pybind11_info
@@ -334,7 +390,8 @@ def generate_pybind11_module(module_mode,
                     bind_object_name = class_name.upper()
 
 
-                cls_var = ''.join(random.choice(LOWERCASE_LETTERS) for i in range(4))
+                # named after the class so the output is the same every run
+                cls_var = 'obj_{}'.format(class_name)
                 cls_bind = '  {}* {} = new {}();\n'.format(class_name, cls_var, class_name)
                 cls_bind += '  RLP_LOG_DEBUG_MODULE({}, {}, "Instantiated" << {})\n'.format(modlib_group, modlib_name, cls_var)
                 cls_bind += '  PY_Interp::bindAppObject("{}", "{}_OBJ", {});\n'.format(
@@ -360,51 +417,10 @@ def generate_pybind11_module(module_mode,
                     class_name, class_name
                 )
 
-    for src_json_path in source_moc_jsons:
-
-        if os.path.isfile(src_json_path):
-            with open(src_json_path) as fh:
-                json_data = fh.read()
-                if not json_data:
-                    continue
-                cls_info = json.loads(json_data)
-                for class_entry in cls_info['classes']:
-                    
-                    # print(class_entry)
-                    # print('~~~~~~~~~~~~~~~~~~')
-
-                    for signal_entry in class_entry.get('signals', []):
-                        sig_args = signal_entry.get('arguments', [])
-                        if len(sig_args) == 0:
-                            continue
-                        
-                        # technically built-in support and does not require connector?
-                        if len(sig_args) == 1 and sig_args[0]['type'] in ['int', 'bool', 'qlonglong', 'QString', 'QVariantMap']:
-                            continue
-
-                        signal_signature = '{}_{}_{}'.format(
-                            class_entry['className'], signal_entry['name'],
-                            '_'.join([n['type'] for n in sig_args])
-                        )
-                        signal_signature = signal_signature.replace('*', '_ptr')
-                        sig_ok = True
-                        for bad_char in ['&', '<', '>', ':']:
-                            if bad_char in signal_signature:
-                                sig_ok = False
-                                break
-
-                        if not sig_ok:
-                            print('NOT SUPPORTED: {}'.format(signal_signature))
-                            continue
-
-                        signal_key = '{}_{}({})'.format(
-                            class_entry['className'], signal_entry['name'],
-                            ', '.join([n['type'] for n in sig_args])
-                        )
-
-                        t += '  PySignal::registerConnector("{}", new {}_PySigSlotConnector());\n'.format(
-                            signal_key, signal_signature
-                        )
+    for class_entry, signal_entry in moc_model.iter_connectors():
+        t += '  PySignal::registerConnector("{}", new {}_PySigSlotConnector());\n'.format(
+            signal_entry['connector']['register_key'], signal_entry['connector']['signature']
+        )
 
 
     t += '}\n\n'
@@ -419,153 +435,142 @@ def generate_pybind11_module(module_mode,
 
     t += '  m.def("init_module", &{}_initmodule, "Bootstrap Python Bindings");\n\n'.format(lib_name)
 
-    for src_json_path in source_moc_jsons:
-        
-        if os.path.isfile(src_json_path):
-            print(src_json_path)
-            with open(src_json_path) as fh:
-                json_data = fh.read()
-                if not json_data:
-                    continue
-                cls_info = json.loads(json_data)
-                for class_entry in cls_info['classes']:
-
-                    _seen_slots = set()
-                    class_name = class_entry['className']
-                    class_lib_prefix = modlib_name + '_'
-                    if 'lib_prefix' in benv_pybind11_info:
-                        class_lib_prefix = benv_pybind11_info['lib_prefix'] + '_'
-
-                    class_name_short = class_name.replace(class_lib_prefix, '')
-
-                    if class_name_short not in pybind11_classes:
-                        print('pybind11: SKIPPING: {}'.format(class_name_short))
-                        continue
-
-                    ctor_name = 'new_{}'.format(class_name)
-
-                    pb_class_info = pybind11_info['classes'][class_name_short]
-                    pb_class_slot_info = pb_class_info.get('slots', {})
-                    #
-                    # see if we need a std::shared_ptr holder or not
-                    #
-                    if 'holder' in pb_class_info:
-                        parent_entry = ''
-                        if 'parent' in pb_class_info:
-                            parent_entry = '{} /* parent */ , '.format(pb_class_info['parent'])
-
-                        t += '  py::class_<{}, {} std::shared_ptr<{}> >(m, "{}")\n'.format(
-                            class_name, parent_entry, class_name, class_name
-                        )
-
-                    elif 'trampoline' in pb_class_info:
-                        trampoline_name = pb_class_info['trampoline']
-
-                        t += '  py::class_<{}, {} /* trampoline */ >(m, "{}")\n'.format(
-                            class_name, trampoline_name, class_name
-                        )
-                    
-                    elif 'parent' in pb_class_info:
-                        parent_name = pb_class_info['parent']
+    for class_entry in moc_model.classes:
 
-                        t += '  py::class_<{}, {} /* parent */ >(m, "{}")\n'.format(
-                            class_name, parent_name, class_name
-                        )
+        _seen_slots = set()
+        class_name = class_entry['className']
+        class_lib_prefix = modlib_name + '_'
+        if 'lib_prefix' in benv_pybind11_info:
+            class_lib_prefix = benv_pybind11_info['lib_prefix'] + '_'
 
-                    else:
-                        t += '  py::class_<{}>(m, "{}")\n'.format(class_name, class_name)
+        class_name_short = class_name.replace(class_lib_prefix, '')
 
+        if class_name_short not in pybind11_classes:
+            print('pybind11: SKIPPING: {}'.format(class_name_short))
+            continue
 
-                    # get overloaded methods
-                    #
-                    meth_overload_map = {}
-                    for slot_entry in class_entry.get('slots', []):
-                        slot_name = slot_entry['name']
+        ctor_name = 'new_{}'.format(class_name)
 
-                        if slot_name in meth_overload_map:
-                            pass
-                            # NOTE: method overload disabled due to compile problems with default arguments
-                            # meth_overload_map[slot_name]['count'] += 1
-                        else:
-                            meth_overload_map[slot_name] = {
-                                'seen': 0,
-                                'count': 1
-                            }
+        pb_class_info = pybind11_info['classes'][class_name_short]
+        pb_class_slot_info = pb_class_info.get('slots', {})
+        #
+        # see if we need a std::shared_ptr holder or not
+        #
+        if 'holder' in pb_class_info:
+            parent_entry = ''
+            if 'parent' in pb_class_info:
+                parent_entry = '{} /* parent */ , '.format(pb_class_info['parent'])
 
+            t += '  py::class_<{}, {} std::shared_ptr<{}> >(m, "{}")\n'.format(
+                class_name, parent_entry, class_name, class_name
+            )
 
-                    for slot_entry in class_entry.get('slots', []):
-                        if slot_entry['access'] != 'public':
-                            continue
+        elif 'trampoline' in pb_class_info:
+            trampoline_name = pb_class_info['trampoline']
 
-                        slot_name = slot_entry['name']
-                        if slot_name in _seen_slots:
-                            continue
+            t += '  py::class_<{}, {} /* trampoline */ >(m, "{}")\n'.format(
+                class_name, trampoline_name, class_name
+            )
+        
+        elif 'parent' in pb_class_info:
+            parent_name = pb_class_info['parent']
+
+            t += '  py::class_<{}, {} /* parent */ >(m, "{}")\n'.format(
+                class_name, parent_name, class_name
+            )
 
-                        pb_slot_info = pb_class_slot_info.get(slot_name, {})
+        else:
+            t += '  py::class_<{}>(m, "{}")\n'.format(class_name, class_name)
 
-                        _seen_slots.add(slot_name)
 
-                        if slot_name == ctor_name:
-                            print('GOT CTOR: {}'.format(slot_name))
+        # get overloaded methods
+        #
+        meth_overload_map = {}
+        for slot_entry in class_entry.get('slots', []):
+            slot_name = slot_entry['name']
 
-                            if 'trampoline' in pb_class_info:
-                                t += '    .def(py::init_alias< ' # &{}::{}))\n'.format(class_name, slot_name)
-                                for arg in slot_entry['arguments']:
-                                    t += arg['type']
-                                    t += ' '
+            if slot_name in meth_overload_map:
+                pass
+                # NOTE: method overload disabled due to compile problems with default arguments
+                # meth_overload_map[slot_name]['count'] += 1
+            else:
+                meth_overload_map[slot_name] = {
+                    'seen': 0,
+                    'count': 1
+                }
 
-                                t += '>())\n'
-                            else:
 
-                                m = genfunc.Method.make(class_name, slot_entry, pb_slot_info)
-                                t += m.gen()
+        for slot_entry in class_entry.get('slots', []):
+            if slot_entry['access'] != 'public':
+                continue
 
-                        else:
-                            # print('GOT: {}::{}'.format(class_name, slot_name))
-                            
-                            retval_policy = pb_slot_info.get('return_value_policy')
+            slot_name = slot_entry['name']
+            if slot_name in _seen_slots:
+                continue
 
-                            if '*' in slot_entry['returnType']:
-                                retval_policy = 'reference'
+            pb_slot_info = pb_class_slot_info.get(slot_name, {})
 
+            _seen_slots.add(slot_name)
 
-                            # NOTE: overload setup disabled due to compiling problems with default arguments
-                            if pb_slot_info.get('fulldef'): # meth_overload_map[slot_name]['count'] > 1:
-                                print('FULLDEF METHOD')
+            if slot_name == ctor_name:
+                print('GOT CTOR: {}'.format(slot_name))
 
-                                meth_overload_map[slot_name]['seen'] += 1
+                if 'trampoline' in pb_class_info:
+                    t += '    .def(py::init_alias< ' # &{}::{}))\n'.format(class_name, slot_name)
+                    for arg in slot_entry['arguments']:
+                        t += arg['type']
+                        t += ' '
 
-                                t += '    .def("{}",\n'.format(slot_name)
+                    t += '>())\n'
+                else:
+
+                    m = genfunc.Method.make(class_name, slot_entry, pb_slot_info)
+                    t += m.gen()
+
+            else:
+                # print('GOT: {}::{}'.format(class_name, slot_name))
+                
+                retval_policy = pb_slot_info.get('return_value_policy')
 
-                                t += '         static_cast<{} ({}::*)('.format(slot_entry['returnType'], class_name)
-                                t += ', '.join([arg['type'] for arg in slot_entry.get('arguments', [])])
-                                t += ')>(&{}::{})\n'.format(class_name, slot_name)
+                if '*' in slot_entry['returnType']:
+                    retval_policy = 'reference'
 
-                                if retval_policy:
-                                    t += '         ,py::return_value_policy::{}\n'.format(retval_policy)
 
-                                t += '    )\n'
-                            else:
+                # NOTE: overload setup disabled due to compiling problems with default arguments
+                if pb_slot_info.get('fulldef'): # meth_overload_map[slot_name]['count'] > 1:
+                    print('FULLDEF METHOD')
 
-                                m = genfunc.Method.make(class_name, slot_entry, pb_slot_info)
-                                t += m.gen()
+                    meth_overload_map[slot_name]['seen'] += 1
 
-                                
+                    t += '    .def("{}",\n'.format(slot_name)
 
-                    for signal_entry in class_entry.get('signals', []):
+                    t += '         static_cast<{} ({}::*)('.format(slot_entry['returnType'], class_name)
+                    t += ', '.join([arg['type'] for arg in slot_entry.get('arguments', [])])
+                    t += ')>(&{}::{})\n'.format(class_name, slot_name)
+
+                    if retval_policy:
+                        t += '         ,py::return_value_policy::{}\n'.format(retval_policy)
+
+                    t += '    )\n'
+                else:
+
+                    m = genfunc.Method.make(class_name, slot_entry, pb_slot_info)
+                    t += m.gen()
+
+                    
 
-                        sig_args = signal_entry.get('arguments', [])
-                        sig_arg_type = ", ".join([arg['type'] for arg in sig_args])
+        for signal_entry in class_entry.get('signals', []):
 
-                        sig_name = signal_entry['name']
+            sig_arg_type = signal_entry['arg_types']
+            sig_name = signal_entry['name']
 
-                        t += '    .def_property_readonly("{}",\n'.format(sig_name)
-                        t += '        [](const {} &obj) {{\n'.format(class_name)
-                        t += '            return new PySignal(&obj, "{}({})");\n'.format(sig_name, sig_arg_type)
-                        t += '        }\n'
-                        t += '     )\n'
+            t += '    .def_property_readonly("{}",\n'.format(sig_name)
+            t += '        [](const {} &obj) {{\n'.format(class_name)
+            t += '            return new PySignal(&obj, "{}({})");\n'.format(sig_name, sig_arg_type)
+            t += '        }\n'
+            t += '     )\n'
 
-                    t += '  ;\n\n'
+        t += '  ;\n\n'
 
     t += '}\n'
 
@@ -573,10 +578,7 @@ def generate_pybind11_module(module_mode,
     # print(t)
     # print('')
 
-    cpp_output_path = cpp_output_path
-    with open(cpp_output_path, 'w') as wfh:
-        wfh.write(t)
-        print('Wrote {}'.format(cpp_output_path))
+    _write_output(cpp_output_path, t)
 
 
 
@@ -0,0 +1,171 @@
+
+import os
+import json
+import hashlib
+import tempfile
+
+
+# single argument signals of these types are handled by PySignal directly,
+# they don't need a generated connector
+BUILTIN_SIGNAL_TYPES = ['int', 'bool', 'qlonglong', 'QString', 'QVariantMap']
+
+
+class MocModel(object):
+    '''
+    Classes, slots and signals from the moc JSON output of a library, loaded
+    once for all the generated pybind11 outputs. Signal signatures used by
+    the sigslot connectors are computed here as well.
+
+    The model is a plain dict so it can be cached on disk. The cache is keyed
+    on the hash of every moc JSON, so an unchanged library costs one parse
+    '''
+
+    VERSION = 1
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def classes(self):
+        return self.data['classes']
+
+    def iter_connectors(self):
+        '''
+        Yields (class_entry, signal_entry) for every signal that gets a
+        PySigSlotConnector
+        '''
+
+        for class_entry in self.classes:
+            for signal_entry in class_entry['signals']:
+                if signal_entry['connector']:
+                    yield (class_entry, signal_entry)
+
+
+    @staticmethod
+    def _build_connector(class_name, signal_entry):
+
+        sig_args = signal_entry.get('arguments', [])
+        if len(sig_args) == 0:
+            return None
+
+        if len(sig_args) == 1 and sig_args[0]['type'] in BUILTIN_SIGNAL_TYPES:
+            return None
+
+        signal_signature = '{}_{}_{}'.format(
+            class_name, signal_entry['name'],
+            '_'.join([n['type'] for n in sig_args])
+        )
+        signal_signature = signal_signature.replace('*', '_ptr')
+
+        for bad_char in ['&', '<', '>', ':']:
+            if bad_char in signal_signature:
+                print('NOT SUPPORTED: {}'.format(signal_signature))
+                return None
+
+        return {
+            'signature': signal_signature,
+
+            # connector slot declaration
+            'slot_key': '{}({})'.format(
+                signal_entry['name'],
+                ', '.join(['{} {}'.format(n['type'], n['name']) for n in sig_args])
+            ),
+
+            # PySignal::registerConnector() key
+            'register_key': '{}_{}({})'.format(
+                class_name, signal_entry['name'],
+                ', '.join([n['type'] for n in sig_args])
+            )
+        }
+
+
+    @classmethod
+    def build(cls, moc_json_list):
+        '''
+        moc_json_list is a list of the parsed moc JSON of each header
+        '''
+
+        classes = []
+        for moc_info in moc_json_list:
+            for class_entry in moc_info['classes']:
+
+                signals = []
+                for signal_entry in class_entry.get('signals', []):
+                    sig_args = signal_entry.get('arguments', [])
+                    signals.append({
+                        'name': signal_entry['name'],
+                        'arguments': sig_args,
+                        'arg_types': ', '.join([arg['type'] for arg in sig_args]),
+                        'connector': cls._build_connector(class_entry['className'], signal_entry)
+                    })
+
+                classes.append({
+                    'className': class_entry['className'],
+                    'slots': class_entry.get('slots', []),
+                    'signals': signals
+                })
+
+        return cls({'classes': classes})
+
+
+    @classmethod
+    def load(cls, source_moc_jsons, cache_path=None):
+        '''
+        Load the model for a list of moc JSON paths. Missing and empty files
+        are skipped
+        '''
+
+        json_contents = []
+        key_hash = hashlib.sha1(str(cls.VERSION).encode('utf-8'))
+        for src_json_path in source_moc_jsons:
+            if not os.path.isfile(src_json_path):
+                continue
+
+            with open(src_json_path, 'rb') as fh:
+                json_data = fh.read()
+
+            if not json_data:
+                continue
+
+            key_hash.update(src_json_path.encode('utf-8'))
+            key_hash.update(hashlib.sha1(json_data).digest())
+            json_contents.append(json_data)
+
+        cache_key = key_hash.hexdigest()
+
+        if cache_path and os.path.isfile(cache_path):
+            try:
+                with open(cache_path) as fh:
+                    cache_entry = json.load(fh)
+
+                if cache_entry.get('key') == cache_key:
+                    return cls(cache_entry['model'])
+
+            except Exception as e:
+                print('Warning: could not read moc model cache {} - {}: {}'.format(
+                    cache_path, e.__class__.__name__, e))
+
+        result = cls.build([json.loads(json_data) for json_data in json_contents])
+
+        if cache_path:
+            result._save(cache_path, cache_key)
+
+        return result
+
+
+    def _save(self, cache_path, cache_key):
+
+        cache_dir = os.path.dirname(cache_path) or '.'
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+
+            temp_fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.json')
+            with os.fdopen(temp_fd, 'w') as wfh:
+                wfh.write(json.dumps({'key': cache_key, 'model': self.data}))
+
+            os.replace(temp_path, cache_path)
+
+        except OSError as e:
+            print('Warning: could not write moc model cache {} - {}: {}'.format(
+                cache_path, e.__class__.__name__, e))
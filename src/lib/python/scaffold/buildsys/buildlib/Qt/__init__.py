@@ -38,7 +38,11 @@ class MocBuilder(Builder):
 
         return os_list
 
-    def _gen_cmd(self):
+    def gen_moc_cmd(self, output_json=True):
+        '''
+        moc command for a rule, with $in and $out. Also used for the sigslot
+        header generated by PyBind11
+        '''
 
         env = self.benv.env
 
@@ -56,7 +60,10 @@ class MocBuilder(Builder):
         if os.name == 'nt':
             moc_exec_path += '.exe'
 
-        moc_exec_path += ' --output-json {} -o $out $in'.format(moc_defines)
+        if output_json:
+            moc_exec_path += ' --output-json'
+
+        moc_exec_path += ' {} -o $out $in'.format(moc_defines)
 
         return moc_exec_path
 
@@ -67,7 +74,7 @@ class MocBuilder(Builder):
 
         n  = '\n'
         n += 'rule moc\n'
-        n += '    command = {}\n\n'.format(self._gen_cmd())
+        n += '    command = {}\n\n'.format(self.gen_moc_cmd())
 
         return n
 
@@ -120,7 +127,7 @@ class RCCBuilder(Builder):
             sc_rcc_cmd = r'C:\Users\justi\dev\scaffold_root\scninja\src\bin\sc_rcc.bat'
 
         cmd = '{} --rcc {} --root_dir {} --output $out --input $in\n\n'.format(
-            sc_rcc_cmd, rcc_exec_path, self.benv.root_dir
+            buildsys_util.get_tool_cmd(sc_rcc_cmd), rcc_exec_path, self.benv.root_dir
         )
 
         return cmd
@@ -854,7 +861,7 @@ class WindowsQtLib(QtLib):
 
 class AndroidTermuxQtLib(QtLib):
     def _GetQtDir(self, thirdparty_libs):
-        return ('6.8', os.getenv('PREFIX'))
+        return ('6.8', buildsys_util.getenv('PREFIX'))
         
     def init(self, benv):
         QtLib.init(self, benv)
@@ -9,14 +9,15 @@ def get_lib_info(benv):
     if 'required_libs' not in benv.interface:
         return
 
-    lib_paths = set()
-    inc_paths = set()
+    # lists rather than sets, so generated command lines have a stable order
+    lib_paths = []
+    inc_paths = []
     libs = [] # preserve order
-    lib_fullpaths = set()
-    defines = set()
+    lib_fullpaths = []
+    defines = []
 
     sset_feature_define = 'REVLENS_SSET_{}'.format(benv.sset_name.upper())
-    defines.add(sset_feature_define)
+    defines.append(sset_feature_define)
 
     # required_libs - libs internal to this product
     #
@@ -31,8 +32,11 @@ def get_lib_info(benv):
         sset_lib_path = os.path.join(sset_dir, 'lib')
         sset_inc_path = os.path.join(sset_dir, 'include')
 
-        lib_paths.add(sset_lib_path)
-        inc_paths.add(sset_inc_path)
+        if sset_lib_path not in lib_paths:
+            lib_paths.append(sset_lib_path)
+
+        if sset_inc_path not in inc_paths:
+            inc_paths.append(sset_inc_path)
 
         shlib_name = '{}{}{}'.format(
             buildsys_globals.senv_config['site_name'].capitalize(),
@@ -47,7 +51,8 @@ def get_lib_info(benv):
             lib_prefix = ''
         lib_fullpath = os.path.join(sset_lib_path, '{}{}.{}'.format(
             lib_prefix, shlib_name, benv.env['SHLIBSUFFIX']))
-        lib_fullpaths.add(lib_fullpath)
+        if lib_fullpath not in lib_fullpaths:
+            lib_fullpaths.append(lib_fullpath)
 
 
         # for DECL_IMPORT / DECL_EXPORT handling
@@ -57,7 +62,8 @@ def get_lib_info(benv):
             l=lib_name.upper()
         )
 
-        defines.add(lib_define)
+        if lib_define not in defines:
+            defines.append(lib_define)
 
 
     return (defines, lib_paths, inc_paths, libs, lib_fullpaths)
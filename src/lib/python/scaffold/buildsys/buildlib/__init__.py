@@ -36,6 +36,14 @@ class Builder(object):
         return ''
 
 
+    def write_build(self, writer):
+        '''
+        Write build edges to a NinjaWriter. Builders that emit many edges
+        override this, the default writes the result of gen_build()
+        '''
+        writer.write(self.gen_build())
+
+
     def to_ninja(self):
         raise NotImplementedError
 
@@ -103,6 +103,11 @@ def _configure_builders(benv):
     b_libs = benv.register_builder(bl_sset.builder('DependentLibs'))
     bl_reqs.append(b_libs)
 
+    # precompiled before any object, may include anything the objects do
+    if 'precompiled_header' in benv.interface:
+        b_pch = benv.register_builder(bl_opsys.builder('PrecompiledHeader'), *bl_reqs)
+        bl_reqs.append(b_pch)
+
     b_o = benv.register_builder(bl_opsys.builder('Object'), *bl_reqs)
     
     return b_o
@@ -124,8 +129,7 @@ def configure_builders(benv):
         rules_path = 'build/gen/{}/rules.ninja'.format(
             scaffold.variant.get_variant('platform_target'))
 
-        with open(rules_path, 'w') as wfh:
-            wfh.write(r)
+        buildsys_util.write_output(rules_path, r)
 
         _RULES_DONE = True
 
@@ -0,0 +1,369 @@
+#
+# Copyright 2014-2024 Justin Ottley
+#
+# Licensed under the terms set forth in the LICENSE.txt file
+#
+# Local compile cache, used as a compiler launcher in generated cxx / cc rules
+# when senv_config['compile_cache'] is "builtin". Only uses the standard
+# library, it is run by ninja directly with this file path:
+#
+#   python compile_cache.py [--dir DIR] [--max_size_mb N] -- g++ -o x.o -c x.cpp
+#
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+
+
+DEFAULT_MAX_SIZE_MB = 5120
+
+# run eviction at most this often, in seconds
+CLEANUP_INTERVAL = 60
+
+# evict down to this fraction of the max size
+CLEANUP_TARGET = 0.9
+
+
+def get_default_cache_dir():
+    return os.path.join(os.path.expanduser('~'), '.cache', 'scaffold', 'compile_cache')
+
+
+class CompileCache(object):
+    '''
+    Content addressed object cache. The key is a hash of the preprocessed
+    source, the full compile command, the working directory and the compiler
+    binary, so switching branches back and forth reuses objects. Entries are
+    evicted least recently used first when the cache grows past max_size.
+
+    Commands that can't be preprocessed (e.g. using a precompiled header) are
+    run without caching
+    '''
+
+    VERSION = 1
+
+    def __init__(self, cache_dir=None, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        self.cache_dir = cache_dir or get_default_cache_dir()
+        self.max_size = max_size_mb * 1024 * 1024
+
+
+    @staticmethod
+    def is_msvc(cmd):
+        compiler_name = os.path.basename(cmd[0]).lower()
+        return compiler_name in ['cl', 'cl.exe', 'clang-cl', 'clang-cl.exe']
+
+
+    @classmethod
+    def parse_cmd(cls, cmd):
+        '''
+        Returns (object path, depfile path or None), or None if the command
+        is not a single object compile this cache can handle
+        '''
+
+        output_path = None
+        depfile_path = None
+        compile_only = False
+
+        msvc = cls.is_msvc(cmd)
+
+        for idx, arg in enumerate(cmd[1:], 1):
+
+            if msvc:
+                if arg.startswith('/Fo'):
+                    output_path = arg[3:]
+
+                elif arg == '/c':
+                    compile_only = True
+
+                elif arg.startswith('/Yc') or arg.startswith('/Yu'):
+                    return None
+
+            else:
+                if arg == '-o' and idx + 1 < len(cmd):
+                    output_path = cmd[idx + 1]
+
+                elif arg == '-MF' and idx + 1 < len(cmd):
+                    depfile_path = cmd[idx + 1]
+
+                elif arg == '-c':
+                    compile_only = True
+
+                elif arg == '-x':
+                    return None
+
+        if not output_path or not compile_only:
+            return None
+
+        return (output_path, depfile_path)
+
+
+    @classmethod
+    def get_preprocess_cmd(cls, cmd):
+
+        result = [cmd[0]]
+
+        if cls.is_msvc(cmd):
+            for arg in cmd[1:]:
+                if arg.startswith('/Fo') or arg in ['/c', '/showIncludes']:
+                    continue
+
+                result.append(arg)
+
+            result.append('/E')
+
+        else:
+            skip_next = False
+            for arg in cmd[1:]:
+                if skip_next:
+                    skip_next = False
+                    continue
+
+                if arg in ['-o', '-MF', '-MT', '-MQ']:
+                    skip_next = True
+                    continue
+
+                if arg in ['-c', '-MMD', '-MD']:
+                    continue
+
+                result.append(arg)
+
+            result.append('-E')
+
+        return result
+
+
+    @staticmethod
+    def _get_compiler_info(compiler):
+
+        compiler_path = shutil.which(compiler) or compiler
+        try:
+            compiler_stat = os.stat(compiler_path)
+            return [compiler_path, compiler_stat.st_mtime_ns, compiler_stat.st_size]
+
+        except OSError:
+            return [compiler_path]
+
+
+    def get_key(self, cmd):
+        '''
+        Cache key for cmd, or None if it could not be preprocessed
+        '''
+
+        proc = subprocess.run(
+            self.get_preprocess_cmd(cmd),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+        if proc.returncode != 0:
+            return None
+
+        key_info = {
+            'version': self.VERSION,
+            'cmd': cmd,
+            'cwd': os.getcwd(),
+            'compiler': self._get_compiler_info(cmd[0])
+        }
+
+        key_hash = hashlib.sha1(json.dumps(key_info, sort_keys=True).encode('utf-8'))
+        key_hash.update(proc.stdout)
+
+        return key_hash.hexdigest()
+
+
+    def _get_entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+
+    def restore(self, key, output_path, depfile_path):
+        '''
+        Copy a cached object to output_path and replay the compiler output.
+        Returns False if key is not in the cache
+        '''
+
+        entry_dir = self._get_entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, 'meta.json')) as fh:
+                meta = json.load(fh)
+
+            shutil.copyfile(os.path.join(entry_dir, 'object'), output_path)
+
+            if depfile_path:
+                shutil.copyfile(os.path.join(entry_dir, 'depfile'), depfile_path)
+
+            # most recently used
+            os.utime(entry_dir)
+
+        except (OSError, ValueError):
+            return False
+
+        sys.stdout.write(meta.get('stdout', ''))
+        sys.stderr.write(meta.get('stderr', ''))
+
+        return True
+
+
+    def store(self, key, output_path, depfile_path, stdout, stderr):
+
+        entry_dir = self._get_entry_dir(key)
+        if os.path.isdir(entry_dir):
+            return
+
+        entry_parent_dir = os.path.dirname(entry_dir)
+        os.makedirs(entry_parent_dir, exist_ok=True)
+
+        # written to a temp dir first, so other processes never see a partial entry
+        temp_dir = tempfile.mkdtemp(dir=entry_parent_dir, prefix='.tmp_')
+        try:
+            shutil.copyfile(output_path, os.path.join(temp_dir, 'object'))
+            if depfile_path:
+                shutil.copyfile(depfile_path, os.path.join(temp_dir, 'depfile'))
+
+            with open(os.path.join(temp_dir, 'meta.json'), 'w') as wfh:
+                wfh.write(json.dumps({'stdout': stdout, 'stderr': stderr}))
+
+            os.rename(temp_dir, entry_dir)
+
+        except OSError:
+            # lost a race with another process storing the same entry
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+    def cleanup(self, force=False):
+        '''
+        Evict least recently used entries if the cache is over max size.
+        Runs at most every CLEANUP_INTERVAL seconds unless force is True
+        '''
+
+        stamp_path = os.path.join(self.cache_dir, '.last_cleanup')
+        if not force:
+            try:
+                if time.time() - os.stat(stamp_path).st_mtime < CLEANUP_INTERVAL:
+                    return
+
+            except OSError:
+                pass
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(stamp_path, 'w') as wfh:
+            wfh.write('')
+
+        entries = []
+        total_size = 0
+        for prefix_entry in os.scandir(self.cache_dir):
+            if not prefix_entry.is_dir():
+                continue
+
+            for entry in os.scandir(prefix_entry.path):
+                if entry.name.startswith('.'):
+                    continue
+
+                entry_size = 0
+                for file_entry in os.scandir(entry.path):
+                    entry_size += file_entry.stat().st_size
+
+                entries.append((entry.stat().st_mtime, entry_size, entry.path))
+                total_size += entry_size
+
+        if total_size <= self.max_size:
+            return
+
+        target_size = self.max_size * CLEANUP_TARGET
+        for _, entry_size, entry_path in sorted(entries):
+            shutil.rmtree(entry_path, ignore_errors=True)
+
+            total_size -= entry_size
+            if total_size <= target_size:
+                break
+
+
+    def run(self, cmd):
+        '''
+        Run compile command cmd through the cache. Returns the exit code
+        '''
+
+        cmd_info = self.parse_cmd(cmd)
+        key = None
+        if cmd_info and not os.getenv('SC_COMPILE_CACHE_DISABLE'):
+            key = self.get_key(cmd)
+
+        if key is None:
+            return subprocess.call(cmd)
+
+        output_path, depfile_path = cmd_info
+        if self.restore(key, output_path, depfile_path):
+            return 0
+
+        proc = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+
+        sys.stdout.write(proc.stdout)
+        sys.stderr.write(proc.stderr)
+
+        if proc.returncode == 0:
+            try:
+                self.store(key, output_path, depfile_path, proc.stdout, proc.stderr)
+                self.cleanup()
+
+            except OSError as e:
+                sys.stderr.write('compile cache: could not store {} - {}: {}\n'.format(
+                    output_path, e.__class__.__name__, e))
+
+        return proc.returncode
+
+
+def get_launcher_cmd(cache_dir=None, max_size_mb=None):
+    '''
+    Command prefix for generated rules to run a compiler through this cache
+    '''
+
+    result = [sys.executable, os.path.abspath(__file__)]
+    if cache_dir:
+        result.extend(['--dir', cache_dir])
+
+    if max_size_mb:
+        result.extend(['--max_size_mb', str(max_size_mb)])
+
+    result.append('--')
+
+    return ' '.join(['"{}"'.format(a) if ' ' in a else a for a in result])
+
+
+def main():
+
+    parser = argparse.ArgumentParser('compile_cache')
+    parser.add_argument('--dir', default=None, help='cache directory')
+    parser.add_argument('--max_size_mb', default=DEFAULT_MAX_SIZE_MB, type=int)
+    parser.add_argument('--cleanup', default=False, action='store_true',
+        help='evict entries over the max size and exit')
+    parser.add_argument('cmd', nargs=argparse.REMAINDER)
+
+    args = parser.parse_args()
+
+    cmd = args.cmd
+    if cmd and cmd[0] == '--':
+        cmd = cmd[1:]
+
+    cache = CompileCache(args.dir, args.max_size_mb)
+
+    if args.cleanup:
+        cache.cleanup(force=True)
+        return 0
+
+    if not cmd:
+        parser.error('no compile command')
+
+    return cache.run(cmd)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
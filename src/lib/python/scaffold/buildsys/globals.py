@@ -17,6 +17,13 @@ senv_config = {}
 
 build_time = None
 
+# scgen generation manifest, see manifest.GenManifest
+gen_manifest = None
+
+# installed file path -> install edge that produces it, see
+# util.claim_install_outputs()
+install_outputs = {}
+
 
 # TODO FIXME HACK
 _RULES_DONE = False
@@ -45,7 +52,20 @@ def _init_senv_config():
         'dir.rlp_root': rlp_root,
         'dir.thirdbase_root': thirdbase_root,
         'dir.thirdbase': thirdbase_dir,
-        'qt_version': qt_version
+        'qt_version': qt_version,
+
+        # compiler launcher for cxx / cc rules: "builtin" for the local cache
+        # in compile_cache.py, any other value is used as the launcher command,
+        # e.g. "ccache"
+        'compile_cache': os.getenv('SC_COMPILE_CACHE'),
+        'compile_cache.dir': os.getenv('SC_COMPILE_CACHE_DIR'),
+        'compile_cache.max_size_mb': os.getenv('SC_COMPILE_CACHE_MAX_SIZE_MB'),
+
+        # how sc_install populates inst/: copy, hardlink, reflink or symlink
+        'install_mode': os.getenv('SC_INSTALL_MODE', 'copy'),
+
+        # run install / codegen rules through the sc_worker server, see worker.py
+        'worker': os.getenv('SC_WORKER')
     })
 
 
@@ -0,0 +1,179 @@
+#
+# Copyright 2014-2024 Justin Ottley
+#
+# Licensed under the terms set forth in the LICENSE.txt file
+#
+# In process file installer used by sc_install
+#
+
+import os
+import shutil
+
+try:
+    import fcntl
+
+except ImportError: # Windows
+    fcntl = None
+
+
+INSTALL_MODES = ['copy', 'hardlink', 'reflink', 'symlink']
+
+# linux/fs.h
+FICLONE = 0x40049409
+
+
+def is_unchanged(src_path, dest_path, install_mode='copy'):
+    '''
+    True if dest_path is an earlier install of src_path with install_mode.
+    Copies keep the mtime, so a matching size and mtime means the contents
+    are the same
+    '''
+
+    if install_mode == 'symlink':
+        return (os.path.islink(dest_path) and
+                os.readlink(dest_path) == os.path.abspath(src_path))
+
+    if os.path.islink(dest_path):
+        return False
+
+    try:
+        src_stat = os.stat(src_path)
+        dest_stat = os.stat(dest_path)
+
+    except OSError:
+        return False
+
+    same_file = (src_stat.st_ino == dest_stat.st_ino and
+                 src_stat.st_dev == dest_stat.st_dev)
+
+    size_mtime_same = (src_stat.st_size == dest_stat.st_size and
+                       src_stat.st_mtime_ns == dest_stat.st_mtime_ns)
+
+    if install_mode == 'hardlink':
+        # across filesystems hardlinks fall back to a copy
+        return same_file or (src_stat.st_dev != dest_stat.st_dev and size_mtime_same)
+
+    # a hardlink from a previous install, needs to be replaced by a copy
+    if same_file:
+        return False
+
+    return size_mtime_same
+
+
+def reflink_file(src_path, dest_path):
+    '''
+    Copy-on-write clone of src_path (btrfs, xfs). Falls back to a regular
+    copy where the filesystem or platform doesn't support it
+    '''
+
+    if fcntl is not None:
+        try:
+            with open(src_path, 'rb') as src_fh, open(dest_path, 'wb') as dest_fh:
+                fcntl.ioctl(dest_fh.fileno(), FICLONE, src_fh.fileno())
+
+            shutil.copystat(src_path, dest_path)
+            return
+
+        except OSError:
+            pass
+
+    shutil.copy2(src_path, dest_path)
+
+
+class Installer(object):
+    '''
+    Batch of (src, dest) file installs. All destination directories are
+    created in one pass before anything is copied, and files whose size and
+    mtime are unchanged since the last install are skipped.
+
+    install_mode is one of INSTALL_MODES. Copies go through shutil.copy2(),
+    which uses the platform fast copy (sendfile / copy_file_range on Linux,
+    fcopyfile on macOS) where available. Hardlinks and symlinks fall back to
+    a copy if they can't be made, e.g. across filesystems
+    '''
+
+    def __init__(self, install_mode='copy', verbose=False):
+
+        if install_mode not in INSTALL_MODES:
+            raise ValueError('invalid install mode: {}'.format(install_mode))
+
+        self.install_mode = install_mode
+        self.verbose = verbose
+
+        self._entries = []
+
+        self.installed = 0
+        self.skipped = 0
+
+
+    def add(self, src_path, dest_path):
+        self._entries.append((src_path, dest_path))
+
+
+    def add_to_dir(self, src_path, dest_dir):
+        self.add(src_path, os.path.join(dest_dir, os.path.basename(src_path)))
+
+
+    def _make_dirs(self):
+
+        dest_dirs = set()
+        for _, dest_path in self._entries:
+            dest_dirs.add(os.path.dirname(dest_path))
+
+        # parents sort first, makedirs() is a no-op for those that already exist
+        for dest_dir in sorted(dest_dirs):
+            if dest_dir and not os.path.isdir(dest_dir):
+                print('Creating {}'.format(dest_dir))
+                os.makedirs(dest_dir, exist_ok=True)
+
+
+    def install_file(self, src_path, dest_path):
+
+        if is_unchanged(src_path, dest_path, self.install_mode):
+            self.skipped += 1
+            return False
+
+        if self.verbose:
+            print('{} -> {}'.format(src_path, dest_path))
+
+        # a link or copy from a different install mode may be in the way
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+
+        try:
+            if self.install_mode == 'hardlink':
+                os.link(src_path, dest_path)
+
+            elif self.install_mode == 'symlink':
+                os.symlink(os.path.abspath(src_path), dest_path)
+
+            elif self.install_mode == 'reflink':
+                reflink_file(src_path, dest_path)
+
+            else:
+                shutil.copy2(src_path, dest_path)
+
+        except OSError as e:
+            if self.install_mode == 'copy':
+                raise
+
+            print('Warning: could not {} {}, copying - {}: {}'.format(
+                self.install_mode, dest_path, e.__class__.__name__, e))
+
+            shutil.copy2(src_path, dest_path)
+
+        self.installed += 1
+
+        return True
+
+
+    def run(self):
+
+        self._make_dirs()
+
+        for src_path, dest_path in self._entries:
+            self.install_file(src_path, dest_path)
+
+        self._entries = []
+
+        print('Installed {} file(s), {} unchanged'.format(self.installed, self.skipped))
@@ -0,0 +1,366 @@
+#
+# Copyright 2014-2024 Justin Ottley
+#
+# Licensed under the terms set forth in the LICENSE.txt file
+#
+
+import os
+import sys
+import json
+import hashlib
+import logging
+
+from . import util as buildsys_util
+
+
+class GenRecord(object):
+    '''
+    Inputs and outputs of one Subdir() subtree, collected while it is generated
+    '''
+
+    def __init__(self, relpath, context_hash):
+        self.relpath = relpath
+        self.context_hash = context_hash
+
+        self.scripts = {}
+        self.dirs = {}
+        self.files = {}
+        self.env = {}
+        self.outputs = {}
+
+        self.cacheable = True
+
+    def to_entry(self, side_effects):
+        return {
+            'context_hash': self.context_hash,
+            'scripts': self.scripts,
+            'dirs': self.dirs,
+            'files': self.files,
+            'env': self.env,
+            'outputs': self.outputs,
+            'side_effects': side_effects
+        }
+
+
+class GenManifest(object):
+    '''
+    Generation manifest for scgen. Records for every Subdir() subtree:
+
+    - the content hash of every ScaffoldScript exec'd in the subtree
+    - inputs read while generating (walked directories, probed thirdparty
+      paths, git metadata) by mtime, and env. variables read by buildlibs
+    - the hash of every ninja fragment written
+    - side effects on the rest of the tree (sc_config / exports entries, ninja
+      text accumulated into the parent software set, rules written)
+
+    On the next run, a subtree whose record is still valid is not exec'd, its
+    side effects are replayed instead. Fragments are only rewritten when their
+    bytes change, so ninja does not see new mtimes for unchanged files.
+
+    Everything is regenerated when the global key changes: platform target,
+    commandline args, senv_config, python version or the buildsys code itself
+    '''
+
+    VERSION = 2
+
+    FILENAME = '.scgen_manifest.json'
+
+    def __init__(self, gen_dir, global_info, enabled=True):
+
+        self.LOG = logging.getLogger('{}.{}'.format(self.__class__.__module__, self.__class__.__name__))
+
+        self.path = os.path.join(gen_dir, self.FILENAME)
+        self.global_key = self._get_global_key(global_info)
+
+        # if not enabled, nothing is reused, but a new manifest is still written
+        self.enabled = enabled
+
+        self._prev_entries = {}
+        self._entries = {}
+        self._active = []
+
+        # list of (path, contents) while outputs are deferred, see begin_deferred()
+        self.deferred_outputs = None
+
+        self._load()
+
+
+    @staticmethod
+    def hash_str(contents):
+        if isinstance(contents, str):
+            contents = contents.encode('utf-8')
+
+        return hashlib.sha1(contents).hexdigest()
+
+
+    @staticmethod
+    def _get_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+
+        except OSError:
+            return None
+
+
+    def _get_global_key(self, global_info):
+
+        # any change to the generator code invalidates everything
+        buildsys_dir = os.path.dirname(os.path.abspath(__file__))
+        code_info = []
+        for root, dirs, files in os.walk(buildsys_dir):
+            dirs.sort()
+            for file_entry in sorted(files):
+                if not file_entry.endswith('.py'):
+                    continue
+
+                file_path = os.path.join(root, file_entry)
+                file_stat = os.stat(file_path)
+                code_info.append([file_path, file_stat.st_mtime_ns, file_stat.st_size])
+
+        key_info = {
+            'version': self.VERSION,
+            'python': list(sys.version_info[:2]),
+            'global': global_info,
+            'code': code_info
+        }
+
+        return self.hash_str(json.dumps(key_info, sort_keys=True, default=str))
+
+
+    def _load(self):
+
+        if not self.enabled or not os.path.isfile(self.path):
+            return
+
+        try:
+            with open(self.path) as fh:
+                manifest_data = json.load(fh)
+
+        except Exception as e:
+            self.LOG.warning('could not read generation manifest {} - {}: {}'.format(
+                self.path, e.__class__.__name__, e))
+            return
+
+        if manifest_data.get('global_key') != self.global_key:
+            print('Generation manifest out of date, regenerating everything')
+            return
+
+        self._prev_entries = manifest_data.get('entries', {})
+
+
+    def save(self):
+
+        manifest_data = {
+            'global_key': self.global_key,
+            'entries': self._entries
+        }
+
+        # NOTE: not sorted, side effects are replayed in recorded order
+        buildsys_util.write_if_changed(self.path, json.dumps(manifest_data, indent=1))
+
+
+    #
+    # Recording
+    #
+
+    def begin(self, relpath, context_hash):
+        record = GenRecord(relpath, context_hash)
+        self._active.append(record)
+
+        return record
+
+    def end(self, record, side_effects):
+
+        assert(self._active[-1] is record)
+        self._active.pop()
+
+        if record.cacheable:
+            self._entries[record.relpath] = record.to_entry(side_effects)
+
+            # the parent subtree includes everything this one recorded
+            for parent_record in self._active:
+                parent_record.scripts.update(record.scripts)
+                parent_record.dirs.update(record.dirs)
+                parent_record.files.update(record.files)
+                parent_record.env.update(record.env)
+                parent_record.outputs.update(record.outputs)
+
+        else:
+            self.set_uncacheable()
+
+    def abort(self, record):
+        if record in self._active:
+            self._active.remove(record)
+
+    def set_uncacheable(self):
+        for record in self._active:
+            record.cacheable = False
+
+    def record_script(self, script_path, contents):
+        script_hash = self.hash_str(contents)
+        for record in self._active:
+            record.scripts[script_path] = script_hash
+
+    def record_dir(self, dir_path):
+        '''
+        Record a directory whose listing was used, e.g., by os.walk()
+        '''
+        dir_mtime = self._get_mtime(dir_path)
+        for record in self._active:
+            record.dirs[dir_path] = dir_mtime
+
+    def record_file(self, file_path):
+        file_mtime = self._get_mtime(file_path)
+        for record in self._active:
+            record.files[file_path] = file_mtime
+
+    def record_env(self, env_key):
+        env_value = os.getenv(env_key)
+        for record in self._active:
+            record.env[env_key] = env_value
+
+    def record_git_dir(self, path):
+        '''
+        Record the git metadata that the branch and remote url of path come from
+        '''
+
+        path = os.path.abspath(path or '.')
+        while True:
+            git_path = os.path.join(path, '.git')
+            if os.path.exists(git_path):
+                self.record_file(os.path.join(git_path, 'HEAD'))
+                self.record_file(os.path.join(git_path, 'config'))
+                return
+
+            parent_path = os.path.dirname(path)
+            if parent_path == path:
+                return
+
+            path = parent_path
+
+    def write_output(self, output_path, contents):
+        '''
+        Write a generated file if its contents changed, and record it as an
+        output of all active subtrees
+        '''
+
+        output_hash = self.hash_str(contents)
+        for record in self._active:
+            record.outputs[output_path] = output_hash
+
+        if self.deferred_outputs is not None:
+            self.deferred_outputs.append((output_path, contents))
+            return True
+
+        result = buildsys_util.write_if_changed(output_path, contents)
+        if result:
+            print('Wrote {}'.format(output_path))
+
+        else:
+            print('Unchanged: {}'.format(output_path))
+
+        return result
+
+
+    #
+    # Worker processes
+    #
+
+    def begin_deferred(self):
+        '''
+        Start a new set of entries and collect outputs instead of writing them.
+        Used for subtrees generated in a worker process, the results are
+        handed back to the main process with end_deferred()
+        '''
+
+        self._entries = {}
+        self._active = []
+        self.deferred_outputs = []
+
+    def end_deferred(self):
+        '''
+        Returns (entries, outputs) collected since begin_deferred()
+        '''
+
+        result = (self._entries, self.deferred_outputs)
+
+        self._entries = {}
+        self.deferred_outputs = None
+
+        return result
+
+    def get_entry(self, relpath):
+        return self._entries.get(relpath)
+
+    def merge_entries(self, entries):
+        self._entries.update(entries)
+
+
+    #
+    # Lookup
+    #
+
+    def find(self, relpath, context_hash):
+        '''
+        Get the previous entry for the subtree at relpath if none of its inputs
+        or outputs changed, else None
+        '''
+
+        if not self.enabled:
+            return None
+
+        entry = self._prev_entries.get(relpath)
+        if not entry or entry['context_hash'] != context_hash:
+            return None
+
+        for script_path, script_hash in entry['scripts'].items():
+            if not os.path.isfile(script_path):
+                return None
+
+            with open(script_path, 'rb') as fh:
+                if self.hash_str(fh.read()) != script_hash:
+                    return None
+
+        for input_path, input_mtime in list(entry['dirs'].items()) + list(entry['files'].items()):
+            if self._get_mtime(input_path) != input_mtime:
+                return None
+
+        for env_key, env_value in entry['env'].items():
+            if os.getenv(env_key) != env_value:
+                return None
+
+        for output_path, output_hash in entry['outputs'].items():
+            if not os.path.isfile(output_path):
+                return None
+
+            with open(output_path, 'rb') as fh:
+                if self.hash_str(fh.read()) != output_hash:
+                    return None
+
+        return entry
+
+    def lookup(self, relpath, context_hash):
+        '''
+        Like find(), but a reused entry is carried over to the new manifest
+        '''
+
+        entry = self.find(relpath, context_hash)
+        if not entry:
+            return None
+
+        self._entries[relpath] = entry
+
+        # carry over nested entries, they are valid as well
+        relpath_prefix = os.path.join(relpath, '')
+        for entry_relpath, nested_entry in self._prev_entries.items():
+            if entry_relpath.startswith(relpath_prefix):
+                self._entries[entry_relpath] = nested_entry
+
+        for record in self._active:
+            record.scripts.update(entry['scripts'])
+            record.dirs.update(entry['dirs'])
+            record.files.update(entry['files'])
+            record.env.update(entry['env'])
+            record.outputs.update(entry['outputs'])
+
+        return entry
@@ -4,16 +4,23 @@
 # Licensed under the terms set forth in the LICENSE.txt file
 #
 
+import io
 import os
 import json
+import time
 import argparse
+import traceback
+import contextlib
+import concurrent.futures
 from collections import OrderedDict
 
 import scaffold.variant
 
 from .benv import BuildEnvironment
+from .manifest import GenManifest
 
 from . import globals as buildsys_globals
+from . import util as buildsys_util
 from . import buildtype
 from . import buildlib
 
@@ -34,40 +41,32 @@ class ScNinjaNode:
 
         self.sset_node = False
 
-        self.__ninja_build = ''
-        self.__node_ninja_build = ''
+        self.__ninja_writer = None
         self.__build_environment = benv
 
+        # build rules for this node only, written to a per-build fragment
+        self.node_ninja_build = ''
+
         self.build_nodes = []
 
-    def _set_ninja_build(self, build_rules):
-        
-        # accumulate build rules for this node only
-        self.__node_ninja_build = build_rules
+    @property
+    def ninja_writer(self):
+        '''
+        Build rules accumulate into one writer per software set, nodes below
+        it write to the software set node's writer directly
+        '''
 
         if self.sset_node:
-            self.__ninja_build = build_rules
-        else:
+            if self.__ninja_writer is None:
+                self.__ninja_writer = buildsys_util.NinjaWriter()
 
-            # accumulate all build rules to top-level software set
-            self.parent.ninja_build = build_rules
-
-    def _get_ninja_build(self):
-        if self.sset_node:
-            return self.__ninja_build
-        else:
-            return self.parent.ninja_build
+            return self.__ninja_writer
 
-    ninja_build = property(_get_ninja_build, _set_ninja_build)
+        return self.parent.ninja_writer
 
-
-    def _get_node_ninja_build(self):
-        return self.__node_ninja_build
-
-    def _set_node_ninja_build(self, build_rules):
-        self.__node_ninja_build = build_rules
-
-    node_ninja_build = property(_get_node_ninja_build, _set_node_ninja_build)
+    @property
+    def ninja_build(self):
+        return self.ninja_writer.getvalue()
 
 
     @property
@@ -89,10 +88,164 @@ class ScNinjaNode:
     def _export(self, key, value):
         self.benv.exports[key] = value
 
+    def _get_context_hash(self, node):
+        '''
+        Hash of everything a subtree inherits from the rest of the tree. None
+        if it can't be serialized, in which case the subtree is not cached.
+
+        Includes whether rules.ninja was written already: a subtree recorded
+        after an earlier one wrote the rules doesn't write them on replay
+        '''
+
+        interface = dict([(k, v) for k, v in node.benv.interface.items() if k != 'node'])
+
+        try:
+            context_str = json.dumps({
+                'interface': interface,
+                'exports': node.benv.exports,
+                'rules_done': buildsys_globals._RULES_DONE,
+                'shlib_rules_done': buildtype.get_buildtype_lib('shared_library')._RULES_DONE
+            }, sort_keys=True)
+
+        except TypeError:
+            return None
+
+        return GenManifest.hash_str(context_str)
+
+
+    def _get_gen_state(self):
+
+        try:
+            sc_config_state = dict([(k, json.dumps(v)) for k, v in sc_globals.sc_config.items()])
+            exports_state = dict([(k, json.dumps(v)) for k, v in self.benv.exports.items()])
+
+        except TypeError:
+            return None
+
+        return {
+            'sc_config': sc_config_state,
+            'exports': exports_state,
+            'ninja_writer': self.ninja_writer,
+            'ninja_pos': self.ninja_writer.tell(),
+            'install_pos': len(buildsys_globals.install_outputs),
+            'rules_done': buildsys_globals._RULES_DONE,
+            'shlib_rules_done': buildtype.get_buildtype_lib('shared_library')._RULES_DONE
+        }
+
+
+    def _get_side_effects(self, state_before):
+        '''
+        Changes a subtree made to the rest of the tree, in a form that can be
+        replayed with _replay_side_effects(). None if that isn't possible
+        '''
+
+        state_after = self._get_gen_state()
+        if state_before is None or state_after is None:
+            return None
+
+        if state_after['ninja_writer'] is not state_before['ninja_writer']:
+            return None
+
+        side_effects = {
+            'sc_config': {},
+            'exports': {},
+            'ninja_build': state_after['ninja_writer'].getvalue(state_before['ninja_pos']),
+            'install_outputs': dict(list(buildsys_globals.install_outputs.items())[state_before['install_pos']:]),
+            'rules_done': state_after['rules_done'] and not state_before['rules_done'],
+            'shlib_rules_done': state_after['shlib_rules_done'] and not state_before['shlib_rules_done']
+        }
+
+        for state_key in ['sc_config', 'exports']:
+            for item_key, item_value in state_after[state_key].items():
+                if state_before[state_key].get(item_key) != item_value:
+                    side_effects[state_key][item_key] = json.loads(item_value)
+
+        return side_effects
+
+
+    def _replay_side_effects(self, side_effects):
+
+        for sc_config_key, sc_config_value in side_effects['sc_config'].items():
+            sc_globals.sc_config[sc_config_key] = sc_config_value
+
+        self.benv.exports.update(side_effects['exports'])
+
+        self.ninja_writer.write(side_effects['ninja_build'])
+
+        for output_path, owner in side_effects['install_outputs'].items():
+            buildsys_util.claim_install_outputs([output_path], owner)
+
+        if side_effects['rules_done']:
+            buildsys_globals._RULES_DONE = True
+
+        if side_effects['shlib_rules_done']:
+            buildtype.get_buildtype_lib('shared_library')._RULES_DONE = True
+
+
+    @staticmethod
+    def _lookup_entry(relpath, context_hash):
+        '''
+        Manifest entry to replay for a subtree, or None. Entries merged from a
+        worker after an earlier subtree wrote the rules had their rules
+        stripped, they can only be replayed once the rules are written
+        '''
+
+        gen_manifest = buildsys_globals.gen_manifest
+
+        entry = gen_manifest.find(relpath, context_hash)
+        if not entry:
+            return None
+
+        if ((entry['side_effects'] or {}).get('rules_skipped') and
+            not buildtype.get_buildtype_lib('shared_library')._RULES_DONE):
+            return None
+
+        return gen_manifest.lookup(relpath, context_hash)
+
+
     def _subdir(self, subdir):
+
+        # top level subtrees are generated in worker processes if enabled
+        if isinstance(self.parent, ScNinjaRuntime) and self.parent.jobs > 1:
+            self.parent.submit_subdir(self, subdir)
+            return
+
+        self._gen_subdir(subdir)
+
+    def _gen_subdir(self, subdir):
         node = ScNinjaNode(self, subdir)
         script_path = 'ScaffoldScript'
-        node.run(script_path)
+
+        gen_manifest = buildsys_globals.gen_manifest
+        context_hash = None
+        if gen_manifest:
+            context_hash = self._get_context_hash(node)
+
+        if context_hash is None:
+            node.run(script_path)
+            return
+
+        entry = self._lookup_entry(node.relpath, context_hash)
+        if entry:
+            print('Node: unchanged, skipping: {}'.format(node.relpath))
+            self._replay_side_effects(entry['side_effects'])
+            return
+
+        state_before = self._get_gen_state()
+        record = gen_manifest.begin(node.relpath, context_hash)
+
+        try:
+            node.run(script_path)
+
+        except:
+            gen_manifest.abort(record)
+            raise
+
+        side_effects = self._get_side_effects(state_before)
+        if side_effects is None:
+            record.cacheable = False
+
+        gen_manifest.end(record, side_effects)
 
     def _build(self, subdir):
         node = ScNinjaNode(self, subdir)
@@ -110,10 +263,11 @@ class ScNinjaNode:
 
         # accumulate build rules
         #
-        node_ninja_build = nnode.benv.gen_build()
-        self.ninja_build += node_ninja_build
+        ninja_writer = self.ninja_writer
+        ninja_pos = ninja_writer.tell()
+        nnode.benv.write_build(ninja_writer)
 
-        nnode.node_ninja_build += node_ninja_build
+        nnode.node_ninja_build += ninja_writer.getvalue(ninja_pos)
         self.build_nodes.append(nnode)
 
 
@@ -159,6 +313,9 @@ class ScNinjaNode:
                 proj_src_relpath = ''
     
             proj_config['project_src_relpath'] = proj_src_relpath
+            if buildsys_globals.gen_manifest:
+                buildsys_globals.gen_manifest.record_git_dir(self.reldir)
+
             proj_config['git_url'] = gitutil.get_url(path=self.reldir)
             proj_config['git_branch'] = gitutil.get_branch(path=self.reldir)
 
@@ -196,21 +353,24 @@ class ScNinjaNode:
 
         platform_target = scaffold.variant.get_variant('platform_target')
 
+        gen_manifest = buildsys_globals.gen_manifest
+
         if os.path.isfile(script_path):
             with open(script_path) as fh:
 
                 print('Node: execing: {}'.format(script_path))
                 contents = fh.read()
+
+                if gen_manifest:
+                    gen_manifest.record_script(script_path, contents)
+
                 exec(contents, node.node_locals)
 
             if node.sset_node:
                 print('GOT SSET NODE AT {}'.format(script_path))
                 bninja_path = 'build/gen/{}/build_{}.ninja'.format(
                     platform_target, node.benv.sset_name)
-                with open(bninja_path, 'w') as wfh:
-                    wfh.write(node.ninja_build)
-
-                print('Wrote {}'.format(bninja_path))
+                buildsys_util.write_output(bninja_path, node.ninja_build)
 
             if node.build_nodes:
                 for bnode in node.build_nodes:
@@ -232,19 +392,93 @@ class ScNinjaNode:
                         )
 
                     if nninja_path:
-                        with open(nninja_path, 'w') as wfh:
-                            wfh.write(bnode.node_ninja_build)
-
-                        print('Wrote {}'.format(nninja_path))
+                        buildsys_util.write_output(nninja_path, bnode.node_ninja_build)
 
             return node
 
         else:
+            # if it shows up later, the subtree needs to be generated again
+            if gen_manifest:
+                gen_manifest.record_file(script_path)
+
             print('Node: Error: file not found: {}'.format(script_path))
 
+class _SubtreeTop(object):
+    '''
+    Stands in for ScNinjaRuntime above a subtree generated in a worker process
+    '''
+
+    def __init__(self, interface, exports):
+        self.benv = BuildEnvironment()
+        self.benv.interface.update(interface)
+        self.benv.exports.update(exports)
+
+        self.ninja_writer = buildsys_util.NinjaWriter()
+
+    @property
+    def relpath(self):
+        return ''
+
+    @property
+    def reldir(self):
+        return ''
+
+
+def _init_subtree_worker(platform_target, args, gen_config, gen_dir, gen_info, incremental, build_time):
+
+    buildsys_globals.build_time = build_time
+
+    scaffold.variant.register_variant('platform_target', platform_target)
+
+    buildsys_globals.args.update(args)
+    sc_globals.gen_config = gen_config
+
+    buildsys_globals.gen_manifest = GenManifest(gen_dir, gen_info, enabled=incremental)
+
+
+def _gen_subtree(task):
+    '''
+    Generate one top level subtree in a worker process. Outputs are not written
+    here, they are handed back with the manifest entries and merged in order by
+    ScNinjaRuntime.merge_subdirs()
+    '''
+
+    gen_manifest = buildsys_globals.gen_manifest
+    gen_manifest.begin_deferred()
+
+    sc_globals.sc_config = task['sc_config']
+    buildsys_globals.install_outputs = {}
+    buildsys_globals._RULES_DONE = task['rules_done']
+    buildtype.get_buildtype_lib('shared_library')._RULES_DONE = task['shlib_rules_done']
+
+    top_node = ScNinjaNode(_SubtreeTop(task['interface'], task['exports']), '')
+
+    stdout = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout):
+            top_node._gen_subdir(task['subdir'])
+
+    except Exception:
+        gen_manifest.end_deferred()
+        return {
+            'status': 'error',
+            'stdout': stdout.getvalue(),
+            'error': traceback.format_exc()
+        }
+
+    entries, outputs = gen_manifest.end_deferred()
+
+    return {
+        'status': 'ok' if task['relpath'] in entries else 'uncacheable',
+        'stdout': stdout.getvalue(),
+        'entries': entries,
+        'outputs': outputs
+    }
+
+
 class ScNinjaRuntime(object):
 
-    def __init__(self, gen_config=False):
+    def __init__(self, gen_config=False, incremental=True, jobs=1, build_stamp=False):
 
         global sc_globals
 
@@ -258,7 +492,19 @@ class ScNinjaRuntime(object):
 
         self.benv = BuildEnvironment()
         self.benv.root_dir = os.path.abspath('.')
-        self.ninja_build = 'include rules.ninja\n\n'
+        self.ninja_writer = buildsys_util.NinjaWriter('include rules.ninja\n\n')
+
+        self.incremental = incremental
+        buildsys_globals.gen_manifest = GenManifest(
+            self.gen_dir, self._get_gen_info(), enabled=incremental)
+
+        # number of worker processes for top level subtrees, 1 is serial
+        self.jobs = jobs
+
+        self._pool = None
+        self._pending_subdirs = []
+
+        buildsys_globals.build_time = self._get_build_time(build_stamp)
 
     @property
     def relpath(self):
@@ -273,6 +519,235 @@ class ScNinjaRuntime(object):
         platform_target = scaffold.variant.get_variant('platform_target')
         return os.path.join('inst', platform_target)
 
+    @property
+    def gen_dir(self):
+        platform_target = scaffold.variant.get_variant('platform_target')
+        return os.path.join('build', 'gen', platform_target)
+
+
+    def _get_gen_info(self):
+        '''
+        Global inputs to generation. If any of these change, everything is
+        regenerated
+        '''
+
+        thirdbase_dir = buildsys_globals.senv_config.get('dir.thirdbase')
+        thirdbase_mtime = None
+        if thirdbase_dir and os.path.isdir(thirdbase_dir):
+            thirdbase_mtime = os.stat(thirdbase_dir).st_mtime_ns
+
+        return {
+            'root_dir': self.benv.root_dir,
+            'platform_target': scaffold.variant.get_variant('platform_target'),
+            'platform': buildsys_globals.platform_str,
+            'gen_config': sc_globals.gen_config,
+            'args': buildsys_globals.args,
+            'senv_config': buildsys_globals.senv_config,
+            'thirdbase_mtime': thirdbase_mtime
+        }
+
+
+    def _get_build_time(self, build_stamp):
+        '''
+        The build time only changes when asked for with build_stamp, or set
+        with SCAFFOLD_BUILD_TIME, otherwise the previous one is kept so
+        build_info.h is not rewritten and nothing recompiles
+        '''
+
+        if os.getenv('SCAFFOLD_BUILD_TIME'):
+            return int(os.getenv('SCAFFOLD_BUILD_TIME'))
+
+        build_time_path = os.path.join(self.buildsys_inst_dir, '.build_time')
+        if not build_stamp and os.path.isfile(build_time_path):
+            try:
+                with open(build_time_path) as fh:
+                    return int(fh.read().strip())
+
+            except ValueError:
+                pass
+
+        return int(time.time())
+
+
+    def _write_build_info(self):
+        '''
+        Write build_info.h with the build time into the include dir of
+        every software set. Sources include it as <SsetRname>/build_info.h
+        '''
+
+        site_name = buildsys_globals.senv_config['site_name']
+
+        for sset_name in sc_globals.sc_config:
+            if sset_name == '__bootstrap__':
+                continue
+
+            sset_rname = '{}{}'.format(site_name.capitalize(), sset_name.capitalize())
+            include_dir = os.path.join(self.buildsys_inst_dir, sset_name, 'include', sset_rname)
+            if not os.path.isdir(include_dir):
+                os.makedirs(include_dir)
+
+            build_info = '// Generated by scgen, do not edit\n'
+            build_info += '#pragma once\n\n'
+            build_info += '#define SCAFFOLD_BUILD_TIME {}\n'.format(buildsys_globals.build_time)
+
+            buildsys_util.write_output(os.path.join(include_dir, 'build_info.h'), build_info)
+
+
+    @property
+    def rules_path(self):
+        return 'build/gen/{}/rules.ninja'.format(
+            scaffold.variant.get_variant('platform_target'))
+
+
+    def _get_pool(self):
+
+        if self._pool is None:
+
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.jobs,
+                initializer=_init_subtree_worker,
+                initargs=(
+                    scaffold.variant.get_variant('platform_target'),
+                    buildsys_globals.args,
+                    sc_globals.gen_config,
+                    self.gen_dir,
+                    self._get_gen_info(),
+                    self.incremental,
+                    buildsys_globals.build_time
+                )
+            )
+
+        return self._pool
+
+
+    def submit_subdir(self, top_node, subdir):
+        '''
+        Queue a top level Subdir(). Subtrees that need to be generated are
+        started in a worker process right away, everything is merged in
+        Subdir() order by merge_subdirs() when the top level script is done
+        '''
+
+        node = ScNinjaNode(top_node, subdir)
+        gen_manifest = buildsys_globals.gen_manifest
+
+        context_hash = top_node._get_context_hash(node)
+        state = top_node._get_gen_state()
+
+        if context_hash is None or state is None:
+            self._pending_subdirs.append({'subdir': subdir})
+            return
+
+        if gen_manifest.find(node.relpath, context_hash):
+            self._pending_subdirs.append({'subdir': subdir, 'context_hash': context_hash})
+            return
+
+        task = {
+            'subdir': subdir,
+            'relpath': node.relpath,
+            'interface': dict([(k, v) for k, v in top_node.benv.interface.items() if k != 'node']),
+            'exports': top_node.benv.exports,
+            'sc_config': sc_globals.sc_config,
+            'rules_done': buildsys_globals._RULES_DONE,
+            'shlib_rules_done': buildtype.get_buildtype_lib('shared_library')._RULES_DONE
+        }
+
+        self._pending_subdirs.append({
+            'subdir': subdir,
+            'relpath': node.relpath,
+            'state': state,
+            'future': self._get_pool().submit(_gen_subtree, task)
+        })
+
+
+    def _merge_subdir_result(self, top_node, pending, result):
+        '''
+        Apply a worker result as if the subtree had been generated here.
+        Returns False if that isn't possible and the subtree has to be
+        generated again in this process
+        '''
+
+        print(result['stdout'], end='')
+
+        if result['status'] == 'error':
+            print('Node: generation failed in worker, retrying: {}'.format(pending['relpath']))
+            print(result['error'])
+            return False
+
+        if result['status'] != 'ok':
+            return False
+
+        entries = result['entries']
+        side_effects = entries[pending['relpath']]['side_effects']
+
+        # anything changed by an earlier subtree since this one was started
+        # means it saw different values than it would have serially
+        state_before = pending['state']
+        state_now = top_node._get_gen_state()
+        for state_key in ['sc_config', 'exports']:
+            for item_key in side_effects[state_key]:
+                if state_now[state_key].get(item_key) != state_before[state_key].get(item_key):
+                    print('Node: conflict on "{}", regenerating: {}'.format(item_key, pending['relpath']))
+                    return False
+
+        # rules are written by the first subtree with a shared library,
+        # which may have been an earlier one
+        shlib_mod = buildtype.get_buildtype_lib('shared_library')
+        skip_rules = shlib_mod._RULES_DONE and not pending['state']['shlib_rules_done']
+
+        gen_manifest = buildsys_globals.gen_manifest
+        for output_path, contents in result['outputs']:
+            if skip_rules and output_path == self.rules_path:
+                continue
+
+            gen_manifest.write_output(output_path, contents)
+
+        if skip_rules:
+            for entry in entries.values():
+                entry['outputs'].pop(self.rules_path, None)
+                if entry['side_effects']:
+                    entry['side_effects']['rules_done'] = False
+                    entry['side_effects']['shlib_rules_done'] = False
+                    entry['side_effects']['rules_skipped'] = True
+
+        top_node._replay_side_effects(side_effects)
+        gen_manifest.merge_entries(entries)
+
+        return True
+
+
+    def merge_subdirs(self, top_node):
+
+        gen_manifest = buildsys_globals.gen_manifest
+
+        try:
+            for pending in self._pending_subdirs:
+
+                subdir = pending['subdir']
+
+                if 'future' in pending:
+                    if not self._merge_subdir_result(top_node, pending, pending['future'].result()):
+                        top_node._gen_subdir(subdir)
+
+                    continue
+
+                # an earlier subtree may have changed outputs this one relies on
+                node = ScNinjaNode(top_node, subdir)
+                if 'context_hash' in pending:
+                    entry = top_node._lookup_entry(node.relpath, pending['context_hash'])
+                    if entry:
+                        print('Node: unchanged, skipping: {}'.format(node.relpath))
+                        top_node._replay_side_effects(entry['side_effects'])
+                        continue
+
+                top_node._gen_subdir(subdir)
+
+        finally:
+            self._pending_subdirs = []
+
+            if self._pool:
+                self._pool.shutdown()
+                self._pool = None
+
 
     def run(self, script_path):
 
@@ -283,26 +758,25 @@ class ScNinjaRuntime(object):
             print('execing: {}'.format(script_path))
             contents = fh.read()
             exec(contents, node.node_locals)
-        
+
+        self.merge_subdirs(node)
+
+        self._write_build_info()
+
         # write the build time for use by dist
         if os.getenv('SCAFFOLD_BUILD_TIME') != '0':
             build_time_path = os.path.join(self.buildsys_inst_dir, '.build_time')
-            with open(build_time_path, 'w') as wfh:
-                wfh.write(str(buildsys_globals.build_time))
-
-            print('Wrote Build Time: {} to {}'.format(
-                buildsys_globals.build_time, build_time_path
-            ))
+            if buildsys_util.write_if_changed(build_time_path, str(buildsys_globals.build_time)):
+                print('Wrote Build Time: {} to {}'.format(
+                    buildsys_globals.build_time, build_time_path
+                ))
 
         # Write list of software sets
 
         if sc_globals.gen_config:
             sc_config_path = os.path.join(self.buildsys_inst_dir, 'sc_config.json')
             
-            with open(sc_config_path, 'w') as wfh:
-                wfh.write(json.dumps(sc_globals.sc_config, indent=2))
-
-            print('Wrote {}'.format(sc_config_path))
+            buildsys_util.write_output(sc_config_path, json.dumps(sc_globals.sc_config, indent=2))
 
         if not buildsys_globals._RULES_DONE: # no rules written, generate empty
 
@@ -310,13 +784,9 @@ class ScNinjaRuntime(object):
             b_ch = bl_opsys.builder('CopyHeaders') # actuall just for install_files rule
             b_ch_obj = b_ch(node.benv)
 
-            rules_path = 'build/gen/{}/rules.ninja'.format(
-                scaffold.variant.get_variant('platform_target'))
-
-            with open(rules_path, 'w') as wfh:
-                wfh.write(b_ch_obj.gen_rules())
+            buildsys_util.write_output(self.rules_path, b_ch_obj.gen_rules())
 
-            print('Wrote {}'.format(rules_path))
+        buildsys_globals.gen_manifest.save()
 
         print('')
         print('DONE')
@@ -4,6 +4,12 @@
 # Licensed under the terms set forth in the LICENSE.txt file
 #
 
+import os
+
+from . import globals as buildsys_globals
+from . import worker
+
+
 def import_module(module_ns):
 
     top_module = __import__(module_ns)
@@ -33,4 +39,129 @@ def get_required_thirdparty_version(thirdparty_value, project_name):
         thirdparty_entry = thirdparty_entry.strip()
         entry_parts = thirdparty_entry.split('-')
         if entry_parts[0] == project_name:
-            return entry_parts[1]
\ No newline at end of file
+            return entry_parts[1]
+
+def get_tool_cmd(tool_cmd):
+    '''
+    Command for an install / codegen tool in generated rules. Goes through
+    the sc_worker client if senv_config['worker'] is set
+    '''
+
+    if os.name == 'nt' or not buildsys_globals.senv_config.get('worker'):
+        return tool_cmd
+
+    return '{} {}'.format(worker.get_launcher_cmd(), tool_cmd)
+
+
+class NinjaWriter(object):
+    '''
+    Accumulates ninja text as a list of parts, joined once when it is written
+    out. Appending is constant time, unlike repeated str += on a growing string
+    '''
+
+    def __init__(self, text=''):
+        self._parts = []
+        self.write(text)
+
+    def write(self, text):
+        if text:
+            self._parts.append(text)
+
+    def tell(self):
+        '''
+        Position to pass to getvalue() to get the text written after this point
+        '''
+        return len(self._parts)
+
+    def getvalue(self, start=0):
+        return ''.join(self._parts[start:])
+
+
+def write_if_changed(file_path, contents):
+    '''
+    Write contents to file_path only if it is different from what is already
+    there, so the file mtime is left alone otherwise. Returns True if written
+    '''
+
+    if isinstance(contents, str):
+        contents = contents.encode('utf-8')
+
+    if os.path.isfile(file_path):
+        with open(file_path, 'rb') as fh:
+            if fh.read() == contents:
+                return False
+
+    with open(file_path, 'wb') as wfh:
+        wfh.write(contents)
+
+    return True
+
+
+def getenv(env_key, default=None):
+    '''
+    os.getenv() for buildlibs, the value is recorded as an input of the
+    subtrees being generated
+    '''
+
+    gen_manifest = buildsys_globals.gen_manifest
+    if gen_manifest:
+        gen_manifest.record_env(env_key)
+
+    return os.getenv(env_key, default)
+
+
+def isdir(dir_path):
+    '''
+    os.path.isdir() for buildlibs, dir_path is recorded as an input of the
+    subtrees being generated, also when it doesn't exist
+    '''
+
+    gen_manifest = buildsys_globals.gen_manifest
+    if gen_manifest:
+        gen_manifest.record_dir(dir_path)
+
+    return os.path.isdir(dir_path)
+
+
+def isfile(file_path):
+    '''
+    os.path.isfile() for buildlibs, recorded like isdir()
+    '''
+
+    gen_manifest = buildsys_globals.gen_manifest
+    if gen_manifest:
+        gen_manifest.record_file(file_path)
+
+    return os.path.isfile(file_path)
+
+
+def claim_install_outputs(output_paths, owner):
+    '''
+    Register installed files as produced by the install edge owner. Two edges
+    installing the same file make ninja fail with "multiple rules generate",
+    so that is an error here, at generation time
+    '''
+
+    install_outputs = buildsys_globals.install_outputs
+    for output_path in output_paths:
+        prev_owner = install_outputs.get(output_path)
+        if prev_owner is not None and prev_owner != owner:
+            raise Exception('{} is installed by both {} and {}, aborting'.format(
+                output_path, prev_owner, owner))
+
+        install_outputs[output_path] = owner
+
+
+def write_output(output_path, contents):
+    '''
+    Write a generated file, through the generation manifest if there is one
+    '''
+
+    gen_manifest = buildsys_globals.gen_manifest
+    if gen_manifest:
+        return gen_manifest.write_output(output_path, contents)
+
+    write_if_changed(output_path, contents)
+    print('Wrote {}'.format(output_path))
+
+    return True
@@ -0,0 +1,512 @@
+#
+# Copyright 2014-2024 Justin Ottley
+#
+# Licensed under the terms set forth in the LICENSE.txt file
+#
+# Local worker server for install / codegen tools run by ninja rules
+# (sc_install, sc_gen_pb11, sc_rcc). The server imports scaffold and probes
+# the platform once, then forks a child per request that runs the tool script
+# in process, with the stdin / stdout / stderr of the client.
+#
+# Generated rules run the client by file path, it only uses the standard
+# library and starts with python -S, see get_launcher_cmd():
+#
+#   python -S worker.py -- sc_install --itype header ...
+#
+# If no server is running, the client runs the tool command directly. It
+# does so as well if the socket or the server belongs to another user, and
+# if the client imports scaffold from elsewhere (another checkout, or a
+# different PYTHONPATH) than the server.
+#
+# The socket is in a private 0700 directory, $XDG_RUNTIME_DIR/scaffold or
+# <tmp>/sc_worker_<uid>. SC_WORKER_SOCKET overrides the path, its directory
+# has to be private as well.
+#
+# Unix only, on Windows rules run the tools directly
+#
+
+import os
+import sys
+import json
+import stat
+import socket
+import struct
+import tempfile
+
+
+# exit code the server replies with when the request should not run in the
+# server, the client then runs the tool directly
+RUN_DIRECT = -1000
+
+
+def _get_scaffold_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_socket_dir():
+    '''
+    Private per-user directory for the socket, $XDG_RUNTIME_DIR if set
+    '''
+
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'scaffold')
+
+    return os.path.join(tempfile.gettempdir(), 'sc_worker_{}'.format(os.getuid()))
+
+
+def _is_private_dir(dir_path):
+
+    try:
+        dir_stat = os.lstat(dir_path)
+
+    except OSError:
+        return False
+
+    return (stat.S_ISDIR(dir_stat.st_mode) and
+            dir_stat.st_uid == os.getuid() and
+            (dir_stat.st_mode & 0o077) == 0)
+
+
+def _make_private_dir(dir_path):
+    '''
+    Create dir_path with mode 0700. Raises OSError if it exists but is not a
+    directory owned by this user that no one else can access
+    '''
+
+    try:
+        os.mkdir(dir_path, 0o700)
+
+    except FileExistsError:
+        pass
+
+    if not _is_private_dir(dir_path):
+        raise OSError('not a private directory owned by this user: {}'.format(dir_path))
+
+
+def get_socket_path():
+
+    socket_path = os.getenv('SC_WORKER_SOCKET')
+    if socket_path:
+        return socket_path
+
+    return os.path.join(get_socket_dir(), 'worker.sock')
+
+
+def _is_trusted_socket(socket_path):
+    '''
+    The socket and the directory it is in must belong to this user, so
+    another local user can't stand in for the server
+    '''
+
+    try:
+        socket_stat = os.lstat(socket_path)
+
+    except OSError:
+        return False
+
+    if not stat.S_ISSOCK(socket_stat.st_mode) or socket_stat.st_uid != os.getuid():
+        return False
+
+    return _is_private_dir(os.path.dirname(os.path.abspath(socket_path)))
+
+
+def _is_trusted_peer(sock):
+    '''
+    Check the uid of the process on the other end of a connected socket,
+    where the platform supports it
+    '''
+
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, peer_uid, _ = struct.unpack('3i', creds)
+
+    return peer_uid == os.getuid()
+
+
+def get_launcher_cmd(socket_path=None):
+    '''
+    Command prefix for generated rules to run a tool through the worker server
+    '''
+
+    result = [sys.executable, '-S', os.path.abspath(__file__)]
+    if socket_path:
+        result.extend(['--socket', socket_path])
+
+    result.append('--')
+
+    return ' '.join(['"{}"'.format(a) if ' ' in a else a for a in result])
+
+
+def _recv_exactly(conn, size):
+
+    result = b''
+    while len(result) < size:
+        chunk = conn.recv(size - len(result))
+        if not chunk:
+            raise EOFError('connection closed')
+
+        result += chunk
+
+    return result
+
+
+#
+# Client
+#
+
+def run_client(cmd, socket_path=None):
+    '''
+    Run cmd through the worker server. Returns the exit code, or None if no
+    server is running
+    '''
+
+    socket_path = socket_path or get_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    if not _is_trusted_socket(socket_path):
+        sys.stderr.write('sc_worker: ignoring {}, not a private socket of this user\n'.format(
+            socket_path))
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+
+    except OSError:
+        sock.close()
+        return None
+
+    if not _is_trusted_peer(sock):
+        sys.stderr.write('sc_worker: ignoring {}, server is run by another user\n'.format(
+            socket_path))
+        sock.close()
+        return None
+
+    request = json.dumps({
+        'cmd': cmd,
+        'cwd': os.getcwd(),
+        'env': dict(os.environ),
+        'scaffold_dir': _get_scaffold_dir()
+    }).encode('utf-8')
+
+    try:
+        with sock:
+            socket.send_fds(sock, [struct.pack('!I', len(request))], [0, 1, 2])
+            sock.sendall(request)
+
+            returncode = struct.unpack('!i', _recv_exactly(sock, 4))[0]
+
+    except (OSError, EOFError) as e:
+        sys.stderr.write('sc_worker: request failed - {}: {}\n'.format(
+            e.__class__.__name__, e))
+        return 1
+
+    if returncode == RUN_DIRECT:
+        return None
+
+    return returncode
+
+
+#
+# Server
+#
+
+# imported by the server before forking, so requests don't pay for them
+WARM_MODULES = [
+    'scaffold.variant',
+    'scaffold.buildsys.benv',
+    'scaffold.buildsys.install',
+    'scaffold.buildsys.buildlib.PyBind11.generator'
+]
+
+
+def _get_module_mtimes():
+
+    result = {}
+    for module_name, module in list(sys.modules.items()):
+        if module_name != 'scaffold' and not module_name.startswith('scaffold.'):
+            continue
+
+        module_path = getattr(module, '__file__', None)
+        if module_path:
+            try:
+                result[module_path] = os.stat(module_path).st_mtime_ns
+
+            except OSError:
+                pass
+
+    return result
+
+
+def _drop_stale_modules(module_mtimes):
+    '''
+    If scaffold changed since the server started, drop it in the request
+    process so the tool imports the current code
+    '''
+
+    for module_path, module_mtime in module_mtimes.items():
+        try:
+            if os.stat(module_path).st_mtime_ns == module_mtime:
+                continue
+
+        except OSError:
+            pass
+
+        for module_name in list(sys.modules):
+            if module_name == 'scaffold' or module_name.startswith('scaffold.'):
+                del sys.modules[module_name]
+
+        return
+
+
+def _is_python_script(script_path):
+
+    if script_path.endswith('.py'):
+        return True
+
+    try:
+        with open(script_path, 'rb') as fh:
+            return b'python' in fh.readline()
+
+    except OSError:
+        return False
+
+
+def _run_tool(cmd):
+    '''
+    Run a tool command in this process, returns the exit code
+    '''
+
+    import runpy
+    import shutil
+    import subprocess
+    import traceback
+
+    script_path = shutil.which(cmd[0])
+    if not script_path or not _is_python_script(script_path):
+        return subprocess.call(cmd)
+
+    sys.argv = [script_path] + cmd[1:]
+    try:
+        runpy.run_path(script_path, run_name='__main__')
+
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+
+        if isinstance(e.code, int):
+            return e.code
+
+        sys.stderr.write('{}\n'.format(e.code))
+        return 1
+
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+def _is_same_python_env(request, server_pythonpath):
+    '''
+    The tool runs with the sys.path of the server, only if the client would
+    import the same scaffold
+    '''
+
+    if request.get('scaffold_dir') != _get_scaffold_dir():
+        return False
+
+    return request['env'].get('PYTHONPATH', '') == server_pythonpath
+
+
+def _handle_request(conn, module_mtimes, server_pythonpath):
+    '''
+    Runs in a forked child of the server
+    '''
+
+    header, fds, _, _ = socket.recv_fds(conn, 4, 3)
+    if len(header) != 4 or len(fds) != 3:
+        # status check, or a broken client
+        for client_fd in fds:
+            os.close(client_fd)
+
+        return
+
+    request_size = struct.unpack('!I', header)[0]
+    request = json.loads(_recv_exactly(conn, request_size).decode('utf-8'))
+
+    if not _is_same_python_env(request, server_pythonpath):
+        # another checkout or scaffold version
+        for client_fd in fds:
+            os.close(client_fd)
+
+        conn.sendall(struct.pack('!i', RUN_DIRECT))
+        return
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    for target_fd, client_fd in enumerate(fds):
+        os.dup2(client_fd, target_fd)
+        os.close(client_fd)
+
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+
+    _drop_stale_modules(module_mtimes)
+
+    try:
+        returncode = _run_tool(request['cmd'])
+
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    conn.sendall(struct.pack('!i', returncode))
+
+
+def serve(socket_path=None):
+
+    import signal
+    import socketserver
+    import importlib
+
+    if not socket_path and not os.getenv('SC_WORKER_SOCKET'):
+        try:
+            _make_private_dir(get_socket_dir())
+
+        except OSError as e:
+            print('Error: {}'.format(e))
+            return 1
+
+    socket_path = socket_path or get_socket_path()
+
+    if os.path.lexists(socket_path) and not _is_trusted_socket(socket_path):
+        print('Error: {} exists and is not a private socket of this user'.format(socket_path))
+        return 1
+
+    if run_status(socket_path):
+        print('sc_worker already running: {}'.format(socket_path))
+        return 1
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    for module_name in WARM_MODULES:
+        try:
+            importlib.import_module(module_name)
+
+        except Exception as e:
+            print('Warning: could not import {} - {}: {}'.format(
+                module_name, e.__class__.__name__, e))
+
+    if 'scaffold.variant' in sys.modules:
+        sys.modules['scaffold.variant'].get_platform()
+
+    module_mtimes = _get_module_mtimes()
+    server_pythonpath = os.getenv('PYTHONPATH', '')
+
+
+    class _RequestHandler(socketserver.BaseRequestHandler):
+
+        def handle(self):
+            if not _is_trusted_peer(self.request):
+                return
+
+            _handle_request(self.request, module_mtimes, server_pythonpath)
+
+
+    class _Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+        pass
+
+
+    old_umask = os.umask(0o077)
+    try:
+        server = _Server(socket_path, _RequestHandler)
+
+    finally:
+        os.umask(old_umask)
+
+    def _on_sigterm(signum, frame):
+        raise KeyboardInterrupt()
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+
+    print('sc_worker listening on {}'.format(socket_path))
+
+    try:
+        server.serve_forever()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+    return 0
+
+
+def run_status(socket_path=None):
+
+    socket_path = socket_path or get_socket_path()
+    if not _is_trusted_socket(socket_path):
+        return False
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with sock:
+        try:
+            sock.connect(socket_path)
+            return _is_trusted_peer(sock)
+
+        except OSError:
+            return False
+
+
+def main():
+
+    import argparse
+
+    parser = argparse.ArgumentParser('sc_worker')
+    parser.add_argument('--socket', default=None, help='unix socket path')
+    parser.add_argument('--serve', default=False, action='store_true',
+        help='run the worker server')
+    parser.add_argument('--status', default=False, action='store_true',
+        help='check if a worker server is running')
+    parser.add_argument('cmd', nargs=argparse.REMAINDER)
+
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.socket)
+
+    if args.status:
+        if run_status(args.socket):
+            print('running')
+            return 0
+
+        print('not running')
+        return 1
+
+    cmd = args.cmd
+    if cmd and cmd[0] == '--':
+        cmd = cmd[1:]
+
+    if not cmd:
+        parser.error('no command')
+
+    returncode = run_client(cmd, args.socket)
+    if returncode is None:
+        os.execvp(cmd[0], cmd)
+
+    return returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#
+# Copyright 2014-2024 Justin Ottley
+#
+# Licensed under the terms set forth in the LICENSE.txt file
+#
+
+import os
+import copy
+import json
+import hashlib
+import logging
+import tempfile
+
+import scaffold.variant
+
+
+class EnvCache(object):
+    '''
+    Persistent on-disk cache of the environment built by software set
+    initialization in EnvController.
+
+    What is cached is the change software sets make to the environment
+    (entries prepended to path-like variables, and values set), so the result
+    can be applied on top of a base environment that differs per shell session.
+
+    Invalidation rules - a cache entry is only used when all of these hold:
+
+    - the merged config (all sc_config.json layers), the config path, the
+      platform string, the python version and the process environment values
+      used by path translation all hash to the entry key
+    - every path probed while the entry was built still has the same mtime,
+      or is still missing
+    - the entry was written by the same cache VERSION
+
+    Process environment (os.environ) changes made during software set
+    initialization, e.g. sclib export_env() or SC_TRANSLATION_MAP_PATH, are
+    stored with the entry and replayed on load
+
+    Caching can be disabled with "sc init --no-cache" or SC_ENV_CACHE=0
+    '''
+
+    VERSION = 2
+
+    CACHE_DIRNAME = 'env_cache'
+
+    # Bootstrap config values that are different per shell session but have
+    # no effect on software set initialization
+    #
+    VOLATILE_CONFIG_KEYS = ['config_dir.working']
+    VOLATILE_EXPORT_KEYS = ['SC_CONFIG_INIT_DIR', 'SC_CONFIG_INIT_IN']
+
+    # process environment variables that translation map anchors resolve against
+    #
+    KEY_ENV_VARS = [
+        'HOME',
+        'HOMEDRIVE',
+        'HOMEPATH',
+        'RLP_SITE',
+        'RLP_FS_ROOT',
+        'SC_TRANSLATION_STATE'
+    ]
+
+    def __init__(self, cntrl):
+        self.LOG = logging.getLogger('{}.{}'.format(self.__class__.__module__, self.__class__.__name__))
+
+        self.cntrl = cntrl
+
+        self._key = None
+
+
+    @property
+    def cache_dir(self):
+
+        bootstrap_config = self.cntrl.config[self.cntrl.BOOTSTRAP]
+        user_config_dir = bootstrap_config.get('config_dir.user')
+        if not user_config_dir:
+            user_config_dir = os.path.join(
+                tempfile.gettempdir(),
+                os.getenv('USER', os.getenv('USERNAME')),
+                'scaffold')
+
+        return os.path.join(user_config_dir, self.CACHE_DIRNAME)
+
+
+    @property
+    def key(self):
+
+        if self._key is None:
+
+            config = copy.deepcopy(self.cntrl.config)
+            bootstrap_config = config[self.cntrl.BOOTSTRAP]
+            for config_key in self.VOLATILE_CONFIG_KEYS:
+                bootstrap_config.pop(config_key, None)
+
+            for export_key in self.VOLATILE_EXPORT_KEYS:
+                bootstrap_config.get('export_env', {}).pop(export_key, None)
+
+            config_path = self.cntrl.config_path
+            if config_path:
+                config_path = os.path.realpath(config_path)
+
+            key_info = {
+                'version': self.VERSION,
+                'config': config,
+                'config_path': config_path,
+                'platform': scaffold.variant.get_platform(),
+                'python': scaffold.variant.get_python_dirname(),
+                'environ': dict([(env_key, os.getenv(env_key)) for env_key in self.KEY_ENV_VARS])
+            }
+
+            key_str = json.dumps(key_info, sort_keys=True, default=str)
+            self._key = hashlib.sha1(key_str.encode('utf-8')).hexdigest()
+
+        return self._key
+
+
+    @property
+    def entry_path(self):
+        return os.path.join(self.cache_dir, '{}.json'.format(self.key))
+
+
+    @staticmethod
+    def _get_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+
+        except OSError:
+            return None
+
+
+    @staticmethod
+    def diff_env(env_before, env_after):
+        '''
+        Compute the change made to an environment. Path-like lists that were
+        only prepended to are recorded as a prepend, anything else is recorded
+        as the resulting value
+        '''
+
+        result = {}
+        for env_key, env_value in env_after.items():
+
+            prev_value = env_before.get(env_key)
+            if env_value == prev_value:
+                continue
+
+            if isinstance(env_value, list) and isinstance(prev_value, list):
+                prefix_len = len(env_value) - len(prev_value)
+                if prefix_len >= 0 and env_value[prefix_len:] == prev_value:
+                    result[env_key] = ['prepend', env_value[:prefix_len]]
+                    continue
+
+            result[env_key] = ['set', env_value]
+
+        return result
+
+
+    @staticmethod
+    def diff_os_environ(environ_before, environ_after):
+        '''
+        Process environment changes, removed variables map to None
+        '''
+
+        result = {}
+        for env_key in set(environ_before) | set(environ_after):
+            env_value = environ_after.get(env_key)
+            if env_value != environ_before.get(env_key):
+                result[env_key] = env_value
+
+        return result
+
+
+    @staticmethod
+    def apply_os_environ(environ_delta):
+
+        for env_key, env_value in environ_delta.items():
+            if env_value is None:
+                os.environ.pop(env_key, None)
+
+            else:
+                os.environ[env_key] = env_value
+
+
+    @staticmethod
+    def apply_env(env, env_delta):
+
+        for env_key, (op, env_value) in env_delta.items():
+            if op == 'prepend':
+                env[env_key] = list(env_value) + env.get(env_key, [])
+
+            else:
+                env[env_key] = copy.deepcopy(env_value)
+
+
+    def load(self, env):
+        '''
+        Apply a cached environment to env. Returns True if a valid cache entry
+        was found
+        '''
+
+        entry_path = self.entry_path
+        if not os.path.isfile(entry_path):
+            self.LOG.debug('no cache entry: {}'.format(entry_path))
+            return False
+
+        try:
+            with open(entry_path) as fh:
+                entry = json.load(fh)
+
+        except Exception as e:
+            self.LOG.warning('could not read env cache entry {} - {}: {}'.format(
+                entry_path, e.__class__.__name__, e))
+            return False
+
+        if entry.get('version') != self.VERSION:
+            self.LOG.debug('cache entry version mismatch: {}'.format(entry_path))
+            return False
+
+        for probe_path, probe_mtime in entry['probes'].items():
+            if self._get_mtime(probe_path) != probe_mtime:
+                self.LOG.debug('cache entry stale, changed: {}'.format(probe_path))
+                return False
+
+        self.apply_env(env, entry['env'])
+        self.apply_os_environ(entry['os_environ'])
+
+        self.LOG.info('loaded environment from cache: {}'.format(entry_path))
+        return True
+
+
+    def save(self, env_before, env_after, probe_paths, os_environ_delta=None):
+
+        entry = {
+            'version': self.VERSION,
+            'probes': dict([(p, self._get_mtime(p)) for p in sorted(set(probe_paths)) if p]),
+            'env': self.diff_env(env_before, env_after),
+            'os_environ': os_environ_delta or {}
+        }
+
+        cache_dir = self.cache_dir
+        try:
+            if not os.path.isdir(cache_dir):
+                self.LOG.debug('creating {}'.format(cache_dir))
+                os.makedirs(cache_dir)
+
+            temp_fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.json')
+            with os.fdopen(temp_fd, 'w') as wfh:
+                wfh.write(json.dumps(entry))
+
+            os.replace(temp_path, self.entry_path)
+
+        except OSError as e:
+            self.LOG.warning('could not write env cache entry {} - {}: {}'.format(
+                self.entry_path, e.__class__.__name__, e))
+            return
+
+        self.LOG.debug('wrote env cache entry: {}'.format(self.entry_path))
+
@@ -6,6 +6,7 @@
 
 import os
 import sys
+import copy
 import json
 import logging
 import tempfile
@@ -17,6 +18,7 @@ import scaffold.util
 import scaffold.variant
 
 from .sset_mgr import SoftwareSetManager
+from .cache import EnvCache
 
 from .sset import SoftwareSet, BuildRelpathSoftwareSet
 from .generator import EnvGenerator
@@ -25,18 +27,25 @@ class EnvController:
 
     BOOTSTRAP = '__bootstrap__'
 
-    def __init__(self, config_path=None, config_loader=None, update_current_env=False):
+    def __init__(self, config_path=None, config_loader=None, update_current_env=False, use_cache=True):
 
         self.LOG = logging.getLogger('{}.{}'.format(self.__class__.__module__, self.__class__.__name__))
 
         self.env = None
-        self.software_sets = None
+        self._software_sets = None
+
+        # True when the environment came from EnvCache, software set objects
+        # are then only created on first access of software_sets
+        self._software_sets_cached = False
 
         self.config_path = config_path
         self.config_loader = config_loader
 
         self.update_current_env = update_current_env
 
+        # persistent cache of the software set environment, see EnvCache
+        self.use_cache = use_cache and os.getenv('SC_ENV_CACHE') != '0'
+
         self.env_generator = EnvGenerator.create(self)
 
         self.initialize()
@@ -47,6 +56,26 @@ class EnvController:
         return self.config[self.BOOTSTRAP]['buildsys.inst_dir']
 
 
+    @property
+    def software_sets(self):
+        '''
+        Software set objects by name. After an env cache hit these are created
+        on first access, without on_init() - the cached environment already
+        holds its result
+        '''
+
+        if self._software_sets is None and self._software_sets_cached:
+            sset_mgr = SoftwareSetManager(self.config, self.config_path)
+            self._software_sets = sset_mgr._software_sets
+
+        return self._software_sets
+
+
+    @software_sets.setter
+    def software_sets(self, software_sets):
+        self._software_sets = software_sets
+
+
     def initialize(self):
 
         self.LOG.info('initialize()')
@@ -179,11 +208,37 @@ class EnvController:
             raise Exception('sclib default setup not implemented yet')
 
 
-        sset_mgr = SoftwareSetManager(self.config, self.config_path)
-        self.software_sets = sset_mgr._software_sets
+        from scaffold.ext.path.util import record_checked_paths
+
+        env_cache = None
+        if self.use_cache:
+            env_cache = EnvCache(self)
+            if env_cache.load(self.env):
+                self.software_sets = None
+                self._software_sets_cached = True
+                return
+
+        env_before = copy.deepcopy(self.env)
+        environ_before = dict(os.environ)
+
+        # record every path translation candidate checked, including the ones
+        # that lost, so the cache entry goes stale when one of them appears
+        #
+        with record_checked_paths() as checked_paths:
+            sset_mgr = SoftwareSetManager(self.config, self.config_path)
+            self.software_sets = sset_mgr._software_sets
+
+            for sset_obj in self.software_sets.values():
+                sset_obj.on_init(self.env)
 
-        for sset_obj in self.software_sets.values():
-            sset_obj.on_init(self.env)
+        # don't persist an environment from a failed software set setup
+        if env_cache and not sset_mgr.init_error:
+            env_cache.save(
+                env_before,
+                self.env,
+                sset_mgr.get_probe_paths() + checked_paths,
+                os_environ_delta=EnvCache.diff_os_environ(environ_before, os.environ)
+            )
 
 
         '''
@@ -172,6 +172,19 @@ class SoftwareSet:
                 env['LD_LIBRARY_PATH'].insert(0, self.lib_dir)
 
 
+    @property
+    def probe_paths(self):
+        '''
+        Directories whose contents on_init() depends on. Used to validate a
+        cached environment (see scaffold.env.cache.EnvCache)
+        '''
+
+        if not self.base_dir:
+            return []
+
+        return [self.base_dir, self.lib_dir, self.python_lib_dir]
+
+
     def has_release(self):
         return 'release_num' in self.config
 
@@ -180,13 +193,32 @@ class SoftwareSet:
         self.config['release_num'] = release_num
 
 
-    def is_install_required(self):
+    @staticmethod
+    def filter_install_required(sset_list):
+        '''
+        Get the software sets in sset_list that are not installed locally.
+        The .done paths for all of them are formatted in one batch
+        '''
+
         from scaffold.ext.path import Path
-        sc_sset_done_path = Path(self.done_uri).format(translation_map='local')
 
-        print(sc_sset_done_path)
-        print('')
-        return not os.path.isfile(sc_sset_done_path)
+        done_paths = Path.format_many(
+            [sset.done_uri for sset in sset_list], translation_map='local')
+
+        result = []
+        for sset, sc_sset_done_path in zip(sset_list, done_paths):
+
+            print(sc_sset_done_path)
+            print('')
+
+            if not os.path.isfile(sc_sset_done_path):
+                result.append(sset)
+
+        return result
+
+
+    def is_install_required(self):
+        return bool(self.filter_install_required([self]))
 
 
     def get_install_required(self, include_types=None, exclude_types=None):
@@ -367,6 +399,12 @@ class SclibSoftwareSet(BuildRelpathSoftwareSet):
             env[export_key] = export_val
 
 
+    @property
+    def probe_paths(self):
+        # on_init() only uses config values
+        return []
+
+
 class AppSoftwareSet(SoftwareSet):
 
     @property
@@ -550,23 +588,21 @@ class ThirdbaseSoftwareSet(SoftwareSet):
                 self.LOG.debug('NOT FOUND: {}'.format(proj_pylib_dir))
 
 
-    def is_install_required(self):
-
+    @property
+    def probe_paths(self):
+        result = []
         for tb_proj in self._projects:
-            if tb_proj.is_install_required():
-                return True
+            result.extend(tb_proj.probe_paths)
 
-        return False
+        return result
 
 
-    def get_install_required(self, *args, **kwargs):
+    def is_install_required(self):
+        return bool(self.get_install_required())
 
-        result = []
-        for tb_proj in self._projects:
-            if tb_proj.is_install_required():
-                result.append(tb_proj)
 
-        return result
+    def get_install_required(self, *args, **kwargs):
+        return self.filter_install_required(self._projects)
 
 
     def get_all(self):
@@ -36,11 +36,15 @@ class SoftwareSetManager(object):
 
         self._software_sets = {}
         self._module_cache = {}
+        self._sclib_module_path = None
+
+        self.init_error = None
 
         try:
             self._init()
             pass
-        except:
+        except Exception as e:
+            self.init_error = e
             print(traceback.format_exc())
 
 
@@ -167,6 +171,34 @@ class SoftwareSetManager(object):
     def get_software_set(self, sset_name):
         return self._software_sets[sset_name]
 
+    def get_probe_paths(self):
+        '''
+        All filesystem paths software set initialization depends on, for
+        validating a cached environment
+        '''
+
+        result = []
+        if self._sclib_module_path:
+            result.append(self._sclib_module_path)
+
+            # sclib submodules and translation_config/*/translation_map.py,
+            # directories are included so added files are picked up too
+            #
+            sclib_dir = os.path.dirname(self._sclib_module_path)
+            for dir_path, dir_names, file_names in os.walk(sclib_dir):
+                dir_names[:] = sorted([d for d in dir_names if d != '__pycache__'])
+                result.append(dir_path)
+                result.extend([os.path.join(dir_path, f) for f in sorted(file_names) if f.endswith('.py')])
+
+        for tmap_dir in os.getenv('SC_TRANSLATION_MAP_PATH', '').split(os.pathsep):
+            if tmap_dir:
+                result.append(os.path.join(tmap_dir, 'translation_map.py'))
+
+        for sset in self._software_sets.values():
+            result.extend(sset.probe_paths)
+
+        return result
+
     def get_install_required(self, include_types=None, exclude_types=None, callback=None):
 
         localize_list = []
@@ -11,6 +11,7 @@ import collections
 
 from .exception import PathFormatError
 from . import translation
+from .engine import ENGINE
 
 LOG = logging.getLogger(__name__)
 
@@ -20,8 +21,15 @@ PathInfo = collections.namedtuple('PathInfo',
 
 class Path(object):
 
+    __slots__ = ['default_style', 'translation_map', '__path_in', '__path_info']
+
     _style_types = collections.OrderedDict()
 
+    # Shared, stateless style instances by style name. Anything that can vary
+    # per Path (e.g., translation_map) is passed to the style per call
+    #
+    styles = collections.OrderedDict()
+
     # A list of callables that implement string substitution formatting for {key}
     # by calling format(key=value)
     subst_handlers = []
@@ -32,27 +40,15 @@ class Path(object):
         from current platform
         e.g., {'name': 'UNC'}
 
-        translation_map: list of dicts, translation map
+        translation_map: translation config name, or list of dicts (translation map)
+        to format with when format() is not given one
         '''
-        self.styles = collections.OrderedDict()
-
-        # Instantiate styles. A bit heavy, but because of ability to
-        # change behavior like translation_map per Path, we need
-        # per Path-object Style objects.
-        # Can this be optimized?
-        #
-        for style_cls in self._style_types.values():
-            style_obj = style_cls(
-                translation_map=translation_map,
-                **kwargs
-            )
-            self.styles[style_obj.name] = style_obj
-
 
         self.__path_in = None
         self.__path_info = None
 
         self.default_style = default_style or self._detect_default_style()
+        self.translation_map = translation_map
 
         # Support for different input types
         #
@@ -86,6 +82,10 @@ class Path(object):
     def register_style(cls, style_cls):
         cls._style_types[style_cls.__name__] = style_cls
 
+        style_obj = style_cls()
+        cls.styles[style_obj.name] = style_obj
+        ENGINE.invalidate()
+
 
     @staticmethod
     def set_translation_map(translation_map):
@@ -118,26 +118,7 @@ class Path(object):
 
 
     def _detect(self):
-
-        for tmap_info in translation.TRANSLATION_CONFIG:
-
-            if not tmap_info.enabled:
-
-                LOG.log(9, 'skipping translation config: "{}"'.format(tmap_info.name))
-                continue
-
-            for style_handler in self.styles.values():
-
-                path_info = style_handler.detect(self.__path_in, tmap_info)
-                if path_info:
-                    self.__path_info = path_info
-
-                    LOG.log(9, path_info)
-
-                    break
-
-            if self.__path_info != None:
-                break
+        self.__path_info = ENGINE.detect(self.__path_in, self.styles)
 
     def _detect_default_style(self):
         # TODO FIXME: DEPRECATE
@@ -145,28 +126,38 @@ class Path(object):
         return {'name': default_style}
 
 
-    def format(self, style_name=None, **kwargs):
+    @classmethod
+    def _get_translation_config(cls, kwargs, default_translation_map=None):
+        '''
+        Get the list of TranslationConfig to format with from format() kwargs.
+        NOTE: translation_map is removed from kwargs
+        '''
 
-        if not style_name:
-            style_name = self.get_default_style()
+        translation_config = translation.get_translation_config()
+        if kwargs.get('translation_config'):
+            translation_config = kwargs['translation_config']
 
-        if not self.__path_info:
-            msg = 'Cannot be formatted - path detection failed! call str() instead - (original input: {})'.format(
-                self.__path_in)
-            raise PathFormatError(msg)
 
-        result = None
+        translation_map = kwargs.pop('translation_map', None)
+        if not translation_map and not kwargs.get('translation_config'):
+            translation_map = default_translation_map
 
-        translation_config = translation.TRANSLATION_CONFIG
-        if kwargs.get('translation_config'):
-            translation_config = kwargs['translation_config']
+        if isinstance(translation_map, list):
+            translation_config = [translation.TranslationConfig(
+                'override', translation_map, translation.validate_all)]
 
+        elif translation_map:
+            translation_config = [translation.get_config(translation_map)]
 
-        if kwargs.get('translation_map'):
-            translation_config = [translation.get_config(kwargs['translation_map'])]
-            kwargs.pop('translation_map')
+        return translation_config
 
-        if style_name in self.styles:
+
+    @classmethod
+    def _format_path_info(cls, path_info, style_name, translation_config, kwargs):
+
+        result = None
+
+        if style_name in cls.styles:
 
             for tmap_info in translation_config:
                 
@@ -177,10 +168,11 @@ class Path(object):
 
                 validate_func = tmap_info.validate_func
                 translation_map =  tmap_info.translation_map
-                style_handler = self.styles[style_name]
+                style_handler = cls.styles[style_name]
 
-                formatted_path = style_handler.format(
-                    self.__path_info,
+                formatted_path = ENGINE.format(
+                    style_handler,
+                    path_info,
                     tmap_info.translation_map,
                     **kwargs
                 )
@@ -188,12 +180,12 @@ class Path(object):
                 if not formatted_path:
                     continue
 
-                for subst_handler in self.subst_handlers:
+                for subst_handler in cls.subst_handlers:
                     formatted_path = subst_handler.format(formatted_path)
                 
                 validate_result = validate_func(
                     formatted_path,
-                    self.__path_info,
+                    path_info,
                     style_handler,
                     translation_map
                 )
@@ -204,17 +196,72 @@ class Path(object):
 
 
         if result is None:
-            raise PathFormatError('Style not available: "{}" - {}'.format(style_name, self.__path_info))
+            raise PathFormatError('Style not available: "{}" - {}'.format(style_name, path_info))
 
 
         return result
 
 
+    def format(self, style_name=None, **kwargs):
+
+        if not style_name:
+            style_name = self.get_default_style()
+
+        if not self.__path_info:
+            msg = 'Cannot be formatted - path detection failed! call str() instead - (original input: {})'.format(
+                self.__path_in)
+            raise PathFormatError(msg)
+
+        translation_config = self._get_translation_config(kwargs, self.translation_map)
+
+        return self._format_path_info(self.__path_info, style_name, translation_config, kwargs)
+
+
+    @classmethod
+    def format_many(cls, uris, style_name=None, **kwargs):
+        '''
+        Format a list of paths / URIs (or Path objects) in one pass, takes the
+        same keyword arguments as format(). The translation config is looked
+        up once for the batch; a Path input with its own translation_map uses
+        that instead, unless translation_map / translation_config is given.
+
+        Returns a list of formatted paths in input order. Raises PathFormatError
+        on the first input that fails detection or formatting
+        '''
+
+        if not style_name:
+            style_name = cls.get_default_style()
+
+        has_translation_override = bool(kwargs.get('translation_map') or kwargs.get('translation_config'))
+        translation_config = cls._get_translation_config(kwargs)
+
+        result = []
+        for uri in uris:
+
+            uri_translation_config = translation_config
+            if isinstance(uri, Path):
+                path_info = uri.path_info
+                if uri.translation_map and not has_translation_override:
+                    uri_translation_config = cls._get_translation_config({}, uri.translation_map)
+
+            else:
+                path_info = ENGINE.detect(uri, cls.styles)
+
+            if not path_info:
+                raise PathFormatError(
+                    'Cannot be formatted - path detection failed! (original input: {})'.format(uri))
+
+            result.append(cls._format_path_info(path_info, style_name, uri_translation_config, kwargs))
+
+        return result
+
+
 def _init():
 
     LOG.log(9, '')
 
-    translation._init_translation_config()
+    # NOTE: translation config is loaded on first use, see
+    # translation.get_translation_config()
     
     from .style.unc import UNCPathStyle
     from .style.drive_letter import DriveLetterPathStyle
@@ -228,4 +275,7 @@ def _init():
 
 
 _init()
-del _init
\ No newline at end of file
+del _init
+
+
+format_many = Path.format_many
\ No newline at end of file
@@ -0,0 +1,440 @@
+#
+# Copyright 2014-2024 Justin Ottley
+#
+# Licensed under the terms set forth in the LICENSE.txt file
+#
+
+import os
+import logging
+import collections
+
+from .exception import PathResolutionError
+from . import translation
+
+LOG = logging.getLogger(__name__)
+
+
+class LRUCache(object):
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        '''
+        Returns (True, value) on a hit, (False, None) on a miss
+        '''
+        try:
+            value = self._data[key]
+
+        except KeyError:
+            return (False, None)
+
+        self._data.move_to_end(key)
+        return (True, value)
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+class _PrefixIndex(object):
+    '''
+    Trie of the anchors of one style in one translation map. Each node records
+    the position of the first enabled mapping whose anchor ends there, so a
+    lookup walks the path once instead of comparing against every mapping.
+    '''
+
+    def __init__(self, style_name, translation_map):
+
+        self.root = self._new_node()
+
+        for mapping_idx, mapping_info in enumerate(translation_map):
+
+            if style_name not in mapping_info['mapping']:
+                continue
+
+            if 'enabled' in mapping_info and not mapping_info['enabled']:
+                continue
+
+            node = self.root
+            for anchor_item in mapping_info['mapping'][style_name]:
+                node = node[1].setdefault(anchor_item, self._new_node())
+
+            if node[0] is None:
+                node[0] = (mapping_idx, mapping_info)
+
+    @staticmethod
+    def _new_node():
+        # [first (index, mapping_info) ending here, children]
+        return [None, {}]
+
+    def match(self, path_parts):
+
+        result = self.root[0]
+        node = self.root
+
+        for path_item in path_parts:
+
+            node = node[1].get(path_item)
+            if node is None:
+                break
+
+            if node[0] is not None and (result is None or node[0][0] < result[0]):
+                result = node[0]
+
+        if result:
+            return result[1]
+
+
+class _CompiledAnchor(object):
+    '''
+    Anchor list of one mapping for one style, split into literal parts,
+    env. variable parts ($VAR) and dynamic parts (objects with a value() method)
+    '''
+
+    def __init__(self, raw_anchor_list):
+
+        self.parts = []
+        self.env_vars = []
+        self.is_dynamic = False
+
+        # if the mapping does not support this style, the anchor list is None
+        self.is_missing = raw_anchor_list is None
+
+        for raw_entry in raw_anchor_list or []:
+
+            if hasattr(raw_entry, 'value'):
+                self.parts.append(('dynamic', raw_entry))
+                self.is_dynamic = True
+                continue
+
+            anchor_value = str(raw_entry)
+            if anchor_value.startswith('$'):
+                self.parts.append(('env', anchor_value[1:]))
+                self.env_vars.append(anchor_value[1:])
+
+            else:
+                self.parts.append(('literal', anchor_value))
+
+        self._resolved = {}
+
+    def get_env_snapshot(self):
+        return tuple([os.environ.get(env_key) for env_key in self.env_vars])
+
+    def resolve(self, path_info):
+
+        if self.is_missing:
+            return None
+
+        env_snapshot = self.get_env_snapshot()
+        if not self.is_dynamic and env_snapshot in self._resolved:
+            return list(self._resolved[env_snapshot])
+
+        result = []
+        env_values = iter(env_snapshot)
+
+        for part_type, part_value in self.parts:
+
+            if part_type == 'dynamic':
+                anchor_value = part_value.value(path_info)
+
+                # values produced at runtime may still refer to env. variables
+                if anchor_value.startswith('$'):
+                    env_value = os.getenv(anchor_value[1:])
+                    if env_value is None:
+                        raise PathResolutionError('env. variable not found: {}'.format(anchor_value))
+
+                    anchor_value = env_value
+
+            elif part_type == 'env':
+                anchor_value = next(env_values)
+                if anchor_value is None:
+                    raise PathResolutionError('env. variable not found: ${}'.format(part_value))
+
+            else:
+                anchor_value = part_value
+
+            result.append(anchor_value)
+
+        if not self.is_dynamic:
+            self._resolved[env_snapshot] = tuple(result)
+
+        return result
+
+
+class TranslationEngine(object):
+    '''
+    Compiled form of the loaded translation config, used by Path and PathStyle.
+
+    - a prefix index per (translation map, style) for detection
+    - anchors per (translation map, style, mapping) with $VAR anchors resolved
+      once per snapshot of the env. variables they refer to
+    - LRU caches of detect and format results
+
+    Maps that are not in the loaded config, e.g. per call translation_map
+    overrides, are compiled into a small LRU cache and their format results
+    are not cached.
+
+    Everything is dropped when the translation config changes
+    (translation.GENERATION), or on invalidate()
+    '''
+
+    CACHE_SIZE = 8192
+
+    # compiled state kept for translation maps that are not part of the
+    # loaded translation config, e.g. format(translation_map=[...]) overrides
+    #
+    OVERRIDE_CACHE_SIZE = 64
+
+    def __init__(self):
+
+        self._generation = None
+
+        # ids of the translation maps in the loaded translation config, these
+        # stay alive until the config changes
+        #
+        self._loaded_map_ids = frozenset()
+
+        # id(translation_map) -> (translation_map, {key: compiled})
+        # holding translation_map keeps the id from being reused
+        #
+        self._compiled = {}
+        self._override_compiled = LRUCache(self.OVERRIDE_CACHE_SIZE)
+
+        self._detect_cache = LRUCache(self.CACHE_SIZE)
+        self._format_cache = LRUCache(self.CACHE_SIZE)
+
+
+    def invalidate(self):
+
+        LOG.log(9, 'invalidating compiled translation config')
+
+        self._compiled.clear()
+        self._override_compiled.clear()
+        self._detect_cache.clear()
+        self._format_cache.clear()
+
+        # the loaded map ids are collected again on next use, without loading
+        # the translation config here
+        self._loaded_map_ids = frozenset()
+        self._generation = None
+
+
+    def _check_generation(self):
+
+        # loads the translation config on first use
+        translation_config = translation.get_translation_config()
+
+        if self._generation != translation.GENERATION:
+            self.invalidate()
+
+            self._loaded_map_ids = frozenset([id(tmap_info.translation_map) for tmap_info in translation_config])
+            self._generation = translation.GENERATION
+
+
+    def _get_compiled_map(self, translation_map):
+
+        tmap_id = id(translation_map)
+        if tmap_id in self._loaded_map_ids:
+            if tmap_id not in self._compiled:
+                self._compiled[tmap_id] = (translation_map, {})
+
+            return self._compiled[tmap_id][1]
+
+        found, tmap_entry = self._override_compiled.get(tmap_id)
+        if not found:
+            tmap_entry = (translation_map, {})
+            self._override_compiled.put(tmap_id, tmap_entry)
+
+        return tmap_entry[1]
+
+
+    def _get_compiled(self, translation_map, key, factory):
+
+        compiled = self._get_compiled_map(translation_map)
+        if key not in compiled:
+            compiled[key] = factory()
+
+        return compiled[key]
+
+
+    def get_mapping(self, style_name, path_parts, translation_map):
+        '''
+        Get the first enabled mapping whose anchor for this style is a prefix of
+        path_parts
+        '''
+
+        self._check_generation()
+
+        prefix_index = self._get_compiled(
+            translation_map, ('index', style_name),
+            lambda: _PrefixIndex(style_name, translation_map))
+
+        try:
+            return prefix_index.match(path_parts)
+
+        except TypeError:
+            # unhashable path parts - nothing in the index can match these
+            return None
+
+
+    def _get_compiled_anchor(self, style_name, mapping_name, translation_map):
+
+        def _compile():
+            for mapping_info in translation_map:
+
+                if 'enabled' in mapping_info and not mapping_info['enabled']:
+                    continue
+
+                if mapping_info['name'] == mapping_name:
+                    return _CompiledAnchor(mapping_info['mapping'].get(style_name))
+
+        return self._get_compiled(
+            translation_map, ('anchor', style_name, mapping_name), _compile)
+
+
+    def get_anchor_list(self, style_name, path_info, translation_map):
+
+        self._check_generation()
+
+        if not path_info.mapping_name:
+            return None
+
+        compiled_anchor = self._get_compiled_anchor(
+            style_name, path_info.mapping_name, translation_map)
+
+        if compiled_anchor is None:
+            return None
+
+        return compiled_anchor.resolve(path_info)
+
+
+    def detect(self, path_in, styles):
+        '''
+        Detect path_in against the enabled translation configs using styles,
+        an ordered dict of style name -> PathStyle. Returns a PathInfo or None
+        '''
+
+        self._check_generation()
+
+        cache_key = (path_in, tuple(styles))
+        try:
+            found, path_info = self._detect_cache.get(cache_key)
+
+        except TypeError:
+            cache_key = None
+            found = False
+
+        if found:
+            return path_info
+
+        path_info = None
+        for tmap_info in translation.get_translation_config():
+
+            if not tmap_info.enabled:
+
+                LOG.log(9, 'skipping translation config: "{}"'.format(tmap_info.name))
+                continue
+
+            for style_handler in styles.values():
+
+                path_info = style_handler.detect(path_in, tmap_info)
+                if path_info:
+
+                    LOG.log(9, path_info)
+                    break
+
+            if path_info != None:
+                break
+
+        if cache_key is not None:
+            self._detect_cache.put(cache_key, path_info)
+
+        return path_info
+
+
+    def format(self, style_handler, path_info, translation_map, **kwargs):
+        '''
+        Format path_info with style_handler, caching the result. Validation
+        and substitution are not cached, they are done by the caller
+        '''
+
+        self._check_generation()
+
+        cache_key = self._get_format_key(style_handler, path_info, translation_map, kwargs)
+        if cache_key is not None:
+            found, result = self._format_cache.get(cache_key)
+            if found:
+                return result
+
+        result = style_handler.format(path_info, translation_map, **kwargs)
+
+        if cache_key is not None:
+            self._format_cache.put(cache_key, result)
+
+        return result
+
+
+    def _get_format_key(self, style_handler, path_info, translation_map, kwargs):
+
+        # only loaded translation maps are kept alive until the next
+        # invalidate(), an override map's id may be reused once it is dropped
+        if id(translation_map) not in self._loaded_map_ids:
+            return None
+
+        env_snapshot = None
+        if path_info.mapping_name:
+            compiled_anchor = self._get_compiled_anchor(
+                style_handler.name, path_info.mapping_name, translation_map)
+
+            if compiled_anchor is not None:
+                if compiled_anchor.is_dynamic:
+                    return None
+
+                env_snapshot = compiled_anchor.get_env_snapshot()
+
+        format_kwargs = tuple(sorted([(k, v) for k, v in kwargs.items()
+            if k not in ['translation_config', 'force_validate']]))
+
+        cache_key = (
+            style_handler.name,
+            id(translation_map),
+            path_info.style_name,
+            path_info.mapping_name,
+            tuple(path_info.path_list),
+            tuple(sorted(path_info.extra.items())) if path_info.extra else None,
+            format_kwargs,
+            env_snapshot
+        )
+
+        try:
+            hash(cache_key)
+
+        except TypeError:
+            return None
+
+        return cache_key
+
+
+ENGINE = TranslationEngine()
+
+
+def invalidate():
+    '''
+    Drop all compiled translation state and cached results. Call this after
+    changing translation map entries directly, without going through
+    TranslationConfig / set_config_enabled()
+    '''
+    ENGINE.invalidate()
@@ -7,6 +7,7 @@
 import os
 import sys
 import socket
+import importlib.util
 import pprint
 import logging
 import traceback
@@ -15,7 +16,44 @@ from .. import util as pathutil
 
 LOG = logging.getLogger(__name__)
 
-TRANSLATION_CONFIG = []
+# Loaded lazily on first use, see get_translation_config(). Available as
+# TRANSLATION_CONFIG through the module __getattr__ below
+#
+_TRANSLATION_CONFIG = []
+_TRANSLATION_CONFIG_LOADED = False
+
+# Incremented on any change to the loaded translation config, so compiled
+# translation state (see ..engine) can be dropped
+#
+GENERATION = 0
+
+
+def _bump_generation():
+    global GENERATION
+    GENERATION += 1
+
+
+def validate_all(*args, **kwargs):
+    return True
+
+
+def get_translation_config():
+    '''
+    The list of loaded TranslationConfig, loading it from SC_TRANSLATION_MAP_PATH
+    on first use
+    '''
+
+    if not _TRANSLATION_CONFIG_LOADED:
+        _init_translation_config()
+
+    return _TRANSLATION_CONFIG
+
+
+def __getattr__(name):
+    if name == 'TRANSLATION_CONFIG':
+        return get_translation_config()
+
+    raise AttributeError('module {} has no attribute {}'.format(__name__, name))
 
 
 class TranslationConfig(object):
@@ -46,11 +84,13 @@ class TranslationConfig(object):
 
     def set_enabled(self, is_enabled):
         self.__enabled = is_enabled
+        _bump_generation()
     
     def set_entry_enabled(self, entry_name, is_enabled):
         for tmap_entry in self.translation_map:
             if tmap_entry['name'] == entry_name:
                 tmap_entry['enabled'] = is_enabled
+                _bump_generation()
                 break
 
 
@@ -77,7 +117,7 @@ def set_config_enabled(name, entry, is_enabled):
 
     # LOG.log(9, 'set_config_enabled {} {} {}'.format(name, entry, is_enabled))
     
-    for config_obj in TRANSLATION_CONFIG:
+    for config_obj in get_translation_config():
         if config_obj.name == name:
 
             if entry is None:
@@ -102,7 +142,7 @@ def set_config_enabled(name, entry, is_enabled):
 
 def get_config(config_name):
 
-    for config_obj in TRANSLATION_CONFIG:
+    for config_obj in get_translation_config():
         if config_obj.name == config_name:
             return config_obj
 
@@ -190,18 +230,69 @@ def get_builtin_translation_config_path(name):
     return path_result
 
 
+def _validate_translation_config(tmap_file, locals_context):
+
+    if not isinstance(locals_context.get('name'), str):
+        raise ValueError('{}: "name" not set'.format(tmap_file))
+
+    if not isinstance(locals_context['translation_map'], list):
+        raise ValueError('{}: "translation_map" is not a list'.format(tmap_file))
+
+    for tmap_entry in locals_context['translation_map']:
+        if not isinstance(tmap_entry.get('name'), str) or \
+        not isinstance(tmap_entry.get('mapping'), dict):
+            raise ValueError('{}: invalid translation map entry: {}'.format(tmap_file, tmap_entry))
+
+    if not callable(locals_context['validate']):
+        raise ValueError('{}: "validate" is not callable'.format(tmap_file))
+
+
+def _load_translation_map(tmap_file):
+    '''
+    Run a translation_map.py and return its namespace. The file is loaded through
+    importlib, so the compiled code is cached in __pycache__ next to it and only
+    recompiled when the source changes
+    '''
+
+    locals_context = {
+        'pathutil': pathutil,
+        'translation_map': [],
+        'validate': validate_all,
+        'enabled': True
+    }
+
+    module_spec = importlib.util.spec_from_file_location(
+        '_sc_translation_map', tmap_file)
+
+    if module_spec is None:
+        raise ImportError('cannot load translation map: {}'.format(tmap_file))
+
+    module_obj = importlib.util.module_from_spec(module_spec)
+    module_obj.__dict__.update(locals_context)
+    module_spec.loader.exec_module(module_obj)
+
+    for context_key in locals_context:
+        locals_context[context_key] = module_obj.__dict__.get(context_key)
+
+    locals_context['name'] = module_obj.__dict__.get('name')
+
+    _validate_translation_config(tmap_file, locals_context)
+
+    return locals_context
+
+
 def _init_translation_config():
     '''
     Initialize translation maps from env. variable search path. Cache in-process
     '''
 
-    global TRANSLATION_CONFIG
+    global _TRANSLATION_CONFIG
+    global _TRANSLATION_CONFIG_LOADED
 
     LOG.log(9, 'resetting translation config')
-    TRANSLATION_CONFIG = []
-
-    def _validate_all(*args, **kwargs):
-        return True
+    _TRANSLATION_CONFIG = []
+    _TRANSLATION_CONFIG_LOADED = True
+    _bump_generation()
 
     translation_map_path = os.getenv('SC_TRANSLATION_MAP_PATH', '').split(os.pathsep) 
     LOG.log(9, 'Loading translation config from env: {}'.format(translation_map_path))
@@ -212,19 +303,13 @@ def _init_translation_config():
             continue
 
         tmap_file = os.path.join(tmap_dir_entry, 'translation_map.py')
-        locals_context = {
-            'pathutil': pathutil,
-            'translation_map': [],
-            'validate': _validate_all,
-            'enabled': True
-        }
 
         try:
             LOG.log(9, 'attempting to load: {}'.format(tmap_file))
 
-            exec(open(tmap_file).read(), {}, locals_context)
+            locals_context = _load_translation_map(tmap_file)
 
-            TRANSLATION_CONFIG.append(TranslationConfig(
+            _TRANSLATION_CONFIG.append(TranslationConfig(
                 locals_context['name'],
                 locals_context['translation_map'],
                 locals_context['validate'],
@@ -235,7 +320,7 @@ def _init_translation_config():
             LOG.warning(traceback.format_exc())
 
 
-    if not TRANSLATION_CONFIG:
+    if not _TRANSLATION_CONFIG:
         LOG.warning('no translation config loaded!')
 
     # Load state from environment, if specified
@@ -5,11 +5,29 @@
 #
 
 import os
+import sys
+import time
 import pprint
 import logging
+import contextlib
 
 LOG = logging.getLogger(__name__)
 
+# Existence cache for validate_path_exists(). Seconds a directory listing is
+# trusted for, 0 disables caching
+#
+EXISTS_CACHE_TTL = float(os.getenv('SC_PATH_EXISTS_TTL', '5'))
+
+# parent directory -> (listing time, frozenset of entry names, or None if the
+# directory does not exist)
+#
+_DIR_ENTRY_CACHE = {}
+
+# Paths checked by validate_path_exists() while a record_checked_paths() block
+# is active, None when not recording
+#
+_CHECKED_PATHS = None
+
 
 def which(exec_name, env=None):
     '''
@@ -69,6 +87,108 @@ def split_path(path_in):
     return result
 
 
+def _normcase_name(name):
+    '''
+    Windows filesystems are case-insensitive. macOS ones usually are but
+    may not be, see path_exists()
+    '''
+
+    if os.name == 'nt':
+        return name.lower()
+
+    return name
+
+
+def _get_dir_entries(dir_path):
+    '''
+    Names in dir_path from one os.scandir(), cached for EXISTS_CACHE_TTL.
+    None if dir_path does not exist (cached as well)
+    '''
+
+    now = time.monotonic()
+
+    cache_entry = _DIR_ENTRY_CACHE.get(dir_path)
+    if cache_entry and (now - cache_entry[0]) < EXISTS_CACHE_TTL:
+        return cache_entry[1]
+
+    try:
+        entry_names = set()
+        with os.scandir(dir_path) as dir_it:
+            for dir_entry in dir_it:
+
+                # match os.path.exists() - broken symlinks don't exist
+                if dir_entry.is_symlink() and not os.path.exists(dir_entry.path):
+                    continue
+
+                entry_names.add(_normcase_name(dir_entry.name))
+
+        entry_names = frozenset(entry_names)
+
+    except (FileNotFoundError, NotADirectoryError):
+        entry_names = None
+
+    _DIR_ENTRY_CACHE[dir_path] = (now, entry_names)
+
+    return entry_names
+
+
+def path_exists(path_in):
+    '''
+    Cached equivalent of os.path.exists(). Answers from a listing of the parent
+    directory, so checking many paths in one directory costs one scandir, and
+    paths under a missing directory are answered without touching the filesystem
+    '''
+
+    if EXISTS_CACHE_TTL <= 0:
+        return os.path.exists(path_in)
+
+    path_in = os.path.abspath(path_in)
+    parent_dir, name = os.path.split(path_in)
+    if not name:
+        return os.path.exists(path_in)
+
+    try:
+        entry_names = _get_dir_entries(parent_dir)
+
+    except OSError:
+        # unreadable directory, can't list - check the path directly
+        return os.path.exists(path_in)
+
+    if entry_names is None:
+        return False
+
+    if _normcase_name(name) in entry_names:
+        return True
+
+    # the volume may be case-insensitive, the filesystem decides
+    if sys.platform == 'darwin':
+        return os.path.exists(path_in)
+
+    return False
+
+
+def invalidate_exists_cache(path_in=None):
+    '''
+    Drop cached directory listings for path_in and everything under it, or the
+    whole cache if path_in is None. Call after installing to a location that
+    is validated through validate_path_exists()
+    '''
+
+    if path_in is None:
+        _DIR_ENTRY_CACHE.clear()
+        return
+
+    path_in = os.path.abspath(path_in)
+    path_prefix = os.path.join(path_in, '')
+
+    for dir_path in list(_DIR_ENTRY_CACHE):
+        if dir_path == path_in or dir_path.startswith(path_prefix):
+            del _DIR_ENTRY_CACHE[dir_path]
+
+    # the listing that contains path_in itself
+    _DIR_ENTRY_CACHE.pop(os.path.dirname(path_in), None)
+
+
 def validate_path_exists(formatted_path, path_info, style_handler, translation_map):
     '''
     A path validator that returns True if the path exists on the filesystem
@@ -91,7 +211,10 @@ def validate_path_exists(formatted_path, path_info, style_handler, translation_m
             
             # print(forged_path)
 
-        formatted_path_exists = os.path.exists(formatted_path)
+        if _CHECKED_PATHS is not None:
+            _CHECKED_PATHS.append(formatted_path)
+
+        formatted_path_exists = path_exists(formatted_path)
 
         LOG.log(9, 'Check if exists on disk: {} - {} - OSName: {}'.format(
             formatted_path, formatted_path_exists, os.name))
@@ -101,6 +224,27 @@ def validate_path_exists(formatted_path, path_info, style_handler, translation_m
     return False
 
 
+@contextlib.contextmanager
+def record_checked_paths():
+    '''
+    Collect every path validate_path_exists() checks inside the block,
+    including translation candidates that lost. Yields the list
+    '''
+
+    global _CHECKED_PATHS
+
+    prev_checked = _CHECKED_PATHS
+    _CHECKED_PATHS = []
+    try:
+        yield _CHECKED_PATHS
+
+    finally:
+        checked = _CHECKED_PATHS
+        _CHECKED_PATHS = prev_checked
+        if prev_checked is not None:
+            prev_checked.extend(checked)
+
+
 def to_bool(value_in):
 
     type_val_in = type(value_in)
@@ -9,12 +9,16 @@ import sys
 import json
 import pprint
 import shutil
+import hashlib
 import tempfile
+import threading
 import subprocess
+import concurrent.futures
 
 import scaffold.variant
 from scaffold.env.sset_mgr import SoftwareSetManager
 from scaffold.ext.path import Path
+from scaffold.ext.path import util as pathutil
 
 
 SITE_NAME = 'rlp_test'
@@ -25,6 +29,7 @@ PLATFORM = scaffold.variant.get_platform()
 ERR_FS_NOT_AVAILABLE = 1
 ERR_INVALID_PROJECT = 2
 ERR_SSET_NOT_FOUND = 3
+ERR_ZIP_FAILED = 4
 
 edbc = None
 
@@ -38,6 +43,9 @@ CPCMD = 'cp'
 if os.name == 'nt':
     CPCMD = 'copy'
 
+# max number of artifacts packaged at the same time by zip_build()
+DEFAULT_JOBS = 4
+
 def _to_ver_num(sset_zip_name, sset_name):
     name_prefix = 'sset_{}_'.format(sset_name)
     return int(sset_zip_name.replace(name_prefix, '').replace('.7z', ''))
@@ -80,91 +88,279 @@ def _get_project(project_name):
     return proj_info
 
 
-def _dist_sset_int(sset_src_root, sset_dest_zip_path, sset_name, release_num):
+class ReleaseJournal(object):
+    '''
+    Per artifact state of a zip_build() run, saved on every change so an
+    interrupted release resumes where it stopped. Artifacts are keyed on
+    their network zip path, states are:
 
-    if not os.path.isdir(sset_src_root):
-        print('Error: dir not found: {}'.format(sset_src_root))
-        print('aborting')
-        # sys.exit(ERR_SSET_NOT_FOUND)
-        return
+    - zipping: archive being created in the work dir, discarded on resume
+    - zipped: archive complete in the work dir, only the copy is left
+    - done: archive copied to the network path
 
+    The journal and work dir are removed once every artifact is done
+    '''
 
-    dest_zip_dir, dest_zip_filename = os.path.split(sset_dest_zip_path)
-    # fs_root = os.getenv('RLP_FS_ROOT')
-    # inst_root = os.path.dirname(sset_dest_path)
+    FILENAME = 'journal.json'
 
-    # os.path.join(
-    #     fs_root, SITE_NAME, 'release', PLATFORM, 'dist', 'proj', project_name, 'sset')
-    
-    if not os.path.isdir(dest_zip_dir):
-        print('Creating {}'.format(dest_zip_dir))
-        os.makedirs(dest_zip_dir)
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        self.path = os.path.join(work_dir, self.FILENAME)
 
+        self._lock = threading.Lock()
+        self._entries = {}
 
-    # sset_inst_root = os.path.join(inst_root, dest_sset_path, release_num)
-    # sset_src_root = os.path.join(os.path.dirname(args.config_path), sset_name)
+        self._load()
 
 
-    
-    # if not os.path.isdir(sset_inst_root):
-    #     print('Creating {}'.format(sset_inst_root))
-    #     os.makedirs(sset_inst_root)
+    def _load(self):
 
-    release_num_str = str(release_num).zfill(4)
-    # next_ver_str = _get_next_ver(sset_inst_root, sset_name)
+        if not os.path.isfile(self.path):
+            return
 
-    print('next version: {}'.format(release_num_str))
+        try:
+            with open(self.path) as fh:
+                self._entries = json.load(fh)
 
-    # print('CONFIG:')
-    # print(sset_config)
+        except Exception as e:
+            print('WARNING: could not read release journal {} - {}: {}'.format(
+                self.path, e.__class__.__name__, e))
+            return
 
+        print('Resuming release from {}'.format(self.path))
 
-    
-    # 'sset_{}_{}_{}.7z'.format(
-    #     sset_name, sset_config['sftset_version'], next_ver_str)
 
-    temp_filename = os.path.join(tempfile.gettempdir(), dest_zip_filename)
+    def _save(self):
+
+        if not os.path.isdir(self.work_dir):
+            os.makedirs(self.work_dir)
+
+        temp_path = '{}.tmp'.format(self.path)
+        with open(temp_path, 'w') as wfh:
+            wfh.write(json.dumps(self._entries, indent=2))
+
+        os.replace(temp_path, self.path)
+
+
+    def get(self, key):
+        with self._lock:
+            return dict(self._entries.get(key, {}))
+
+
+    def set(self, key, state, **kwargs):
+        with self._lock:
+            entry = {'state': state}
+            entry.update(kwargs)
+
+            self._entries[key] = entry
+            self._save()
+
+
+    def get_work_zip_path(self, key):
+        '''
+        Stable location of the archive for key, so it can be picked up again
+        after an interruption. Thirdbase zip filenames are just the version,
+        each artifact gets its own directory
+        '''
+
+        key_hash = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.work_dir, key_hash, os.path.basename(key))
+
+
+    def cleanup(self):
+        '''
+        Remove the journal and any archives it tracks, including those left by
+        an earlier failed run. Call once every artifact is on the network path
+        '''
+
+        with self._lock:
+            for key in self._entries:
+                shutil.rmtree(
+                    os.path.dirname(self.get_work_zip_path(key)), ignore_errors=True)
+
+            self._entries = {}
+
+            if os.path.isfile(self.path):
+                print('Cleaning {}'.format(self.path))
+                os.remove(self.path)
+
+            # only if empty, the work dir may have been given on the commandline
+            if os.path.isdir(self.work_dir) and not os.listdir(self.work_dir):
+                os.rmdir(self.work_dir)
+
 
-    if os.path.isfile(temp_filename):
-        print('Cleaning {}'.format(temp_filename))
-        os.remove(temp_filename)
+def _get_release_work_dir(args):
 
+    work_dir = getattr(args, 'work_dir', None)
+    if work_dir:
+        return work_dir
+
+    # same config and project resume the same release
+    config_key = '{}:{}:{}'.format(
+        os.path.abspath(args.config_path), args.project, args.sset or '')
+    config_hash = hashlib.sha1(config_key.encode('utf-8')).hexdigest()[:12]
+
+    return os.path.join(tempfile.gettempdir(), 'sc_release_{}'.format(config_hash))
+
+
+def _get_source_fingerprint(base_dir):
+    '''
+    Hash of the path, size and mtime of every file under base_dir, so an
+    archive from an interrupted run is only reused for the same tree
+    '''
+
+    result = hashlib.sha1()
+    for root, dirs, files in os.walk(base_dir):
+        dirs.sort()
+        for file_entry in sorted(files):
+            file_path = os.path.join(root, file_entry)
+            try:
+                file_stat = os.stat(file_path)
+
+            except OSError:
+                continue
+
+            result.update('{}:{}:{}\n'.format(
+                os.path.relpath(file_path, base_dir),
+                file_stat.st_size,
+                file_stat.st_mtime_ns).encode('utf-8'))
+
+    return result.hexdigest()
+
+
+def _zip_sset_int(sset_src_root, zip_path, sset_name, release_num):
+    '''
+    Archive an internal software set into zip_path. Returns True on success
+    '''
+
+    release_num_str = str(release_num).zfill(4)
+
+    print('next version: {}'.format(release_num_str))
 
     # hmm.. need to start the archive with the release number directory..
     # make a temp area with the release number, copy everything into it
     # and archive that..
     tempdir = tempfile.mkdtemp(prefix='{}_'.format(sset_name))
     temp_release_dir = os.path.join(tempdir, release_num_str)
-    # os.mkdir(temp_release_dir)
 
-    
     print('{} -> {}'.format(sset_src_root, temp_release_dir))
 
-    shutil.copytree(sset_src_root, temp_release_dir)
+    try:
+        # symlinks=False, the release gets real files even if the install area
+        # was populated with symlinks (install_mode)
+        shutil.copytree(sset_src_root, temp_release_dir, symlinks=False)
 
-    cmd = '{} a {} {}'.format(ZCMD, temp_filename, temp_release_dir)
+        cmd = '{} a {} {}'.format(ZCMD, zip_path, temp_release_dir)
 
-    print(cmd)
-    r = subprocess.run(cmd, shell=True)
+        print(cmd)
+        r = subprocess.run(cmd, shell=True)
 
-    # if not os.getenv('RLP_FS_ROOT'):
-    #     print('ERROR: RLP_FS_ROOT not set')
-    #     raise Exception('stop')
+    finally:
+        shutil.rmtree(tempdir, ignore_errors=True)
 
-    # sset_dest_path = os.path.join(sset_inst_root, sset_filename)
-    
-    cp_cmd = '{} {} {}'.format(CPCMD, temp_filename, sset_dest_zip_path)
+    return r.returncode == 0
+
+
+def _zip_sset_ext(base_dir, zip_path):
+
+    zip_cmd = '{} a {} {}'.format(ZCMD, zip_path, base_dir)
+    print(zip_cmd)
+
+    r = subprocess.run(zip_cmd, shell=True)
+
+    return r.returncode == 0
+
+
+def _copy_to_network(zip_path, zip_network_path):
+    '''
+    Copy next to the destination first and rename, so an interrupted copy
+    never leaves a partial zip at the network path
+    '''
+
+    network_parent_dir = os.path.dirname(zip_network_path)
+    if not os.path.isdir(network_parent_dir):
+        print('Creating {}'.format(network_parent_dir))
+        os.makedirs(network_parent_dir, exist_ok=True)
 
-    print('')
-    print('DONE')
-    print('')
+    partial_path = '{}.partial'.format(zip_network_path)
+
+    cp_cmd = '{} {} {}'.format(CPCMD, zip_path, partial_path)
     print(cp_cmd)
-    r = subprocess.run(cp_cmd, shell=True)
-    print(r)
 
+    r = subprocess.run(cp_cmd, shell=True)
     if r.returncode != 0:
-        print('ERROR DOING COPY, ABORT')
-        return
+        print('ERROR DOING COPY: {}'.format(r))
+        return False
+
+    os.replace(partial_path, zip_network_path)
+
+    return True
+
+
+def _package_release_entry(journal, entry_info):
+    '''
+    Archive one software set or thirdbase project and copy it to the network
+    path, skipping whatever the journal says is already done. Runs in a
+    zip_build() worker thread. Returns True on success
+    '''
+
+    zip_network_path = entry_info['zip_network_path']
+    base_dir = entry_info['base_dir']
+
+    if not os.path.isdir(base_dir):
+        print('ERROR: SOURCE DIR NOT FOUND: {}'.format(base_dir))
+        return False
+
+    zip_path = journal.get_work_zip_path(zip_network_path)
+    journal_entry = journal.get(zip_network_path)
+
+    source_fingerprint = _get_source_fingerprint(base_dir)
+
+    zip_ok = False
+    if journal_entry.get('state') == 'zipped' and os.path.isfile(zip_path):
+        zip_ok = (os.path.getsize(zip_path) == journal_entry.get('size') and
+                  source_fingerprint == journal_entry.get('source'))
+
+    if zip_ok:
+        print('Resuming, zip already created: {}'.format(zip_path))
+
+    else:
+        print('Zip creation required: {}'.format(zip_network_path))
+
+        # 7z adds to an existing archive, start clean
+        if os.path.isfile(zip_path):
+            print('Cleaning {}'.format(zip_path))
+            os.remove(zip_path)
+
+        zip_dir = os.path.dirname(zip_path)
+        if not os.path.isdir(zip_dir):
+            os.makedirs(zip_dir)
+
+        journal.set(zip_network_path, 'zipping')
+
+        if entry_info['sftset_type'] == 'int':
+            zip_ok = _zip_sset_int(
+                base_dir, zip_path, entry_info['name'], entry_info['release_num'])
+
+        else:
+            zip_ok = _zip_sset_ext(base_dir, zip_path)
+
+        if not zip_ok or not os.path.isfile(zip_path):
+            print('ERROR: zip creation failed: {}'.format(zip_network_path))
+            return False
+
+        journal.set(zip_network_path, 'zipped',
+            size=os.path.getsize(zip_path), source=source_fingerprint)
+
+    if not _copy_to_network(zip_path, zip_network_path):
+        return False
+
+    journal.set(zip_network_path, 'done')
+
+    print('Cleaning {}'.format(zip_path))
+    shutil.rmtree(os.path.dirname(zip_path), ignore_errors=True)
+
+    return True
 
 
 def _dist_sset_tb(args, sset_name, sset_config, release_num):
@@ -248,7 +444,9 @@ def release_sset(args):
     max_num += 1
 
     if sset_config['sftset_type'] != 'ext':
-        zip_build(args)
+        if zip_build(args):
+            print('Error: zip creation failed, not creating SoftwareSetRelease')
+            sys.exit(ERR_ZIP_FAILED)
 
     print(sset_release_info)
     print('Creating SoftwareSetRelease {} {}'.format(sset_name, max_num))
@@ -570,7 +768,7 @@ def zip_build(args):
 
     if not build_info:
         print('Invalid build info, aborting')
-        return
+        return 1
 
     build_info['__bootstrap__']['project'] = args.project
     sset_mgr = SoftwareSetManager(build_info, args.config_path)
@@ -595,53 +793,73 @@ def zip_build(args):
             print('Got next release num: {}'.format(next_release_num))
             entry.set_release_num(next_release_num)
 
-        zip_network_path = Path(entry.zip_uri).format(translation_map='network')
-        
-        if not os.path.isfile(zip_network_path):
-            print('Zip creation required: {}'.format(zip_network_path))
 
-            base_dir = str(entry.base_dir)
-            pprint.pprint(entry.config)
-            if entry.sftset_type == 'int':
-                _dist_sset_int(base_dir, zip_network_path, entry.name, next_release_num)
+    # zip uris depend on the release num, format them all once those are set
+    #
+    zip_network_paths = Path.format_many(
+        [entry.zip_uri for entry in localize_list], translation_map='network')
 
-            else:
-                
-                if not os.path.isdir(base_dir):
-                    print('ERROR: SOURCE DIR NOT FOUND: {}'.format(base_dir))
-                    continue
-        
-                zip_filename_prefix = '{}_'.format(entry.name.replace('/', '_'))
-                temp_fd, temp_filename = tempfile.mkstemp(
-                    prefix=zip_filename_prefix, suffix='.7z')
-                os.close(temp_fd)
-                os.remove(temp_filename)
+    packaging_list = []
+    for entry, zip_network_path in zip(localize_list, zip_network_paths):
 
-                zip_cmd = '{} a {} {}'.format(ZCMD, temp_filename, base_dir)
-                print(zip_cmd)
+        if os.path.isfile(zip_network_path):
+            print('Zip OK: {}'.format(zip_network_path))
+            continue
 
-                # continue
-                r = subprocess.run(zip_cmd, shell=True)
-                if r.returncode == 0:
-                    assert(os.path.isfile(temp_filename))
+        pprint.pprint(entry.config)
+        packaging_list.append({
+            'name': entry.name,
+            'sftset_type': entry.sftset_type,
+            'base_dir': str(entry.base_dir),
+            'release_num': entry.config.get('release_num'),
+            'zip_network_path': zip_network_path
+        })
 
-                    network_parent_dir = os.path.dirname(zip_network_path)
-                    if not os.path.isdir(network_parent_dir):
-                        print('Creating {}'.format(network_parent_dir))
-                        os.makedirs(network_parent_dir)
+    journal = ReleaseJournal(_get_release_work_dir(args))
 
-                    cp_cmd = '{} {} {}'.format(CPCMD, temp_filename, zip_network_path)
-                    print(cp_cmd)
+    if not packaging_list:
+        journal.cleanup()
+        return 0
 
-                    r = subprocess.run(cp_cmd, shell=True)
-                    if r.returncode != 0:
-                        print('ERROR DOING COPY: {}'.format(r))
+    # software sets and thirdbase projects are independent, package them
+    # concurrently. The work is in 7z and cp subprocesses, threads are enough
+    #
+    jobs = getattr(args, 'jobs', None) or DEFAULT_JOBS
 
-                    print('Cleaning {}'.format(temp_filename))
-                    os.remove(temp_filename)
+    print('Packaging {} artifact(s), {} at a time'.format(len(packaging_list), jobs))
 
-        else:
-            print('Zip OK: {}'.format(zip_network_path))
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {}
+        for entry_info in packaging_list:
+            future = pool.submit(_package_release_entry, journal, entry_info)
+            futures[future] = entry_info
+
+        for future in concurrent.futures.as_completed(futures):
+            entry_info = futures[future]
+            try:
+                result = future.result()
+
+            except Exception as e:
+                print('ERROR: {} - {}: {}'.format(
+                    entry_info['name'], e.__class__.__name__, e))
+                result = False
+
+            if result:
+                pathutil.invalidate_exists_cache(
+                    os.path.dirname(entry_info['zip_network_path']))
+
+            else:
+                failed.append(entry_info['name'])
+
+    if failed:
+        print('ERROR: packaging failed for {}, rerun to resume from {}'.format(
+            ', '.join(failed), journal.path))
+
+    else:
+        journal.cleanup()
+
+    return len(failed)
 
 
 def print_info(args):
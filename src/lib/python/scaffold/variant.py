@@ -58,11 +58,15 @@ change the compiler in the new variant group:
 '''
 
 import os
+import sys
+import json
 import socket
 import platform
+import tempfile
 import traceback
 from collections import OrderedDict
 
+# created on first use, see _get_manager()
 _platform_manager = None
 
 VARIANT_TYPE_PLATFORM = 'platform'
@@ -72,6 +76,91 @@ VARIANT_TYPE_OPSYS_VERSION = 'opsys_version'
     
 class ScaffoldVariantException(Exception): pass
 
+
+class HostInfoCache(object):
+    '''
+    Per-host cache of the probed platform info (opsys, arch, opsys version),
+    so tools don't run the platform probes on every start. An entry is used
+    only if the uname of the host is unchanged since it was written.
+
+    Disable with SCAFFOLD_VARIANT_CACHE=0, the location can be changed with
+    SCAFFOLD_VARIANT_CACHE_DIR
+    '''
+
+    VERSION = 1
+
+    @staticmethod
+    def get_cache_dir():
+        cache_dir = os.getenv('SCAFFOLD_VARIANT_CACHE_DIR')
+        if cache_dir:
+            return cache_dir
+
+        return os.path.join(os.path.expanduser('~'), '.config', 'rlp', 'sc')
+
+    @staticmethod
+    def get_host_key():
+
+        if hasattr(os, 'uname'):
+            return list(os.uname())
+
+        return [sys.platform, socket.gethostname(), list(sys.getwindowsversion()[:4])]
+
+    def __init__(self):
+        self.enabled = os.getenv('SCAFFOLD_VARIANT_CACHE') != '0'
+        self.path = os.path.join(
+            self.get_cache_dir(), 'host_{}.json'.format(socket.gethostname()))
+
+    def load(self):
+
+        if not self.enabled or not os.path.isfile(self.path):
+            return None
+
+        # anything unexpected in the file falls back to probing
+        try:
+            with open(self.path) as fh:
+                entry = json.load(fh)
+
+            if entry.get('version') != self.VERSION or entry.get('key') != self.get_host_key():
+                return None
+
+            host_info = entry['host_info']
+            if (not isinstance(host_info['opsys'], str) or
+                not isinstance(host_info['arch'], str) or
+                len(host_info['opsys_version']) != 3):
+                return None
+
+        except Exception:
+            return None
+
+        return host_info
+
+    def save(self, host_info):
+
+        if not self.enabled:
+            return
+
+        entry = {
+            'version': self.VERSION,
+            'key': self.get_host_key(),
+            'host_info': host_info
+        }
+
+        cache_dir = os.path.dirname(self.path)
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+
+            temp_fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.json')
+            with os.fdopen(temp_fd, 'w') as wfh:
+                wfh.write(json.dumps(entry))
+
+            os.replace(temp_path, self.path)
+
+        except OSError:
+            # a read only home dir is fine, the probes just run every time
+            pass
+
+
 class PlatformManager(object):
     '''
     handles the construction of a platform string.
@@ -86,21 +175,30 @@ class PlatformManager(object):
     
     def __init__(self, sep='-', group_sep=os.path.sep):
         
+        host_cache = HostInfoCache()
+        host_info = host_cache.load()
+        if host_info is None:
+            host_info = self._probe_host_info()
+            host_cache.save(host_info)
+
         self._opsys_ver_major = False
         self._opsys_ver_minor = False
         self._opsys_ver_patch = False
 
-        self._init_opsys_ver_defaults()
+        self._init_opsys_ver_defaults(host_info['opsys'])
 
         self.variants = OrderedDict()
         
         self.__sep = sep
         self.__group_sep = group_sep
+
+        # memoized platform strings, cleared when variants change
+        self._platform_cache = {}
         
-        self.variants['opsys'] = {'name':platform.system(),
+        self.variants['opsys'] = {'name':host_info['opsys'],
                                   'type':VARIANT_TYPE_PLATFORM}
                                   
-        self.variants['arch'] = {'name':platform.machine(),
+        self.variants['arch'] = {'name':host_info['arch'],
                                  'type':VARIANT_TYPE_PLATFORM}
         
         
@@ -121,42 +219,59 @@ class PlatformManager(object):
         
         self.group_idx_list = []
         
-        try:
-            ver_major, ver_minor, ver_patch = getattr(
-                self, '_get_opsys_version_{base_platform}'.format(
-                    base_platform=self.variants['opsys']['name'].lower()))()
-                    
-            self.variants['opsys_version.major'] = {
-                'name': ver_major,
-                'type':VARIANT_TYPE_OPSYS_VERSION
-            }
-
-            self.variants['opsys_version.minor'] = {
-                'name': ver_minor,
-                'type': VARIANT_TYPE_OPSYS_VERSION
-            }
-            
-            self.variants['opsys_version.patch'] = {
-                'name': ver_patch,
-                'type': VARIANT_TYPE_OPSYS_VERSION
-            }
+        ver_major, ver_minor, ver_patch = host_info['opsys_version']
 
+        self.variants['opsys_version.major'] = {
+            'name': ver_major,
+            'type':VARIANT_TYPE_OPSYS_VERSION
+        }
 
-        except Exception as e:
-            raise ScaffoldVariantException(
-                'unsupported base OS - "{base_os}" {exc} : {message}'.format(
-                    base_os=self.variants['opsys']['name'],
-                    exc=e.__class__.__name__, message=str(e)))
-            
+        self.variants['opsys_version.minor'] = {
+            'name': ver_minor,
+            'type': VARIANT_TYPE_OPSYS_VERSION
+        }
         
+        self.variants['opsys_version.patch'] = {
+            'name': ver_patch,
+            'type': VARIANT_TYPE_OPSYS_VERSION
+        }
         
         self.variants['hostname'] = {'name':socket.gethostname(),
                                      'type':VARIANT_TYPE_OPTIONAL}
         
         
-    def _init_opsys_ver_defaults(self):
+    def _probe_host_info(self):
+        '''
+        Platform probes, the result is cached per host by HostInfoCache
+        '''
+
+        opsys = platform.system()
 
-        if platform.system() == 'Darwin':
+        try:
+            opsys_version = getattr(
+                self, '_get_opsys_version_{base_platform}'.format(
+                    base_platform=opsys.lower()))()
+
+        except Exception as e:
+            raise ScaffoldVariantException(
+                'unsupported base OS - "{base_os}" {exc} : {message}'.format(
+                    base_os=opsys,
+                    exc=e.__class__.__name__, message=str(e)))
+
+        return {
+            'opsys': opsys,
+            'arch': platform.machine(),
+            'opsys_version': list(opsys_version)
+        }
+
+
+    def invalidate(self):
+        self._platform_cache.clear()
+
+
+    def _init_opsys_ver_defaults(self, opsys):
+
+        if opsys == 'Darwin':
             self._opsys_ver_major = True
             self._opsys_ver_minor = True
 
@@ -275,6 +390,7 @@ class PlatformManager(object):
 
     def push_group(self):
         self.group_idx_list.append(len(self.variants))
+        self.invalidate()
         
     
     
@@ -331,6 +447,31 @@ class PlatformManager(object):
         return platform
 
 
+    def get_platform_str(self, major=None, minor=None, patch=None, mapped=True):
+        '''
+        Memoized platform string. The opsys version env. variables are part
+        of the key since they are read at format time
+        '''
+
+        cache_key = (
+            major, minor, patch, mapped,
+            os.getenv('SCAFFOLD_VARIANT_OPSYS_VER_MAJOR'),
+            os.getenv('SCAFFOLD_VARIANT_OPSYS_VER_MINOR'),
+            os.getenv('SCAFFOLD_VARIANT_OPSYS_VER_PATCH')
+        )
+
+        if cache_key not in self._platform_cache:
+            if mapped:
+                result = self._get_platform_mapped(major, minor, patch)
+
+            else:
+                result = self._get_platform_raw(major, minor, patch)
+
+            self._platform_cache[cache_key] = result
+
+        return self._platform_cache[cache_key]
+
+
     @property
     def platform(self):
         '''
@@ -340,15 +481,27 @@ class PlatformManager(object):
         return self._get_platform_mapped()
 
 
+def _get_manager():
+    '''
+    The platform manager is created on first use, so importing this module
+    doesn't run the platform probes
+    '''
+
+    global _platform_manager
+    if _platform_manager is None:
+        _platform_manager = PlatformManager()
+
+    return _platform_manager
+
+
 def register_variant(variant, value, variant_type=VARIANT_TYPE_PLATFORM):
     '''
     register a variant to be included in the platform string
     '''
     
-    global _platform_manager
-    assert(_platform_manager)
-    
-    _platform_manager.variants[variant] = {'name':value, 'type':variant_type}
+    platform_manager = _get_manager()
+    platform_manager.variants[variant] = {'name':value, 'type':variant_type}
+    platform_manager.invalidate()
     
     
 def get_platform(major=None, minor=None, patch=None, mapped=True):
@@ -359,17 +512,12 @@ def get_platform(major=None, minor=None, patch=None, mapped=True):
     platforms. Use mapped=False to get the actual, non-mapped platform string
     '''
     
-    global _platform_manager
-    assert(_platform_manager)
+    platform_manager = _get_manager()
     
-    if 'platform_target' in _platform_manager.variants:
-        return _platform_manager.variants['platform_target']['name']
+    if 'platform_target' in platform_manager.variants:
+        return platform_manager.variants['platform_target']['name']
 
-    elif mapped:
-        return _platform_manager._get_platform_mapped(major, minor, patch)
-        
-    else:
-        return _platform_manager._get_platform_raw(major, minor, patch)
+    return platform_manager.get_platform_str(major, minor, patch, mapped)
     
 
 def get_platform_list():
@@ -379,35 +527,28 @@ def get_platform_list():
         get_platform(major=True, minor=True, patch=False),
         get_platform(major=True, minor=False, patch=False),
         get_platform(major=False, minor=False, patch=False),
-        platform.system()
+        get_variant('opsys')
     ]
 
 
 def get_variant(variant, name=True):
     
-    global _platform_manager
-    assert(_platform_manager)
+    platform_manager = _get_manager()
     
     if name:
-        return _platform_manager.variants[variant]['name']
+        return platform_manager.variants[variant]['name']
         
-    return _platform_manager.variants[variant]
+    return platform_manager.variants[variant]
     
     
 def get_variants():
     
-    global _platform_manager
-    assert(_platform_manager)
-    
-    return _platform_manager.variants.keys()
+    return _get_manager().variants.keys()
     
     
 def push_group():
     
-    global _platform_manager
-    assert(_platform_manager)
-    
-    return _platform_manager.push_group()
+    return _get_manager().push_group()
     
     
 def match(input_variants):
@@ -417,15 +558,14 @@ def match(input_variants):
     example input : {'opsys':'Linux', 'arch':'x86_64'}
     '''
     
-    global _platform_manager
-    assert(_platform_manager)
+    platform_manager = _get_manager()
     
     result = True
     
     
     for variant_name, variant_value in input_variants.items():
-        if variant_name not in _platform_manager.variants or \
-        variant_value != _platform_manager.variants[variant_name]['name']:
+        if variant_name not in platform_manager.variants or \
+        variant_value != platform_manager.variants[variant_name]['name']:
             
             result = False
             
@@ -495,13 +635,3 @@ def get_python_dirname(*args, **kwargs):
     '''
     
     return 'python{version}'.format(version=get_python_version(*args, **kwargs))
-    
-    
-def _init_manager():
-    
-    global _platform_manager
-    _platform_manager = PlatformManager()
-    
-    
-_init_manager()
-del _init_manager
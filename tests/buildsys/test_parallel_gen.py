@@ -0,0 +1,119 @@
+#
+# Copyright 2014-2024 Justin Ottley
+#
+# Licensed under the terms set forth in the LICENSE.txt file
+#
+
+import os
+import sys
+import glob
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TEST_DIR, '..', '..', 'src')
+
+TREE = {
+    'ScaffoldScript': "Subdir('b')\nSubdir('a')\n",
+    'b/ScaffoldScript': "SoftwareSet('beta')\nBuild('blib')\nBuild('bpy')\n",
+    'b/blib/ScaffoldScript': (
+        "Product('blib')\n"
+        "benv.build_type = 'shared_library'\n"
+        "benv.cpp_classes = 'Kb'\n"
+        "benv.lib_name = 'Lb'\n"
+        "benv.required_thirdparty_libs = ''\n"
+    ),
+    'b/blib/Kb.h': '',
+    'b/blib/Kb.cpp': '',
+    'b/bpy/ScaffoldScript': (
+        "Product('bpy')\n"
+        "benv.build_type = 'python_package'\n"
+        "benv.python_package_dirs = ['p']\n"
+    ),
+    'b/bpy/p/__init__.py': '',
+    'a/ScaffoldScript': "SoftwareSet('alpha')\nBuild('lib1')\nBuild('lib2')\n",
+    'a/lib1/ScaffoldScript': (
+        "Product('lib1')\n"
+        "benv.build_type = 'shared_library'\n"
+        "benv.cpp_classes = 'Klib1'\n"
+        "benv.lib_name = 'Llib1'\n"
+        "benv.required_thirdparty_libs = ''\n"
+    ),
+    'a/lib1/Klib1.h': '',
+    'a/lib1/Klib1.cpp': '',
+    'a/lib2/ScaffoldScript': (
+        "Product('lib2')\n"
+        "benv.build_type = 'shared_library'\n"
+        "benv.cpp_classes = 'Klib2'\n"
+        "benv.lib_name = 'Llib2'\n"
+        "benv.required_thirdparty_libs = ''\n"
+        "benv.required_libs = 'alpha.Llib1'\n"
+    ),
+    'a/lib2/Klib2.h': '',
+    'a/lib2/Klib2.cpp': '',
+}
+
+
+class ParallelGenTest(unittest.TestCase):
+    '''
+    Generating top level subtrees in worker processes (scgen -j) has to give
+    the same ninja files and sc_config as generating them serially
+    '''
+
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp(prefix='sc_gen_test_')
+        for relpath, contents in TREE.items():
+            file_path = os.path.join(self.root_dir, relpath)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w') as wfh:
+                wfh.write(contents)
+
+        # products record the branch and remote of their git repository
+        for git_cmd in [['init', '-q'], ['remote', 'add', 'origin', 'git@example.com:sc/sc_gen_test.git']]:
+            subprocess.check_call(['git'] + git_cmd, cwd=self.root_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.root_dir)
+
+    def _scgen(self, *args):
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.path.join(SRC_DIR, 'lib', 'python')
+
+        proc = subprocess.run(
+            [sys.executable, os.path.join(SRC_DIR, 'bin', 'scgen.py')] + list(args),
+            cwd=self.root_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        self.assertEqual(proc.returncode, 0, proc.stdout.decode('utf-8', 'replace'))
+
+        result = {}
+        for pattern in ['build/gen/*/*.ninja', 'inst/*/sc_config.json']:
+            for file_path in glob.glob(os.path.join(self.root_dir, pattern)):
+                with open(file_path, 'rb') as fh:
+                    result[os.path.relpath(file_path, self.root_dir)] = fh.read()
+
+        return result
+
+    def test_jobs_match_serial(self):
+
+        serial = self._scgen('--full', '-j', '1')
+        self.assertTrue([p for p in serial if p.endswith('sc_config.json')])
+        self.assertTrue([p for p in serial if os.path.basename(p).startswith('build_')])
+
+        self.assertEqual(self._scgen('--full', '-j', '2'), serial)
+
+        # unchanged subtrees replayed from the generation manifest
+        self.assertEqual(self._scgen('-j', '2'), serial)
+
+        # without b, the rules that a's worker left to b have to be written
+        # when a is replayed
+        with open(os.path.join(self.root_dir, 'ScaffoldScript'), 'w') as wfh:
+            wfh.write("Subdir('a')\n")
+
+        incremental = self._scgen('-j', '2')
+        self.assertEqual(incremental, self._scgen('--full', '-j', '1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
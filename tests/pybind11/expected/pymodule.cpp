@@ -0,0 +1,109 @@
+// Automatically generated by scaffold
+
+#include <pybind11/pybind11.h>
+#include <pybind11/embed.h>
+
+#include "RlpCore/CORE/Foo.h"
+#include "RlpCore/CORE/Bar.h"
+#include "extra/inc.h"
+#include "RlpCore/CORE/pymodule.h"
+
+#include "RlpCore/CORE/pysigslot.h"
+
+#include "RlpCore/PY/PyQVariant.h"
+
+#include "RlpCore/PY/PySignal.h"
+#include "RlpCore/PY/Interp.h"
+
+namespace py = pybind11;
+
+RLP_SETUP_MODULE_LOGGER(core, CORE)
+
+void RlpCoreCOREmodule_bootstrap() {
+  RLP_LOG_DEBUG_MODULE(core, CORE, "")
+
+  PyQVariant::registerConverter("CORE_Foo*", new CORE_Foo_PyTypeConverter());
+  PyQVariant::registerConverter("CORE_Bar*", new CORE_Bar_PyTypeConverter());
+  PyQVariant::registerConverter("std::shared_ptr<CORE_Bar>", new CORE_Bar_SharedPtrPyTypeConverter());
+  PySignal::registerConnector("CORE_Foo_moved(int, int)", new CORE_Foo_moved_int_int_PySigSlotConnector());
+  PySignal::registerConnector("CORE_Foo_objChanged(CORE_Bar*)", new CORE_Foo_objChanged_CORE_Bar_ptr_PySigSlotConnector());
+  PySignal::registerConnector("CORE_Bar_ping(QVariantMap, bool)", new CORE_Bar_ping_QVariantMap_bool_PySigSlotConnector());
+  PySignal::registerConnector("CORE_Baz_s(double)", new CORE_Baz_s_double_PySigSlotConnector());
+}
+
+void RlpCoreCOREmodule_initmodule() {
+  RLP_LOG_DEBUG_MODULE(core, CORE, "")
+
+  CORE_Foo* obj_CORE_Foo = new CORE_Foo();
+  RLP_LOG_DEBUG_MODULE(core, CORE, "Instantiated" << obj_CORE_Foo)
+  PY_Interp::bindAppObject("RlpCoreCOREmodule", "CORE_FOO_OBJ", obj_CORE_Foo);
+
+
+}
+
+PYBIND11_EMBEDDED_MODULE(RlpCoreCOREmodule, m) {
+
+  m.def("init_module", &RlpCoreCOREmodule_initmodule, "Bootstrap Python Bindings");
+
+  py::class_<CORE_Foo>(m, "CORE_Foo")
+   .def(py::init(&CORE_Foo::new_CORE_Foo))
+    .def("doIt", &CORE_Foo::doIt)
+    .def("name",
+      [](CORE_Foo& pcls)
+        {
+           return pcls.name().toStdString();
+        }
+    )
+    .def("ptr", &CORE_Foo::ptr,
+      py::return_value_policy::reference)
+    .def("full",
+         static_cast<bool (CORE_Foo::*)(int)>(&CORE_Foo::full)
+    )
+    .def_property_readonly("changed",
+        [](const CORE_Foo &obj) {
+            return new PySignal(&obj, "changed()");
+        }
+     )
+    .def_property_readonly("valueChanged",
+        [](const CORE_Foo &obj) {
+            return new PySignal(&obj, "valueChanged(int)");
+        }
+     )
+    .def_property_readonly("moved",
+        [](const CORE_Foo &obj) {
+            return new PySignal(&obj, "moved(int, int)");
+        }
+     )
+    .def_property_readonly("objChanged",
+        [](const CORE_Foo &obj) {
+            return new PySignal(&obj, "objChanged(CORE_Bar*)");
+        }
+     )
+    .def_property_readonly("bad",
+        [](const CORE_Foo &obj) {
+            return new PySignal(&obj, "bad(QList<int>)");
+        }
+     )
+    .def_property_readonly("refd",
+        [](const CORE_Foo &obj) {
+            return new PySignal(&obj, "refd(const QString&, int)");
+        }
+     )
+  ;
+
+  py::class_<CORE_Bar, CORE_Foo /* parent */ ,  std::shared_ptr<CORE_Bar> >(m, "CORE_Bar")
+   .def(py::init(&CORE_Bar::new_CORE_Bar))
+    .def("get",
+      [](CORE_Bar& pcls)
+        {
+           return PyQVariantMap(pcls.get()).toDict();
+        }
+    )
+    .def_property_readonly("ping",
+        [](const CORE_Bar &obj) {
+            return new PySignal(&obj, "ping(QVariantMap, bool)");
+        }
+     )
+  ;
+
+}
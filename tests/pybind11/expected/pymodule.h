@@ -0,0 +1,84 @@
+// Automatically generated by scninja
+
+#include "RlpCore/CORE/Foo.h"
+#include "RlpCore/CORE/Bar.h"
+#include "RlpCore/PY/PyQVariant.h"
+
+#include "RlpCore/CORE/Global.h"
+
+
+
+void CORE_CORE_API RlpCoreCOREmodule_bootstrap();
+class CORE_Foo_PyTypeConverter : public PyTypeConverter {
+  public:
+
+    CORE_Foo_PyTypeConverter():
+        PyTypeConverter("CORE_Foo")
+    {
+    }
+
+    py::object
+    toPy(QVariant val)
+    {
+      return py::cast(val.value<CORE_Foo*>());
+    }
+
+    QVariant
+    fromPy(py::handle pobj)
+    {
+       CORE_Foo* cobj = pobj.cast<CORE_Foo*>();
+       QVariant result;
+       result.setValue(cobj);
+       return result;
+    }
+};
+
+class CORE_Bar_PyTypeConverter : public PyTypeConverter {
+  public:
+
+    CORE_Bar_PyTypeConverter():
+        PyTypeConverter("CORE_Bar")
+    {
+    }
+
+    py::object
+    toPy(QVariant val)
+    {
+      return py::cast(val.value<CORE_Bar*>());
+    }
+
+    QVariant
+    fromPy(py::handle pobj)
+    {
+       CORE_Bar* cobj = pobj.cast<CORE_Bar*>();
+       QVariant result;
+       result.setValue(cobj);
+       return result;
+    }
+};
+
+class CORE_Bar_SharedPtrPyTypeConverter : public PyTypeConverter {
+  public:
+
+    CORE_Bar_SharedPtrPyTypeConverter():
+        PyTypeConverter("CORE_Bar")
+    {
+    }
+
+
+    py::object
+    toPy(QVariant val)
+    {
+      return py::cast(val.value<std::shared_ptr<CORE_Bar> >());
+    }
+
+    QVariant
+    fromPy(py::handle pobj)
+    {
+       std::shared_ptr<CORE_Bar>  cobj = pobj.cast<std::shared_ptr<CORE_Bar> >();
+       QVariant result;
+       result.setValue(cobj);
+       return result;
+    }
+};
+
@@ -0,0 +1,112 @@
+// Automatically generated by scaffold
+
+#include "RlpCore/PY/PySignal.h"
+#include "RlpCore/PY/Interp.h"
+
+#include "extra/inc.h"
+
+
+class CORE_Foo_moved_int_int_PySigSlotConnector : public PySigSlotConnector
+{
+  Q_OBJECT
+
+public:
+  CORE_Foo_moved_int_int_PySigSlotConnector():
+    PySigSlotConnector()
+  {
+  }
+
+public slots:
+  void slot_moved(int x, int y)
+  {
+    PY_Interp::acquireGIL();
+    py::object pobj0 = py::cast(x);
+    py::object pobj1 = py::cast(y);
+    for (auto pslot : _pyslots)
+    {
+      if (pslot != nullptr)
+      {
+        pslot(pobj0, pobj1);
+      }
+    }
+  }
+};
+
+
+class CORE_Foo_objChanged_CORE_Bar_ptr_PySigSlotConnector : public PySigSlotConnector
+{
+  Q_OBJECT
+
+public:
+  CORE_Foo_objChanged_CORE_Bar_ptr_PySigSlotConnector():
+    PySigSlotConnector()
+  {
+  }
+
+public slots:
+  void slot_objChanged(CORE_Bar* obj)
+  {
+    PY_Interp::acquireGIL();
+    py::object pobj0 = py::cast(obj);
+    for (auto pslot : _pyslots)
+    {
+      if (pslot != nullptr)
+      {
+        pslot(pobj0);
+      }
+    }
+  }
+};
+
+
+class CORE_Bar_ping_QVariantMap_bool_PySigSlotConnector : public PySigSlotConnector
+{
+  Q_OBJECT
+
+public:
+  CORE_Bar_ping_QVariantMap_bool_PySigSlotConnector():
+    PySigSlotConnector()
+  {
+  }
+
+public slots:
+  void slot_ping(QVariantMap m, bool b)
+  {
+    PY_Interp::acquireGIL();
+    py::object pobj0 = py::cast(m);
+    py::object pobj1 = py::cast(b);
+    for (auto pslot : _pyslots)
+    {
+      if (pslot != nullptr)
+      {
+        pslot(pobj0, pobj1);
+      }
+    }
+  }
+};
+
+
+class CORE_Baz_s_double_PySigSlotConnector : public PySigSlotConnector
+{
+  Q_OBJECT
+
+public:
+  CORE_Baz_s_double_PySigSlotConnector():
+    PySigSlotConnector()
+  {
+  }
+
+public slots:
+  void slot_s(double d)
+  {
+    PY_Interp::acquireGIL();
+    py::object pobj0 = py::cast(d);
+    for (auto pslot : _pyslots)
+    {
+      if (pslot != nullptr)
+      {
+        pslot(pobj0);
+      }
+    }
+  }
+};
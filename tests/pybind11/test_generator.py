@@ -0,0 +1,78 @@
+#
+# Copyright 2014-2024 Justin Ottley
+#
+# Licensed under the terms set forth in the LICENSE.txt file
+#
+
+import os
+import sys
+import base64
+import shutil
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, '..', '..', 'src', 'lib', 'python'))
+
+from scaffold.buildsys.buildlib.PyBind11 import generator
+
+FIXTURE_DIR = os.path.join(TEST_DIR, 'fixtures')
+EXPECTED_DIR = os.path.join(TEST_DIR, 'expected')
+
+OUTPUTS = ['pymodule.h', 'pysigslot.h', 'pymodule.cpp']
+
+
+def generate(output_dir):
+
+    with open(os.path.join(FIXTURE_DIR, 'pb_info.json')) as fh:
+        pb_info_str = base64.b64encode(fh.read().encode('utf-8')).decode('utf-8')
+
+    moc_jsons = [os.path.join(FIXTURE_DIR, f) for f in ['moc_Foo.h.json', 'moc_Bar.h.json']]
+
+    # no moc output path, moc is not run
+    generator.generate_pybind11_module(
+        'static', 'RlpCore', 'CORE', pb_info_str,
+        os.path.join(output_dir, 'pymodule.h'),
+        os.path.join(output_dir, 'pysigslot.h'),
+        None,
+        os.path.join(output_dir, 'pymodule.cpp'),
+        ['CORE/Foo.h', 'CORE/Bar.h'],
+        moc_jsons
+    )
+
+
+class GeneratorGoldenTest(unittest.TestCase):
+    '''
+    Generated binding sources have to be byte-identical between runs so
+    gen_pb11 restat and the compile cache hold. Set SC_UPDATE_GOLDEN=1 to
+    rewrite the expected outputs after an intended generator change
+    '''
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='sc_pb11_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_golden_output(self):
+
+        for run_idx in range(2):
+            output_dir = os.path.join(self.temp_dir, 'run{}'.format(run_idx))
+            os.makedirs(output_dir)
+            generate(output_dir)
+
+            for output_name in OUTPUTS:
+                expected_path = os.path.join(EXPECTED_DIR, output_name)
+                with open(os.path.join(output_dir, output_name), 'rb') as fh:
+                    contents = fh.read()
+
+                if os.getenv('SC_UPDATE_GOLDEN') == '1':
+                    with open(expected_path, 'wb') as wfh:
+                        wfh.write(contents)
+
+                with open(expected_path, 'rb') as fh:
+                    self.assertEqual(contents, fh.read(), '{} run {}'.format(output_name, run_idx))
+
+
+if __name__ == '__main__':
+    unittest.main()